@@ -1,18 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func, desc, and_
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, desc, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional
 
+from app.core.config import settings
+from app.core.cache import VersionedTTLCache
 from app.core.database import get_db
+from app.core.export import (
+    EXPORT_MEDIA_TYPES, HAS_PYARROW, stream_row_chunks, encode_arrow, encode_csv, encode_ndjson,
+)
 from app.models.market_snapshot import MarketSnapshot
+from app.models.latest_market_state import LatestMarketState
 from app.models.liquidation import Liquidation
 from app.models.trade_large import TradeLarge
 from app.models.macro_point import MacroPoint
 from app.models.bubble_outlier import BubbleOutlier
 from app.models.stablecoin_flow import StablecoinFlow
+from app.models.ohlcv_rollup import OhlcvRollup
+from app.models.flow_rollup import FlowRollup
+from app.core.rollups import INTERVAL_SECONDS, MAX_HISTORY_POINTS, bucket_start, choose_interval
 
 router = APIRouter()
+# Stored-history endpoints, mounted by server.py (its own /api/data and /health replace this module's)
+history_router = APIRouter()
+
+dashboard_cache = VersionedTTLCache(ttl=settings.DASHBOARD_CACHE_TTL)
+
+
+async def _fetch_rows(engine, stmt) -> List[Any]:
+    """Run a read on its own pooled connection and return plain row tuples."""
+    async with engine.connect() as conn:
+        result = await conn.execute(stmt)
+        return result.all()
+
+
+async def _ingest_version(engine) -> tuple:
+    """Cheap marker that changes whenever the worker commits new data."""
+    query = select(
+        select(func.max(LatestMarketState.ts_updated)).scalar_subquery(),
+        select(func.max(Liquidation.id)).scalar_subquery(),
+        select(func.max(TradeLarge.id)).scalar_subquery(),
+    )
+    rows = await _fetch_rows(engine, query)
+    return tuple(rows[0])
+
 
 @router.get("/api/data")
 async def get_dashboard_data(db: AsyncSession = Depends(get_db)):
@@ -20,103 +54,113 @@ async def get_dashboard_data(db: AsyncSession = Depends(get_db)):
     Get dashboard data combining the latest snapshots, macro data, bubble outliers, and stablecoin flows.
     """
     try:
-        # Get the latest snapshot for each symbol
-        subquery = select(
-            MarketSnapshot.symbol,
-            func.max(MarketSnapshot.timestamp).label("max_timestamp")
-        ).group_by(MarketSnapshot.symbol).subquery()
-        
-        latest_snapshots_query = select(MarketSnapshot).join(
-            subquery,
-            and_(
-                MarketSnapshot.symbol == subquery.c.symbol,
-                MarketSnapshot.timestamp == subquery.c.max_timestamp
-            )
-        )
-        
-        result = await db.execute(latest_snapshots_query)
-        latest_snapshots = result.scalars().all()
-        
-        # Get recent macro data
-        macro_query = select(MacroPoint).order_by(MacroPoint.timestamp.desc()).limit(10)
-        result = await db.execute(macro_query)
-        macro_data = result.scalars().all()
-        
-        # Get recent liquidations
-        liquidations_query = select(Liquidation).order_by(Liquidation.timestamp.desc()).limit(50)
-        result = await db.execute(liquidations_query)
-        recent_liquidations = result.scalars().all()
-        
-        # Get recent large trades
-        trades_query = select(TradeLarge).order_by(TradeLarge.timestamp.desc()).limit(50)
-        result = await db.execute(trades_query)
-        recent_trades = result.scalars().all()
-        
-        # Get latest stablecoin flow data
-        stablecoin_query = select(StablecoinFlow).order_by(StablecoinFlow.date.desc()).limit(1)
-        result = await db.execute(stablecoin_query)
-        latest_stablecoin_flow = result.scalar()
-        
-        # Format market data
-        market_data = {}
-        for snapshot in latest_snapshots:
-            market_data[snapshot.symbol] = {
-                "price": snapshot.price,
-                "volume_24h": snapshot.volume_24h,
-                "percent_change_1h": snapshot.percent_change_1h,
-                "percent_change_24h": snapshot.percent_change_24h,
-                "percent_change_7d": snapshot.percent_change_7d,
-            }
-        
-        # Format macro data
-        formatted_macro_data = []
-        for item in macro_data:
-            formatted_macro_data.append({
-                "indicator": item.indicator,
-                "value": item.value,
-                "timestamp": item.timestamp.isoformat(),
-                "previous_value": item.previous_value,
-                "percent_change": item.percent_change,
-                "country": item.country,
-            })
+        version = await _ingest_version(db.bind)
+        cached = dashboard_cache.get("dashboard", version)
+        if cached is not None:
+            return cached
         
-        # Format liquidations
-        formatted_liquidations = []
-        for liq in recent_liquidations:
-            formatted_liquidations.append({
-                "coin": liq.symbol,
-                "side": liq.side,
-                "size": liq.quantity,
-                "price": liq.price,
-                "value_usd": liq.value_usd,
-                "timestamp": liq.timestamp.isoformat(),
-                "exchange": liq.exchange,
-            })
+        queries = [
+            # Latest state per symbol is maintained by the ingest worker
+            select(
+                LatestMarketState.symbol,
+                LatestMarketState.price,
+                LatestMarketState.volume_24h,
+                LatestMarketState.percent_change_1h,
+                LatestMarketState.percent_change_24h,
+                LatestMarketState.percent_change_7d,
+            ),
+            # Recent macro data
+            select(
+                MacroPoint.indicator,
+                MacroPoint.value,
+                MacroPoint.timestamp,
+                MacroPoint.previous_value,
+                MacroPoint.percent_change,
+                MacroPoint.country,
+            ).order_by(MacroPoint.timestamp.desc()).limit(10),
+            # Recent liquidations
+            select(
+                Liquidation.symbol,
+                Liquidation.side,
+                Liquidation.quantity,
+                Liquidation.price,
+                Liquidation.value_usd,
+                Liquidation.timestamp,
+                Liquidation.exchange,
+            ).order_by(Liquidation.timestamp.desc()).limit(50),
+            # Recent large trades
+            select(
+                TradeLarge.symbol,
+                TradeLarge.side,
+                TradeLarge.price,
+                TradeLarge.quantity,
+                TradeLarge.value_usd,
+                TradeLarge.timestamp,
+                TradeLarge.exchange,
+            ).order_by(TradeLarge.timestamp.desc()).limit(50),
+            # Latest stablecoin flow data
+            select(StablecoinFlow.net, StablecoinFlow.circulating).order_by(StablecoinFlow.date.desc()).limit(1),
+        ]
         
-        # Format trades
-        formatted_trades = []
-        for trade in recent_trades:
-            formatted_trades.append({
-                "symbol": trade.symbol,
-                "side": trade.side,
-                "price": trade.price,
-                "quantity": trade.quantity,
-                "value_usd": trade.value_usd,
-                "time": trade.timestamp.isoformat(),
-                "exchange": trade.exchange,
-            })
+        # The reads are independent, so issue them concurrently on separate connections
+        latest_snapshots, macro_data, recent_liquidations, recent_trades, stablecoin_rows = await asyncio.gather(
+            *(_fetch_rows(db.bind, query) for query in queries)
+        )
+        latest_stablecoin_flow = stablecoin_rows[0] if stablecoin_rows else None
         
         # Build the complete response
         dashboard_data = {
-            "market_data": market_data,
-            "macro_data": formatted_macro_data,
-            "recent_liquidations": formatted_liquidations,
-            "recent_large_trades": formatted_trades,
+            "market_data": {
+                symbol: {
+                    "price": price,
+                    "volume_24h": volume_24h,
+                    "percent_change_1h": change_1h,
+                    "percent_change_24h": change_24h,
+                    "percent_change_7d": change_7d,
+                }
+                for symbol, price, volume_24h, change_1h, change_24h, change_7d in latest_snapshots
+            },
+            "macro_data": [
+                {
+                    "indicator": indicator,
+                    "value": value,
+                    "timestamp": timestamp.isoformat(),
+                    "previous_value": previous_value,
+                    "percent_change": percent_change,
+                    "country": country,
+                }
+                for indicator, value, timestamp, previous_value, percent_change, country in macro_data
+            ],
+            "recent_liquidations": [
+                {
+                    "coin": symbol,
+                    "side": side,
+                    "size": quantity,
+                    "price": price,
+                    "value_usd": value_usd,
+                    "timestamp": timestamp.isoformat(),
+                    "exchange": exchange,
+                }
+                for symbol, side, quantity, price, value_usd, timestamp, exchange in recent_liquidations
+            ],
+            "recent_large_trades": [
+                {
+                    "symbol": symbol,
+                    "side": side,
+                    "price": price,
+                    "quantity": quantity,
+                    "value_usd": value_usd,
+                    "time": timestamp.isoformat(),
+                    "exchange": exchange,
+                }
+                for symbol, side, price, quantity, value_usd, timestamp, exchange in recent_trades
+            ],
             "stablecoin_flow_24h": latest_stablecoin_flow.net if latest_stablecoin_flow else None,
             "stablecoin_circ": latest_stablecoin_flow.circulating if latest_stablecoin_flow else None,
             "timestamp": datetime.utcnow().isoformat(),
         }
         
+        dashboard_cache.set("dashboard", version, dashboard_data)
         return dashboard_data
     
     except Exception as e:
@@ -164,6 +208,381 @@ async def get_bubble_outliers(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error fetching bubble outliers: {str(e)}")
 
 
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; aware query values (e.g. ``...Z``) are converted to match."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _resolve_history_range(
+    start: Optional[datetime], end: Optional[datetime], interval: Optional[str]
+) -> tuple:
+    """Default the range to the last 24h and pick the rollup level to read."""
+    start, end = _naive_utc(start), _naive_utc(end)
+    end = end or datetime.utcnow()
+    if interval is not None and interval not in INTERVAL_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported interval '{interval}', expected one of {list(INTERVAL_SECONDS)}"
+        )
+    if start is None:
+        start = end - timedelta(hours=24)
+        if interval is not None:
+            # A defaulted range is shortened to what fits the requested interval
+            start = max(start, end - timedelta(seconds=INTERVAL_SECONDS[interval] * MAX_HISTORY_POINTS))
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if interval is None:
+        interval = choose_interval(start, end)
+    elif (end - start).total_seconds() / INTERVAL_SECONDS[interval] > MAX_HISTORY_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range spans more than {MAX_HISTORY_POINTS} '{interval}' buckets; "
+                   f"narrow it or use a coarser interval"
+        )
+    return bucket_start(start, INTERVAL_SECONDS[interval]), end, interval
+
+
+@history_router.get("/api/history/ohlcv")
+async def get_ohlcv_history(
+    symbol: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get OHLCV candles for a symbol from the finest rollup that keeps the range
+    within the history point limit.
+    """
+    start, end, interval = _resolve_history_range(start, end, interval)
+    try:
+        query = select(OhlcvRollup).where(
+            OhlcvRollup.symbol == symbol,
+            OhlcvRollup.interval == interval,
+            OhlcvRollup.bucket >= start,
+            OhlcvRollup.bucket <= end,
+        ).order_by(OhlcvRollup.bucket)
+        
+        result = await db.execute(query)
+        
+        candles = []
+        for row in result.scalars().all():
+            candles.append({
+                "timestamp": row.bucket.isoformat(),
+                "open": row.open,
+                "high": row.high,
+                "low": row.low,
+                "close": row.close,
+                "volume": row.volume,
+                "samples": row.sample_count,
+            })
+        
+        return {
+            "symbol": symbol,
+            "interval": interval,
+            "candles": candles,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching OHLCV history: {str(e)}")
+
+
+async def _get_flow_history(
+    kind: str,
+    db: AsyncSession,
+    symbol: Optional[str],
+    side: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    interval: Optional[str],
+) -> Dict[str, Any]:
+    """Shared body of the liquidation and large-trade volume history endpoints."""
+    start, end, interval = _resolve_history_range(start, end, interval)
+    try:
+        query = select(FlowRollup).where(
+            FlowRollup.kind == kind,
+            FlowRollup.interval == interval,
+            FlowRollup.bucket >= start,
+            FlowRollup.bucket <= end,
+        )
+        if symbol:
+            query = query.where(FlowRollup.symbol == symbol)
+        if side:
+            query = query.where(FlowRollup.side == side.lower())
+        
+        result = await db.execute(query.order_by(FlowRollup.bucket))
+        
+        buckets = []
+        for row in result.scalars().all():
+            buckets.append({
+                "timestamp": row.bucket.isoformat(),
+                "symbol": row.symbol,
+                "side": row.side,
+                "count": row.count,
+                "quantity": row.quantity,
+                "value_usd": row.value_usd,
+            })
+        
+        return {
+            "kind": kind,
+            "interval": interval,
+            "buckets": buckets,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching {kind} history: {str(e)}")
+
+
+@history_router.get("/api/history/liquidations")
+async def get_liquidation_history(
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get liquidation volume per symbol and side, bucketed by the chosen rollup interval.
+    """
+    return await _get_flow_history("liquidation", db, symbol, side, start, end, interval)
+
+
+@history_router.get("/api/history/trades")
+async def get_trade_history(
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get large-trade volume per symbol and side, bucketed by the chosen rollup interval.
+    """
+    return await _get_flow_history("trade", db, symbol, side, start, end, interval)
+
+
+def _encode_cursor(timestamp: datetime, row_id: int) -> str:
+    return f"{timestamp.isoformat()}_{row_id}"
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Split a ``<iso timestamp>_<id>`` cursor back into its keyset values."""
+    try:
+        timestamp, row_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+
+
+def _filter_rows(
+    query,
+    model,
+    symbol: Optional[str],
+    side: Optional[str],
+    min_value_usd: Optional[float],
+    start: Optional[datetime],
+    end: Optional[datetime],
+):
+    """Apply the symbol, side, value and time filters shared by the event and export APIs."""
+    if symbol:
+        query = query.where(model.symbol == symbol)
+    if side:
+        query = query.where(func.lower(model.side) == side.lower())
+    if min_value_usd is not None:
+        query = query.where(model.value_usd >= min_value_usd)
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start:
+        query = query.where(model.timestamp >= start)
+    if end:
+        query = query.where(model.timestamp <= end)
+    return query
+
+
+async def _get_event_page(
+    model,
+    db: AsyncSession,
+    symbol: Optional[str],
+    side: Optional[str],
+    min_value_usd: Optional[float],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    cursor: Optional[str],
+    limit: int,
+) -> tuple:
+    """
+    Fetch one page of events, newest first, filtered and keyset-paginated on
+    (timestamp, id) so every page is an index range scan regardless of depth.
+    """
+    query = _filter_rows(select(model), model, symbol, side, min_value_usd, start, end)
+    if cursor:
+        query = query.where(tuple_(model.timestamp, model.id) < tuple_(*_decode_cursor(cursor)))
+    
+    # One extra row tells us whether another page exists
+    query = query.order_by(model.timestamp.desc(), model.id.desc()).limit(limit + 1)
+    result = await db.execute(query)
+    rows = result.scalars().all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows, next_cursor
+
+
+@history_router.get("/api/liquidations")
+async def get_liquidations(
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    min_value_usd: Optional[float] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get individual liquidations, newest first. Pass ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    try:
+        rows, next_cursor = await _get_event_page(
+            Liquidation, db, symbol, side, min_value_usd, start, end, cursor, limit
+        )
+        
+        liquidations = []
+        for liq in rows:
+            liquidations.append({
+                "id": liq.id,
+                "coin": liq.symbol,
+                "side": liq.side,
+                "size": liq.quantity,
+                "price": liq.price,
+                "value_usd": liq.value_usd,
+                "timestamp": liq.timestamp.isoformat(),
+                "exchange": liq.exchange,
+            })
+        
+        return {
+            "liquidations": liquidations,
+            "next_cursor": next_cursor,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching liquidations: {str(e)}")
+
+
+@history_router.get("/api/trades")
+async def get_large_trades(
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    min_value_usd: Optional[float] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get individual large trades, newest first. Pass ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    try:
+        rows, next_cursor = await _get_event_page(
+            TradeLarge, db, symbol, side, min_value_usd, start, end, cursor, limit
+        )
+        
+        trades = []
+        for trade in rows:
+            trades.append({
+                "id": trade.id,
+                "symbol": trade.symbol,
+                "side": trade.side,
+                "price": trade.price,
+                "quantity": trade.quantity,
+                "value_usd": trade.value_usd,
+                "time": trade.timestamp.isoformat(),
+                "exchange": trade.exchange,
+            })
+        
+        return {
+            "trades": trades,
+            "next_cursor": next_cursor,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching large trades: {str(e)}")
+
+
+EXPORT_DATASETS = {
+    "snapshots": MarketSnapshot,
+    "liquidations": Liquidation,
+    "trades": TradeLarge,
+}
+
+
+@history_router.get("/api/export/{dataset}")
+async def export_history(
+    dataset: str,
+    format: str = "ndjson",
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    min_value_usd: Optional[float] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream stored rows of ``snapshots``, ``liquidations`` or ``trades`` as NDJSON, CSV or Arrow IPC.
+    
+    Rows are read from a server-side cursor and sent with chunked transfer
+    encoding, oldest first, so memory use does not grow with the result size.
+    """
+    model = EXPORT_DATASETS.get(dataset)
+    if model is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown dataset '{dataset}', expected one of {list(EXPORT_DATASETS)}"
+        )
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{format}', expected one of {list(EXPORT_MEDIA_TYPES)}"
+        )
+    if format == "arrow" and not HAS_PYARROW:
+        raise HTTPException(status_code=400, detail="Arrow export requires pyarrow to be installed")
+    if model is MarketSnapshot and (side or min_value_usd is not None):
+        raise HTTPException(status_code=400, detail="side and min_value_usd only apply to liquidations and trades")
+    
+    columns = list(model.__table__.columns)
+    query = _filter_rows(select(*columns), model, symbol, side, min_value_usd, start, end)
+    query = query.order_by(model.timestamp, model.id)
+    chunks = stream_row_chunks(db.bind, query, settings.EXPORT_CHUNK_SIZE)
+    
+    if format == "arrow":
+        body = encode_arrow(columns, chunks)
+    elif format == "csv":
+        body = encode_csv([column.name for column in columns], chunks)
+    else:
+        body = encode_ndjson([column.name for column in columns], chunks)
+    
+    extension = "arrows" if format == "arrow" else format
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{extension}"'},
+    )
+
+
 # Add a health check endpoint
 @router.get("/health")
 async def health_check(db: AsyncSession = Depends(get_db)):
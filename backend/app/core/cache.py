@@ -0,0 +1,29 @@
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class VersionedTTLCache:
+    """
+    In-process cache whose entries expire after ``ttl`` seconds or as soon as
+    the caller presents a different version for the same key.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Hashable, Any]] = {}
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, cached_version, value = entry
+        if cached_version != version or time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, version: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, version, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -9,12 +9,58 @@ class Settings(BaseSettings):
     # API Settings
     HYPERLIQUID_WS_URL: str = "wss://api.hyperliquid.xyz/ws"
     HYPERLIQUID_API_URL: str = "https://api.hyperliquid.xyz/info"
+    DERIBIT_WS_URL: str = "wss://www.deribit.com/ws/api/v2"
+    BINANCE_MARK_PRICE_WS_URL: str = "wss://fstream.binance.com/ws/!markPrice@arr@1s"
+    BINANCE_FUNDING_INFO_URL: str = "https://fapi.binance.com/fapi/v1/fundingInfo"
     COINDESK_API_KEY: str = ""  # Will be loaded from environment variable
     
     # WebSocket Settings
     WS_HEARTBEAT_INTERVAL: int = 30  # seconds
     WS_RECONNECT_INTERVAL: int = 5  # seconds
     
+    # Data Retention Settings
+    MARKET_SNAPSHOT_RETENTION_DAYS: int = 14
+    LIQUIDATION_RETENTION_DAYS: int = 90
+    TRADES_RETENTION_DAYS: int = 90
+    ROLLUP_1M_RETENTION_DAYS: int = 14  # 1h and 1d rollups are kept indefinitely
+    ROLLUP_5M_RETENTION_DAYS: int = 90
+    RETENTION_BATCH_SIZE: int = 5000  # rows deleted per transaction
+    RETENTION_INTERVAL: int = 900  # seconds between retention runs
+    PARTITION_PREMAKE_DAYS: int = 7  # daily partitions created ahead (Postgres only)
+    
+    # Bubble Detection Settings
+    BUBBLE_LOOKBACK_DAYS: int = 30
+    BUBBLE_ROLLUP_INTERVAL: str = "1h"  # rollup level the baseline window is read from
+    BUBBLE_MIN_SAMPLES: int = 24  # buckets required before a symbol is scored
+    BUBBLE_RECOMPUTE_INTERVAL: int = 3600  # seconds between full baseline recomputes
+    
+    # Macro Data Settings
+    ALPHA_VANTAGE_DAILY_QUOTA: int = 25  # upstream calls per UTC day, counted per HTTP attempt
+    MACRO_REFRESH_INTERVAL: int = 900  # seconds between checks for due indicators
+    MACRO_REFRESH_IN_WEB: bool = False  # fetch from the web process too; only for setups without the worker
+    
+    # Cache Settings
+    DASHBOARD_CACHE_TTL: float = 5.0  # seconds an assembled /api/data response is reused
+    RESPONSE_CACHE_PATH: str = "response_cache.db"  # SQLite file of cached upstream responses
+    
+    # Options Settings
+    OPTIONS_CHAIN_TTL: float = 60.0  # seconds an indexed Deribit option chain is reused
+    OPTIONS_SUMMARY_TTL: float = 15.0  # seconds between Deribit book summary refreshes for analytics
+    OPTIONS_STREAM_ENABLED: bool = True  # keep Deribit ticker WebSockets open instead of polling REST
+    OPTIONS_TICKER_INTERVAL: str = "100ms"  # ticker channel interval ("100ms" or "agg2" unauthenticated)
+    OPTIONS_STREAM_FLUSH_INTERVAL: float = 1.0  # seconds between batched analytics updates
+    
+    # Liquidation Heatmap Settings
+    HYPERLIQUID_WATCHED_ADDRESSES: List[str] = []  # accounts whose positions are tracked (JSON list in env)
+    LIQUIDATION_HEATMAP_REFRESH_INTERVAL: float = 60.0  # seconds between clearinghouse state reloads
+    
+    # Funding Monitor Settings
+    FUNDING_MONITOR_ENABLED: bool = True  # stream Binance funding and compare it with Hyperliquid
+    FUNDING_SPREADS_TOP_N: int = 20  # widest cross-venue spreads published
+    
+    # Export Settings
+    EXPORT_CHUNK_SIZE: int = 5000  # rows fetched from the server-side cursor per chunk
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     
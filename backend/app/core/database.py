@@ -1,6 +1,7 @@
 import os, pathlib
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.dialects import postgresql, sqlite
 
 DEFAULT_SQLITE_URL = "sqlite+aiosqlite:///app.db"
 url = os.getenv("DATABASE_URL", DEFAULT_SQLITE_URL)
@@ -21,6 +22,12 @@ SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 class Base(DeclarativeBase):
     pass
 
+def dialect_insert(session):
+    """Return the INSERT construct with ON CONFLICT support for the session's dialect."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
 # Dependency to use in FastAPI endpoints
 async def get_db():
     async with SessionLocal() as session:
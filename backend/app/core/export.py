@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Sequence
+
+from sqlalchemy import BigInteger, DateTime, Float, Integer
+
+logger = logging.getLogger(__name__)
+
+# pyarrow is a backend requirement; the guard keeps slimmer local installs working without Arrow export
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+async def stream_row_chunks(engine, query, chunk_size: int) -> AsyncIterator[Sequence[Any]]:
+    """
+    Yield lists of at most ``chunk_size`` row tuples from a server-side cursor,
+    so memory stays flat however many rows the query matches.
+    """
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions(chunk_size):
+            yield rows
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def encode_ndjson(columns: List[str], chunks: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    async for rows in chunks:
+        lines = [json.dumps(dict(zip(columns, map(_jsonable, row)))) for row in rows]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def encode_csv(columns: List[str], chunks: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in chunks:
+        writer.writerows([map(_jsonable, row) for row in rows])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when the query matched nothing
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _arrow_type(column_type) -> "pa.DataType":
+    if isinstance(column_type, (Integer, BigInteger)):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+class _ChunkSink:
+    """Write-only file object the Arrow stream writer flushes into between batches."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+async def encode_arrow(columns, chunks: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    """Encode rows as an Arrow IPC stream, one record batch per chunk."""
+    schema = pa.schema([(column.name, _arrow_type(column.type)) for column in columns])
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    async for rows in chunks:
+        arrays = [
+            pa.array([row[i] for row in rows], type=field.type)
+            for i, field in enumerate(schema)
+        ]
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
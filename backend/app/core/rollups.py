@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+# Rollup levels from finest to coarsest: (name, bucket width in seconds)
+ROLLUP_INTERVALS: List[Tuple[str, int]] = [
+    ("1m", 60),
+    ("5m", 300),
+    ("1h", 3600),
+    ("1d", 86400),
+]
+INTERVAL_SECONDS = dict(ROLLUP_INTERVALS)
+
+# Upper bound on points returned by the history endpoints
+MAX_HISTORY_POINTS = 1000
+
+
+def bucket_start(ts: datetime, seconds: int) -> datetime:
+    """Floor ``ts`` to the start of its ``seconds``-wide bucket (epoch aligned)."""
+    epoch = datetime(1970, 1, 1)
+    offset = int((ts - epoch).total_seconds()) // seconds * seconds
+    return epoch + timedelta(seconds=offset)
+
+
+def choose_interval(start: datetime, end: datetime, max_points: int = MAX_HISTORY_POINTS) -> str:
+    """
+    Pick the rollup level to serve ``start``..``end`` from.
+
+    Returns the finest interval whose bucket count for the range stays within
+    ``max_points``, falling back to the coarsest level for very long ranges.
+    """
+    span = max((end - start).total_seconds(), 0)
+    for name, seconds in ROLLUP_INTERVALS:
+        if span / seconds <= max_points:
+            return name
+    return ROLLUP_INTERVALS[-1][0]
@@ -1,17 +1,27 @@
 from app.models.asset import Asset
+from app.models.symbol import Symbol
 from app.models.market_snapshot import MarketSnapshot
+from app.models.latest_market_state import LatestMarketState
 from app.models.liquidation import Liquidation
 from app.models.trade_large import TradeLarge
 from app.models.macro_point import MacroPoint
 from app.models.bubble_outlier import BubbleOutlier
+from app.models.bubble_stat import BubbleStat
 from app.models.stablecoin_flow import StablecoinFlow
+from app.models.ohlcv_rollup import OhlcvRollup
+from app.models.flow_rollup import FlowRollup
 
 __all__ = [
     "Asset",
+    "Symbol",
     "MarketSnapshot",
+    "LatestMarketState",
     "Liquidation",
     "TradeLarge", 
     "MacroPoint",
     "BubbleOutlier",
+    "BubbleStat",
     "StablecoinFlow",
+    "OhlcvRollup",
+    "FlowRollup",
 ] 
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Float, DateTime, Integer, func
+from app.core.database import Base
+
+class BubbleStat(Base):
+    """Running baseline statistics per symbol behind the bubble-outlier z-scores."""
+    __tablename__ = "bubble_stats"
+    
+    symbol = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)  # Bucket closes folded in
+    mean = Column(Float, nullable=False, default=0.0)
+    variance = Column(Float, nullable=False, default=0.0)
+    pending_bucket = Column(DateTime, nullable=True)  # Open bucket not yet folded in
+    pending_close = Column(Float, nullable=True)  # Latest price seen in pending_bucket
+    ts_recomputed = Column(DateTime, nullable=True)  # Last full recompute from rollups
+    ts_updated = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Float, DateTime, Integer, func, Index
+from app.core.database import Base
+
+class FlowRollup(Base):
+    __tablename__ = "flow_rollups"
+    
+    kind = Column(String, primary_key=True)  # "liquidation" or "trade"
+    symbol = Column(String, primary_key=True)
+    side = Column(String, primary_key=True)
+    interval = Column(String, primary_key=True)  # "1m", "5m", "1h" or "1d"
+    bucket = Column(DateTime, primary_key=True)  # Bucket start (UTC)
+    count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Float, nullable=False, default=0.0)
+    value_usd = Column(Float, nullable=False, default=0.0)
+    ts_updated = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Range scans per kind and interval across all symbols
+    __table_args__ = (
+        Index('idx_flow_rollups_kind_interval_bucket', 'kind', 'interval', 'bucket'),
+    )
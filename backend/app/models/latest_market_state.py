@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Float, DateTime, Integer, ForeignKey, func
+from app.core.database import Base
+
+class LatestMarketState(Base):
+    """Most recent snapshot per symbol, kept current by the ingest worker."""
+    __tablename__ = "latest_market_state"
+    
+    symbol = Column(String, primary_key=True)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"), nullable=True)
+    timestamp = Column(DateTime, nullable=False)
+    price = Column(Float, nullable=False)
+    volume_24h = Column(Float, nullable=True)
+    percent_change_1h = Column(Float, nullable=True)
+    percent_change_24h = Column(Float, nullable=True)
+    percent_change_7d = Column(Float, nullable=True)
+    funding_rate = Column(Float, nullable=True)
+    ts_updated = Column(DateTime, default=func.now(), onupdate=func.now())
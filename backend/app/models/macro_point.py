@@ -16,7 +16,7 @@ class MacroPoint(Base):
     notes = Column(String, nullable=True)
     ts_created = Column(DateTime, default=func.now())
     
-    # Create index for indicator + timestamp queries
+    # One row per observation; also the upsert conflict target
     __table_args__ = (
-        Index('idx_macro_points_indicator_timestamp', 'indicator', 'timestamp'),
+        Index('idx_macro_points_indicator_timestamp', 'indicator', 'timestamp', unique=True),
     ) 
\ No newline at end of file
@@ -1,12 +1,13 @@
-from sqlalchemy import Column, String, Float, DateTime, func, Index
+from sqlalchemy import Column, String, Float, DateTime, func, Index, BigInteger, Integer, ForeignKey
 from app.core.database import Base
 
 class MarketSnapshot(Base):
     __tablename__ = "market_snapshots"
     
-    id = Column(String, primary_key=True)  # Composite key: symbol + timestamp
-    symbol = Column(String, nullable=False, index=True)
-    timestamp = Column(DateTime, nullable=False, index=True)
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"), nullable=True)
+    symbol = Column(String, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
     price = Column(Float, nullable=False)
     open = Column(Float, nullable=True)
     high = Column(Float, nullable=True)
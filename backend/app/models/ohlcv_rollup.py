@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Float, DateTime, Integer, func, Index
+from app.core.database import Base
+
+class OhlcvRollup(Base):
+    __tablename__ = "ohlcv_rollups"
+    
+    symbol = Column(String, primary_key=True)
+    interval = Column(String, primary_key=True)  # "1m", "5m", "1h" or "1d"
+    bucket = Column(DateTime, primary_key=True)  # Bucket start (UTC)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+    first_ts = Column(DateTime, nullable=False)  # Timestamp of the sample that set open
+    last_ts = Column(DateTime, nullable=False)  # Timestamp of the sample that set close
+    ts_updated = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Range scans per interval across all symbols
+    __table_args__ = (
+        Index('idx_ohlcv_rollups_interval_bucket', 'interval', 'bucket'),
+    )
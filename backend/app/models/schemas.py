@@ -11,10 +11,23 @@ class MacroDataPoint(BaseModel):
     value: float
 
 class MacroData(BaseModel):
-    dxy: Optional[List[MacroDataPoint]] = None
-    gold: Optional[List[MacroDataPoint]] = None
-    oil: Optional[List[MacroDataPoint]] = None
-    gas: Optional[List[MacroDataPoint]] = None
+    """Latest observation per indicator; keys match data_sources.alpha_vantage.MACRO_INDICATORS."""
+    cpi: Optional[MacroDataPoint] = None
+    fed_rate: Optional[MacroDataPoint] = None
+    unemployment: Optional[MacroDataPoint] = None
+    wti_oil: Optional[MacroDataPoint] = None
+    brent_oil: Optional[MacroDataPoint] = None
+    natural_gas: Optional[MacroDataPoint] = None
+    copper: Optional[MacroDataPoint] = None
+    corn: Optional[MacroDataPoint] = None
+    wheat: Optional[MacroDataPoint] = None
+    coffee: Optional[MacroDataPoint] = None
+    sugar: Optional[MacroDataPoint] = None
+
+class MacroHistory(BaseModel):
+    indicator: str
+    total_points: int  # Observations in the requested range before downsampling
+    points: List[MacroDataPoint]
 
 class MarketMetric(BaseModel):
     price: float
@@ -73,7 +86,7 @@ class ApiResponse(BaseModel):
     error: Optional[str] = None
 
 class MarketSnapshot(BaseModel):
-    id: str  # Composite key: symbol + timestamp
+    id: Optional[int] = None  # Assigned by the database sequence
     symbol: str
     timestamp: datetime
     price: float
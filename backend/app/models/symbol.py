@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+from app.core.database import Base
+
+class Symbol(Base):
+    __tablename__ = "symbols"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    symbol = Column(String, nullable=False, unique=True)
+    ts_created = Column(DateTime, default=func.now())
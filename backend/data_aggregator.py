@@ -1,11 +1,11 @@
 import asyncio
 from datetime import datetime, timedelta
-# Import the cache from the new shared_state module
-from shared_state import macro_data_cache 
+# Read the cache through the shared_state module so updates made by server.py are seen
+import shared_state
 # REMOVE: Import from server
 # from server import macro_data_cache 
-from data_sources.hyperliquid import fetch_market_data
-from data_sources.liquidations import get_liquidations_data
+from data_sources.hyperliquid import fetch_market_data, get_realized_volatility
+from data_sources.liquidation_stream import get_liquidation_stream
 from data_sources.trades import get_recent_large_trades
 from typing import Dict, List, Any, Optional
 
@@ -37,8 +37,8 @@ def generate_default_market_data_object() -> MarketData:
         price_change_percent=2.5,
         market_cap=580000000000,
         dominance=51.2,
-        volatility_7d=0.022,
-        volatility_30d=0.035
+        volatility_7d=get_realized_volatility("BTC", "7d"),
+        volatility_30d=get_realized_volatility("BTC", "30d")
     )
     
     eth_metric = MarketMetric(
@@ -49,8 +49,8 @@ def generate_default_market_data_object() -> MarketData:
         price_change_percent=1.8,
         market_cap=276000000000,
         dominance=18.5,
-        volatility_7d=0.025,
-        volatility_30d=0.04
+        volatility_7d=get_realized_volatility("ETH", "7d"),
+        volatility_30d=get_realized_volatility("ETH", "30d")
     )
     
     logger.info("Using default market data with realistic values (direct object)")
@@ -107,132 +107,12 @@ async def gather_dashboard_data() -> DashboardData:
         recent_liquidations_data = [] # Start with default for recent liquidations
         recent_trades_data = [] # Variable for trades
         # Include macro data from the cache (imported from shared_state)
-        macro_data_result = macro_data_cache 
+        macro_data_result = shared_state.macro_data_cache
 
-        # --- Fetch Binance Liquidations ---
+        # --- Liquidations from every venue, normalized at ingest ---
         try:
-            # Call the actual function to get liquidation data (returns a Dict)
-            liquidation_result = get_liquidations_data() 
-            logger.debug(f"Raw liquidation result type: {type(liquidation_result).__name__}")
-            
-            # Create a flat list of all liquidations
-            flat_liquidations = []
-            
-            # Process differently based on what get_liquidations_data returns
-            if isinstance(liquidation_result, dict):
-                # Extract from dictionary structure
-                if 'liquidations' in liquidation_result:
-                    liquidations_by_symbol = liquidation_result.get("liquidations", {})
-                    logger.debug(f"Liquidations by symbol keys: {list(liquidations_by_symbol.keys())}")
-                    
-                    # Flatten the nested structure
-                    for symbol, symbol_data in liquidations_by_symbol.items():
-                        longs = symbol_data.get("longs", [])
-                        shorts = symbol_data.get("shorts", [])
-                        logger.debug(f"Symbol {symbol}: {len(longs)} longs, {len(shorts)} shorts")
-                        
-                        for liq in longs:
-                            # Ensure required fields with proper validation
-                            if not isinstance(liq, dict):
-                                logger.warning(f"Invalid liquidation data format: {liq}")
-                                continue
-                                
-                            # Set required fields with validation
-                            liq["symbol"] = symbol
-                            liq["coin"] = symbol.replace("USDT", "")
-                            liq["side"] = "long"
-                            
-                            # Validate numeric fields
-                            try:
-                                liq["size"] = float(liq.get("quantity", 0) or liq.get("size", 0))
-                                liq["price"] = float(liq.get("price", 0))
-                                liq["value_usd"] = float(liq.get("value_usd", 0) or liq.get("value", 0))
-                            except (ValueError, TypeError) as e:
-                                logger.warning(f"Invalid numeric field in liquidation: {e}")
-                                continue
-                                
-                            flat_liquidations.append(liq)
-                            
-                        for liq in shorts:
-                            # Ensure required fields with proper validation
-                            if not isinstance(liq, dict):
-                                logger.warning(f"Invalid liquidation data format: {liq}")
-                                continue
-                                
-                            # Set required fields with validation
-                            liq["symbol"] = symbol
-                            liq["coin"] = symbol.replace("USDT", "")
-                            liq["side"] = "short"
-                            
-                            # Validate numeric fields
-                            try:
-                                liq["size"] = float(liq.get("quantity", 0) or liq.get("size", 0))
-                                liq["price"] = float(liq.get("price", 0))
-                                liq["value_usd"] = float(liq.get("value_usd", 0) or liq.get("value", 0))
-                            except (ValueError, TypeError) as e:
-                                logger.warning(f"Invalid numeric field in liquidation: {e}")
-                                continue
-                                
-                            flat_liquidations.append(liq)
-                else:
-                    logger.warning("Liquidation result dict has no 'liquidations' key")
-            elif isinstance(liquidation_result, list):
-                # Already a flat list, validate each item
-                for liq in liquidation_result:
-                    if not isinstance(liq, dict):
-                        logger.warning(f"Invalid liquidation data format: {liq}")
-                        continue
-                    flat_liquidations.append(liq)
-            else:
-                logger.warning(f"Unexpected liquidation result type: {type(liquidation_result).__name__}")
-            
-            # Sort by time (if available)
-            try:
-                # Try different possible time keys
-                time_keys = ["time", "timestamp", "created_at"]
-                sort_key = next((k for k in time_keys if k in flat_liquidations[0]), None) if flat_liquidations else None
-                
-                if sort_key:
-                    flat_liquidations.sort(key=lambda x: x.get(sort_key, ''), reverse=True)
-                    logger.debug(f"Sorted liquidations by {sort_key}")
-                else:
-                    logger.debug("Could not find suitable time key for sorting liquidations")
-            except Exception as sort_err:
-                logger.warning(f"Could not sort flattened liquidations: {sort_err}")
-                
-            # Standardize format for frontend with validation
-            standardized_liquidations = []
-            for liq in flat_liquidations:
-                try:
-                    # Validate required fields
-                    if not all(k in liq for k in ["symbol", "side", "size", "price", "value_usd"]):
-                        logger.warning(f"Missing required fields in liquidation: {liq}")
-                        continue
-                        
-                    # Map fields to expected names with validation
-                    std_liq = {
-                        "symbol": str(liq["symbol"]),
-                        "coin": str(liq.get("coin", liq["symbol"].replace("USDT", ""))),
-                        "side": str(liq["side"]).lower(),
-                        "size": float(liq["size"]),
-                        "price": float(liq["price"]),
-                        "value_usd": float(liq["value_usd"]),
-                        "timestamp": str(liq.get("timestamp", "") or liq.get("time", ""))
-                    }
-                    
-                    # Additional validation
-                    if std_liq["size"] <= 0 or std_liq["price"] <= 0 or std_liq["value_usd"] <= 0:
-                        logger.warning(f"Invalid numeric values in liquidation: {std_liq}")
-                        continue
-                        
-                    standardized_liquidations.append(std_liq)
-                except Exception as e:
-                    logger.warning(f"Error standardizing liquidation: {e} | Data: {liq}")
-            
-            # Use the standardized list
-            recent_liquidations_data = standardized_liquidations
-            logger.info(f"Prepared {len(recent_liquidations_data)} valid liquidations for dashboard")
-
+            recent_liquidations_data = get_liquidation_stream().records()
+            logger.info(f"Prepared {len(recent_liquidations_data)} liquidations for dashboard")
         except Exception as liq_err:
             logger.error(f"Error processing liquidation data: {liq_err}", exc_info=True)
             recent_liquidations_data = [] # Fallback to empty list on error
@@ -357,7 +237,7 @@ def generate_default_market_data() -> Dict[str, Dict[str, float]]:
             "price_change_percent": 0.0125,
             "market_cap": 1650000000000,
             "dominance": 51.2,
-            "volatility_7d": 0.18,
+            "volatility_7d": get_realized_volatility("BTC", "7d"),
             "bid_price": 84525.50,
             "ask_price": 84527.30,
             "spread": 1.80,
@@ -371,7 +251,7 @@ def generate_default_market_data() -> Dict[str, Dict[str, float]]:
             "price_change_percent": 0.005,
             "market_cap": 190000000000,
             "dominance": 18.5,
-            "volatility_7d": 0.23,
+            "volatility_7d": get_realized_volatility("ETH", "7d"),
             "bid_price": 1583.75,
             "ask_price": 1583.95,
             "spread": 0.20,
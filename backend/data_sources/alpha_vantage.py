@@ -2,9 +2,15 @@ import aiohttp
 import asyncio
 import logging
 import os
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 
+from app.core.config import settings
+from data_sources.rate_limiter import get_limiter
+from data_sources.response_cache import cached_fetch, get_response_cache
+
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://www.alphavantage.co/query"
@@ -68,8 +74,20 @@ alpha_vantage_retry_decorator = retry(
 
 # --- Helper Function --- 
 @alpha_vantage_retry_decorator
-async def _fetch_alpha_vantage_data(function_name: str, params: Optional[Dict] = None) -> Optional[Dict]:
-    """Generic function to fetch data from Alpha Vantage with retry logic."""
+async def _request_alpha_vantage(function_name: str, params: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Fetch from Alpha Vantage with retry logic. Every attempt, retries
+    included, is one upstream call: it takes a daily quota unit and a rate
+    limiter token before going out.
+    """
+    if not get_response_cache().consume_quota("alpha_vantage", settings.ALPHA_VANTAGE_DAILY_QUOTA):
+        logger.warning(f"Alpha Vantage daily quota spent; not fetching {function_name}")
+        return None
+    await get_limiter(BASE_URL).acquire()
+    return await _get_alpha_vantage(function_name, params)
+
+async def _get_alpha_vantage(function_name: str, params: Optional[Dict] = None) -> Optional[Dict]:
+    """One Alpha Vantage HTTP request."""
     if not API_KEY:
         logger.error("Alpha Vantage API key is missing.")
         return None
@@ -120,29 +138,95 @@ async def _fetch_alpha_vantage_data(function_name: str, params: Optional[Dict] =
         logger.error(f"Unexpected error after retries fetching Alpha Vantage ({function_name}): {e}", exc_info=True)
         raise # Reraise the final exception
 
+async def _fetch_alpha_vantage_data(function_name: str, params: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Fetch from Alpha Vantage through the persistent response cache.
+
+    Monthly series are cached far longer than daily ones, so a restart or a
+    second process reuses the last responses instead of spending the daily
+    request quota again.
+    """
+    params = params or {}
+    source = "alpha_vantage:monthly" if params.get("interval") == "monthly" else "alpha_vantage:daily"
+
+    async def request():
+        return await _request_alpha_vantage(function_name, params)
+
+    return await cached_fetch(source, BASE_URL, {"function": function_name, **params}, request)
+
 # --- Specific Indicator Fetch Functions --- 
 
-async def _fetch_latest_commodity_or_rate(function_name: str, 
-                                          param_name: str, 
-                                          interval: str = "daily", 
-                                          value_suffix: str = "") -> Optional[Tuple[str, str]]:
-    """Helper to fetch latest data point for commodities or rates."""
+def parse_series(entries: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Alpha Vantage ``data`` entries as ascending (datetime64[D] dates, float values).
+
+    Placeholder values (".") and malformed entries are dropped; if a date
+    repeats, its last value wins.
+    """
+    dates, values = [], []
+    for entry in entries:
+        try:
+            value = float(entry["value"])
+            date = np.datetime64(entry["date"], "D")
+        except (KeyError, TypeError, ValueError):
+            continue
+        dates.append(date)
+        values.append(value)
+    dates = np.array(dates, dtype="datetime64[D]")
+    values = np.array(values, dtype=float)
+
+    # Newest-first upstream; sort ascending and keep one value per date
+    order = np.argsort(dates, kind="stable")
+    dates, values = dates[order], values[order]
+    keep = np.append(dates[1:] != dates[:-1], True)
+    return dates[keep], values[keep]
+
+async def _fetch_series(function_name: str, param_name: str, interval: str = "daily") -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Fetch a full commodity or rate series, parsed once into arrays."""
     params = {"interval": interval} if interval else {}
     data = await _fetch_alpha_vantage_data(function_name, params)
-    
-    if data and isinstance(data.get("data"), list) and len(data["data"]) > 0:
-        latest_entry = data["data"][0]
-        if "date" in latest_entry and "value" in latest_entry and latest_entry["value"] != ".": # Ignore placeholder values
-            date = latest_entry["date"]
-            value = latest_entry["value"]
-            logger.info(f"Fetched latest {param_name}: {date} -> {value}{value_suffix}")
-            return date, f"{value}{value_suffix}"
-        else:
-            logger.warning(f"{param_name} data missing 'date' or 'value', or value is placeholder: {latest_entry}")
+
+    if data and isinstance(data.get("data"), list):
+        dates, values = parse_series(data["data"])
+        if len(dates):
+            logger.info(f"Fetched {param_name}: {len(dates)} observations, latest {dates[-1]} -> {values[-1]}")
+            return dates, values
+        logger.warning(f"{param_name} series has no usable observations")
     else:
         logger.warning(f"Could not fetch or parse valid {param_name} data. Response: {str(data)[:200]}...")
     return None
 
+async def _fetch_latest_commodity_or_rate(function_name: str, 
+                                          param_name: str, 
+                                          interval: str = "daily", 
+                                          value_suffix: str = "") -> Optional[Tuple[str, str]]:
+    """Helper to fetch latest data point for commodities or rates."""
+    series = await _fetch_series(function_name, param_name, interval)
+    if series is None:
+        return None
+    dates, values = series
+    return str(dates[-1]), f"{values[-1]}{value_suffix}"
+
+# Indicator key -> (Alpha Vantage function, interval); keys match the MacroData fields
+MACRO_INDICATORS: Dict[str, Tuple[str, str]] = {
+    "cpi": ("CPI", "monthly"),
+    "fed_rate": ("FEDERAL_FUNDS_RATE", "daily"),
+    "unemployment": ("UNEMPLOYMENT", "monthly"),
+    "wti_oil": ("WTI", "daily"),
+    "brent_oil": ("BRENT", "daily"),
+    "natural_gas": ("NATURAL_GAS", "daily"),
+    "copper": ("COPPER", "daily"),
+    "corn": ("CORN", "daily"),
+    "wheat": ("WHEAT", "daily"),
+    "coffee": ("COFFEE", "daily"),
+    "sugar": ("SUGAR", "daily"),
+}
+
+async def fetch_indicator_series(indicator: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Full series of one of MACRO_INDICATORS as ascending (dates, values) arrays."""
+    function_name, interval = MACRO_INDICATORS[indicator]
+    return await _fetch_series(function_name, indicator, interval=interval)
+
 # --- Existing Indicators --- 
 async def fetch_latest_cpi() -> Optional[Tuple[str, str]]:
     return await _fetch_latest_commodity_or_rate("CPI", "CPI", interval="monthly")
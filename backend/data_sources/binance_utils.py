@@ -115,34 +115,27 @@ async def get_funding_rates() -> Dict[str, float]:
     """
     Fetch funding rates from Binance for all perpetual futures.
     Returns a dictionary mapping symbol to funding rate.
+
+    premiumIndex only carries a funding rate for perpetuals (delivery
+    contracts report an empty one), so no exchangeInfo lookup is needed.
     """
     try:
         async with aiohttp.ClientSession() as session:
-            # Get all perpetual futures symbols
-            async with session.get("https://fapi.binance.com/fapi/v1/exchangeInfo") as response:
+            async with session.get("https://fapi.binance.com/fapi/v1/premiumIndex") as response:
                 if response.status != 200:
-                    logger.error(f"Failed to get exchange info: {response.status}")
+                    logger.error(f"Failed to get funding rates: {response.status}")
                     return {}
-                
+
                 data = await response.json()
-                symbols = [s["symbol"] for s in data["symbols"] if s["contractType"] == "PERPETUAL"]
-                
-                # Get funding rates for all symbols
-                async with session.get("https://fapi.binance.com/fapi/v1/premiumIndex") as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to get funding rates: {response.status}")
-                        return {}
-                    
-                    data = await response.json()
-                    funding_rates = {
-                        item["symbol"]: float(item["lastFundingRate"]) 
-                        for item in data 
-                        if item["symbol"] in symbols
-                    }
-                    
-                    logger.info(f"Successfully fetched funding rates for {len(funding_rates)} pairs")
-                    return funding_rates
-                    
+                funding_rates = {
+                    item["symbol"]: float(item["lastFundingRate"])
+                    for item in data
+                    if item.get("lastFundingRate") not in (None, "")
+                }
+
+                logger.info(f"Successfully fetched funding rates for {len(funding_rates)} pairs")
+                return funding_rates
+
     except Exception as e:
         logger.error(f"Error fetching funding rates: {e}")
         return {} 
\ No newline at end of file
@@ -1,10 +1,18 @@
 import aiohttp
 import logging
 import asyncio
-from typing import Dict, Optional, Any
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+from datetime import datetime, timedelta
 import math
 from pydantic import BaseModel
+from sqlalchemy import select
+
+from app.core.cache import VersionedTTLCache
+from app.core.database import SessionLocal
+from app.core.rollups import INTERVAL_SECONDS
+from app.models.ohlcv_rollup import OhlcvRollup
+from data_sources.rate_limiter import Priority, get_limiter
+from data_sources.response_cache import cached_fetch
 
 logger = logging.getLogger(__name__)
 
@@ -24,30 +32,29 @@ except ImportError:
 
 BASE_URL = "https://api.coingecko.com/api/v3"
 
-# Rate limiting variables
-_last_request_time = datetime.now()
-_min_request_interval = 6.0  # seconds between requests to avoid rate limits
+# CoinGecko coin IDs and the symbols they are stored under locally
+COIN_SYMBOLS = {"bitcoin": "BTC", "ethereum": "ETH"}
+
+# Local rollup levels tried for volatility, finest first
+LOCAL_VOLATILITY_INTERVALS = ["1h", "1d"]
 
-async def fetch_coingecko_data(endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
+# Price histories keyed by (coin, days fetched)
+HISTORY_CACHE_TTL = 3600  # seconds
+_history_cache = VersionedTTLCache(ttl=HISTORY_CACHE_TTL)
+
+async def fetch_coingecko_data(
+    endpoint: str, params: Optional[Dict] = None, priority: Priority = Priority.BACKGROUND
+) -> Optional[Dict]:
     """Generic function to fetch data from CoinGecko API with rate limiting."""
-    global _last_request_time
     url = f"{BASE_URL}/{endpoint}"
     
-    # Implement rate limiting
-    now = datetime.now()
-    time_since_last_request = (now - _last_request_time).total_seconds()
-    if time_since_last_request < _min_request_interval:
-        sleep_time = _min_request_interval - time_since_last_request
-        logger.info(f"Rate limiting: Sleeping for {sleep_time:.2f}s before CoinGecko request")
-        await asyncio.sleep(sleep_time)
+    # Every CoinGecko request waits for a token from the shared per-host bucket
+    await get_limiter(url).acquire(priority)
     
     try:
         async with aiohttp.ClientSession() as session:
             logger.info(f"Fetching CoinGecko data from endpoint: {endpoint}")
             
-            # Update last request time
-            _last_request_time = datetime.now()
-            
             async with session.get(url, params=params, timeout=10) as response:
                 if response.status == 429:
                     logger.warning("CoinGecko API rate limit reached, will retry later")
@@ -90,7 +97,7 @@ async def fetch_coin_market_data(coins: list = ['bitcoin', 'ethereum']) -> Optio
         'include_last_updated_at': 'true'
     }
     
-    data = await fetch_coingecko_data('simple/price', params)
+    data = await fetch_coingecko_data('simple/price', params, Priority.CRITICAL)
     if data:
         logger.info(f"Successfully fetched market data for {len(data)} coins")
         return data
@@ -104,7 +111,11 @@ async def fetch_global_market_data() -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary with global data or None on error
     """
-    data = await fetch_coingecko_data('global')
+    # Dominance moves slowly; a persisted copy saves a token on every restart
+    data = await cached_fetch(
+        "coingecko:global", f"{BASE_URL}/global", None,
+        lambda: fetch_coingecko_data('global', priority=Priority.CRITICAL),
+    )
     if data:
         logger.info("Successfully fetched global market data")
         return data
@@ -134,74 +145,148 @@ async def fetch_coin_history(coin_id: str, days: int = 30) -> Optional[Dict[str,
     
     return None
 
-async def calculate_volatility(coin_id: str, days: int = 30, settings: Settings = None) -> float:
+async def _load_local_closes(coin_id: str, days: int) -> Optional[Tuple[List[float], int]]:
     """
-    Calculate historical volatility for a given cryptocurrency.
+    Read closes covering ``days`` from the locally stored OHLCV rollups.
+
+    Returns (closes, seconds per step) from the finest rollup level that
+    fully covers the window, or None when local history is too short or the
+    database is unavailable.
+    """
+    symbol = COIN_SYMBOLS.get(coin_id)
+    if symbol is None:
+        return None
+    
+    start = datetime.utcnow() - timedelta(days=days)
+    try:
+        async with SessionLocal() as session:
+            for interval in LOCAL_VOLATILITY_INTERVALS:
+                seconds = INTERVAL_SECONDS[interval]
+                result = await session.execute(
+                    select(OhlcvRollup.bucket, OhlcvRollup.close).where(
+                        OhlcvRollup.symbol == symbol,
+                        OhlcvRollup.interval == interval,
+                        OhlcvRollup.bucket >= start - timedelta(seconds=seconds),
+                    ).order_by(OhlcvRollup.bucket)
+                )
+                rows = result.all()
+                # Require the window to be covered end to end, allowing a few missing buckets
+                if rows and rows[0].bucket <= start and len(rows) >= days * 86400 // seconds * 0.9:
+                    return [row.close for row in rows], seconds
+    except Exception as e:
+        logger.warning(f"Local rollups unavailable for {coin_id} volatility: {e}")
+    return None
+
+
+async def _fetch_history_prices(coin_id: str, days: int, settings: Settings) -> Optional[List[float]]:
+    """Daily CoinGecko closes for ``days``, fetched at most once per coin per TTL."""
+    cached = _history_cache.get((coin_id, days), days)
+    if cached is not None:
+        return cached
+    
+    params = {
+        "vs_currency": "usd",
+        "days": str(days),
+        "interval": "daily"
+    }
+    if settings.coingecko_api_key:
+        params["x_cg_pro_api_key"] = settings.coingecko_api_key
+    
+    data = await fetch_coingecko_data(f"coins/{coin_id}/market_chart", params)
+    if not data or 'prices' not in data or not data['prices']:
+        logger.warning(f"No price data received for {coin_id}")
+        return None
+    
+    # Get just the prices from the [timestamp, price] pairs
+    prices = [price[1] for price in data['prices'] if isinstance(price, list) and len(price) > 1]
+    _history_cache.set((coin_id, days), days, prices)
+    return prices
+
+
+def _window_volatilities(prices: List[float], seconds: int, windows: Sequence[int]) -> Dict[int, float]:
+    """
+    Annualized volatility of the trailing ``windows`` (in days) of one price series.
+
+    With NumPy every window is derived at once from cumulative sums of the
+    log returns; otherwise each window falls back to the plain calculation.
+    """
+    steps_per_day = 86400 // seconds
+    steps = [days * steps_per_day for days in windows]
+    
+    if not HAS_NUMPY:
+        return {
+            days: _calculate_volatility_from_prices(prices[-(n + 1):]) * math.sqrt(steps_per_day)
+            for days, n in zip(windows, steps)
+        }
+    
+    log_returns = np.diff(np.log(np.asarray(prices, dtype=float)))
+    if len(log_returns) < 2:
+        return {days: 0.0 for days in windows}
+    
+    # Sums over the last n returns come from the reversed cumulative sums
+    total = np.concatenate(([0.0], np.cumsum(log_returns[::-1])))
+    total_sq = np.concatenate(([0.0], np.cumsum(log_returns[::-1] ** 2)))
+    n = np.clip(np.asarray(steps), 2, len(log_returns))
+    variance = (total_sq[n] - total[n] ** 2 / n) / (n - 1)
+    volatility = np.sqrt(np.maximum(variance, 0.0) * 365 * steps_per_day)
+    return {days: float(v) for days, v in zip(windows, volatility)}
+
+
+async def get_volatilities(
+    coin_id: str, windows: Sequence[int] = (7, 30), settings: Settings = None
+) -> Dict[int, float]:
+    """
+    Annualized volatilities for several trailing windows from one price history.
     
-    This function is self-contained and can work with or without NumPy.
-    It will use NumPy if available for optimized calculation, otherwise
-    falls back to a simple calculation using standard Python.
+    Local OHLCV rollups are used when they cover the longest window; otherwise
+    a single cached CoinGecko history fetch serves every window.
     
     Args:
         coin_id: CoinGecko coin ID
-        days: Number of days to look back (default: 30)
+        windows: Window lengths in days
         settings: App settings (optional)
     
     Returns:
-        float: The annualized volatility (or 0 if calculation fails)
+        Dictionary of window (days) -> annualized volatility (0 if unavailable)
     """
     if settings is None:
         # Create default settings instead of importing get_settings
         settings = Settings()
-        
+    
+    longest = max(windows)
     try:
-        # Fetch historical data
-        url = f"{settings.coingecko_base_url}/coins/{coin_id}/market_chart"
-        params = {
-            "vs_currency": "usd",
-            "days": str(days),
-            "interval": "daily"
-        }
+        local = await _load_local_closes(coin_id, longest)
+        if local is not None:
+            prices, seconds = local
+            logger.info(f"Calculating volatility for {coin_id} from {len(prices)} local closes")
+        else:
+            prices, seconds = await _fetch_history_prices(coin_id, longest, settings), 86400
         
-        if settings.coingecko_api_key:
-            params["x_cg_pro_api_key"] = settings.coingecko_api_key
-            
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        if "rate limit" in error_text.lower():
-                            logger.warning("CoinGecko API rate limit reached")
-                        else:
-                            logger.error(f"CoinGecko API error: {response.status} - {error_text}")
-                        return 0.0
-                        
-                    data = await response.json()
-                    
-                    # Extract price data
-                    if not data or 'prices' not in data or not data['prices']:
-                        logger.warning(f"No price data received for {coin_id}")
-                        return 0.0
-                        
-                    # Get just the prices from the [timestamp, price] pairs
-                    prices = [price[1] for price in data['prices'] if isinstance(price, list) and len(price) > 1]
-                    
-                    if len(prices) < 2:
-                        logger.warning(f"Insufficient price data for {coin_id}: {len(prices)} points")
-                        return 0.0
-                        
-                    # Calculate volatility
-                    logger.info(f"Calculating volatility for {coin_id} with {len(prices)} price points")
-                    return _calculate_volatility_from_prices(prices)
-                    
-            except aiohttp.ClientError as e:
-                logger.error(f"Error fetching CoinGecko data: {e}")
-                return 0.0
-                
+        if not prices or len(prices) < 3:
+            logger.warning(f"Insufficient price data for {coin_id}")
+            return {days: 0.0 for days in windows}
+        
+        return _window_volatilities(prices, seconds, windows)
+    
     except Exception as e:
         logger.error(f"Volatility calculation failed: {e}", exc_info=True)
-        return 0.0
+        return {days: 0.0 for days in windows}
+
+
+async def calculate_volatility(coin_id: str, days: int = 30, settings: Settings = None) -> float:
+    """
+    Calculate historical volatility for a given cryptocurrency.
+    
+    Args:
+        coin_id: CoinGecko coin ID
+        days: Number of days to look back (default: 30)
+        settings: App settings (optional)
+    
+    Returns:
+        float: The annualized volatility (or 0 if calculation fails)
+    """
+    volatilities = await get_volatilities(coin_id, (days,), settings)
+    return volatilities[days]
 
 def _calculate_volatility_from_prices(prices):
     """
@@ -300,11 +385,15 @@ async def get_enhanced_market_data() -> Dict[str, Dict[str, Any]]:
         result['btc']['dominance'] = dominance.get('btc', 0)
         result['eth']['dominance'] = dominance.get('eth', 0)
     
-    # Calculate volatility metrics - this is now more robust with internal error handling
-    result['btc']['volatility_7d'] = await calculate_volatility('bitcoin', 7)
-    result['btc']['volatility_30d'] = await calculate_volatility('bitcoin', 30)
-    result['eth']['volatility_7d'] = await calculate_volatility('ethereum', 7)
-    result['eth']['volatility_30d'] = await calculate_volatility('ethereum', 30)
+    # One history per coin serves both volatility windows
+    btc_vol, eth_vol = await asyncio.gather(
+        get_volatilities('bitcoin', (7, 30)),
+        get_volatilities('ethereum', (7, 30)),
+    )
+    result['btc']['volatility_7d'] = btc_vol[7]
+    result['btc']['volatility_30d'] = btc_vol[30]
+    result['eth']['volatility_7d'] = eth_vol[7]
+    result['eth']['volatility_30d'] = eth_vol[30]
         
     logger.info(f"Compiled enhanced market data for BTC and ETH")
     return result 
\ No newline at end of file
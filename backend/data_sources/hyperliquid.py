@@ -6,8 +6,16 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Deque, Set
 from collections import deque # For storing recent liquidations (if we switch back) or limited data
 import time
+import random
+import numpy as np
 from pydantic_settings import BaseSettings
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from data_sources.realized_volatility import RealizedVolatilityTracker
+from data_sources.hyperliquid_contexts import AssetContextTable, decode_message, meta_and_asset_ctxs
+from data_sources.liquidation_stream import from_hyperliquid, get_liquidation_stream
+from data_sources.liquidation_heatmap import LiquidationHeatmap, fetch_clearinghouse_states, positions_from_state
+from app.core.config import settings as app_settings
 
 # REMOVED: LiquidationPosition import as it's not used here anymore
 # from app.models.schemas import LiquidationPosition 
@@ -19,16 +27,23 @@ import logging
 logger = logging.getLogger(__name__)
 
 # --- Configuration ---
-# REMOVED: Configuration related to close position calculation
-# LIQUIDATION_THRESHOLD_PERCENT = 8.0
-# CALCULATION_INTERVAL_SECONDS = 2
-# MAX_POSITIONS_TO_STORE = 10000
-# MAX_CLOSE_POSITIONS_TO_REPORT = 50
+CALCULATION_INTERVAL_SECONDS = 2
+MAX_CLOSE_POSITIONS_TO_REPORT = 50
+
+# How often the full asset context snapshot is re-requested over the socket
+ASSET_CTX_REFRESH_SECONDS = 5
 
 class Settings(BaseModel):
     hyperliquid_base_url: str = "https://api.hyperliquid.xyz"
     hyperliquid_ws_url: str = "wss://api.hyperliquid.xyz/ws"
     hyperliquid_info_url: str = "https://api.hyperliquid.xyz/info"
+    # Application-level pings; the server drops connections idle for 60s
+    hyperliquid_heartbeat_interval: float = 30.0
+    hyperliquid_retry_base_delay: float = 1.0
+    hyperliquid_retry_max_delay: float = 60.0
+    # Accounts whose positions feed the liquidation heatmap
+    watched_addresses: List[str] = Field(default_factory=lambda: list(app_settings.HYPERLIQUID_WATCHED_ADDRESSES))
+    positions_refresh_interval: float = Field(default_factory=lambda: app_settings.LIQUIDATION_HEATMAP_REFRESH_INTERVAL)
     
 class HyperliquidService:
     def __init__(self, settings: Settings):
@@ -36,69 +51,130 @@ class HyperliquidService:
         self.settings = settings
         self.websocket_connected = False
         self.all_mark_prices = {}
-        self.all_positions = {}
+        self.all_positions = {}  # address -> open positions, from clearinghouse states
         self.exchange_info = None  # Exchange info attribute
-        self.liquidations = []
-        self.position_risks = []
+        self.liquidation_stream = get_liquidation_stream()  # Shared with the other venues
+        self.position_risks = []  # Positions nearest to liquidation
+        self.liquidation_heatmap = LiquidationHeatmap()
+        self.positions_loaded_at = 0.0
         self.periodic_calculator_task = None
         self.broadcast_task = None
         self.connection_retries = 0
-        self.max_retries = 10
-        self.base_retry_delay = 1.0
+        self.connection_task = None  # The one supervisor owning the WebSocket
         self.ws = None
         self.last_update = time.time()
         self.mark_prices = {}
+        self.realized_volatility = RealizedVolatilityTracker()  # Fed from the mark price stream
+        self.asset_contexts = AssetContextTable()  # Funding, OI, mark/oracle, premium per coin
+        self._post_id = 0
         self._lock = asyncio.Lock()  # For thread-safe operations
         logger.info("HyperliquidService initialized")
 
+    @property
+    def liquidations(self):
+        """Hyperliquid events in the shared liquidation stream, oldest first."""
+        return self.liquidation_stream.buffer("hyperliquid")
+
     @property
     def connected(self):
         """Check if the websocket is connected."""
         return self.ws is not None and not self.ws.closed
 
-    async def connect(self):
-        """Establish connection to Hyperliquid API and set up data streams."""
+    def start(self):
+        """
+        Start the connection supervisor and the calculator, once.
+
+        Safe to call repeatedly: while the supervisor task is alive no new
+        task is created, however long the endpoint has been unreachable.
+        """
+        if self.connection_task is None or self.connection_task.done():
+            self.connection_task = asyncio.create_task(self._run())
+            logger.info("Hyperliquid connection supervisor started")
+        if self.periodic_calculator_task is None or self.periodic_calculator_task.done():
+            self.periodic_calculator_task = asyncio.create_task(self.periodic_calculator())
+            logger.info("Periodic calculator task started")
+
+    async def stop(self):
+        """Cancel the supervisor and calculator and close the WebSocket."""
+        for task in (self.connection_task, self.periodic_calculator_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.connection_task = self.periodic_calculator_task = None
+        await self._close_websocket()
+
+    async def _run(self):
+        """Connect, subscribe and serve the socket; reconnect with jittered backoff for ever."""
+        # First try to fetch exchange info
         try:
-            logger.info("Connecting to Hyperliquid API...")
-            
-            # First try to fetch exchange info
-            try:
-                await self.fetch_exchange_info()
-            except Exception as e:
-                logger.error(f"Error fetching exchange info: {e}")
-                # Initialize with empty dict if fetch fails
-                self.exchange_info = {}
-                
-            # Create sample data regardless of connection success
-            await self._create_sample_data()
+            await self.fetch_exchange_info()
+        except Exception as e:
+            logger.error(f"Error fetching exchange info: {e}")
+            # Initialize with empty dict if fetch fails
+            self.exchange_info = {}
             
-            # Try to establish WebSocket connection
+        # Create sample data regardless of connection success
+        await self._create_sample_data()
+        
+        while True:
+            connected_at = None
             try:
-                await self._connect_websocket()
-                
-                if self.connected:
-                    logger.info("WebSocket connected. Subscribing to channels...")
-                    await self._subscribe_to_channels()
-                    
-                    # Start the message handler
-                    asyncio.create_task(self._handle_messages())
-                    
+                if await self._connect_websocket() and await self._subscribe_to_channels():
+                    connected_at = time.time()
                     logger.info("Hyperliquid connection sequence completed successfully")
-                else:
-                    logger.warning("Failed to establish WebSocket connection, using sample data only")
+                    await self._serve_connection()
             except Exception as e:
-                logger.error(f"WebSocket connection error: {e}")
-                
-            # Start the periodic calculator task regardless
-            asyncio.create_task(self.periodic_calculator())
-            logger.info("Periodic calculator task started")
-            
-            return True
-                
-        except Exception as e:
-            logger.error(f"Error during connect sequence: {e}", exc_info=True)
-            return False
+                logger.error(f"Hyperliquid connection error: {e}", exc_info=True)
+            finally:
+                await self._close_websocket()
             
+            # Only a connection that stayed up resets the backoff, so a flapping
+            # endpoint is retried at a slowing rate
+            if connected_at is not None and time.time() - connected_at >= self.settings.hyperliquid_retry_max_delay:
+                self.connection_retries = 0
+            delay = self._retry_delay()
+            self.connection_retries += 1
+            logger.warning(f"Hyperliquid WebSocket down, reconnecting in {delay:.1f}s (attempt {self.connection_retries})")
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self) -> float:
+        """Exponential backoff with jitter, capped at the maximum delay."""
+        delay = min(
+            self.settings.hyperliquid_retry_max_delay,
+            self.settings.hyperliquid_retry_base_delay * 2 ** self.connection_retries,
+        )
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _serve_connection(self):
+        """Run the reader, heartbeat and snapshot refresher until any of them ends."""
+        tasks = [
+            asyncio.create_task(self._handle_messages()),
+            asyncio.create_task(self._heartbeat()),
+            asyncio.create_task(self._poll_asset_contexts()),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _heartbeat(self):
+        """Ping on an interval; give up on the socket if nothing has arrived for two intervals."""
+        interval = self.settings.hyperliquid_heartbeat_interval
+        while self.connected:
+            await asyncio.sleep(interval)
+            if time.time() - self.last_update > 2 * interval:
+                logger.warning("No Hyperliquid messages within two heartbeat intervals, reconnecting")
+                return
+            try:
+                await self.ws.send(json.dumps({"method": "ping"}))
+            except websockets.exceptions.ConnectionClosed:
+                return
+
     async def fetch_exchange_info(self):
         """Fetch exchange information from the Hyperliquid API."""
         try:
@@ -129,7 +205,9 @@ class HyperliquidService:
         """Establish WebSocket connection with retry mechanism."""
         try:
             logger.info(f"Connecting to WebSocket: {self.settings.hyperliquid_ws_url}")
-            self.ws = await websockets.connect(self.settings.hyperliquid_ws_url)
+            # Liveness is checked with Hyperliquid's own ping/pong messages
+            self.ws = await websockets.connect(self.settings.hyperliquid_ws_url, ping_interval=None)
+            self.last_update = time.time()
             logger.info("WebSocket connection established")
             return True
         except Exception as e:
@@ -137,6 +215,14 @@ class HyperliquidService:
             self.ws = None
             return False
 
+    async def _close_websocket(self):
+        if self.ws is not None:
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+
     async def _subscribe_to_channels(self):
         """Subscribe to required WebSocket channels."""
         try:
@@ -159,12 +245,10 @@ class HyperliquidService:
                 }))
                 logger.info("Subscribed to liquidations channel")
                 
-                # Subscribe to metaAndAssetCtxs channel
-                await self.ws.send(json.dumps({
-                    "method": "subscribe", 
-                    "subscription": {"type": "metaAndAssetCtxs"}
-                }))
-                logger.info("Subscribed to metaAndAssetCtxs channel")
+                # metaAndAssetCtxs is an info request, not a subscription, so
+                # ask for it over the socket instead of polling REST
+                await self._request_asset_contexts()
+                logger.info("Requested metaAndAssetCtxs snapshot")
                 
                 return True
             except Exception as e:
@@ -174,6 +258,24 @@ class HyperliquidService:
             logger.error(f"Unexpected error in _subscribe_to_channels: {str(e)}", exc_info=True)
             return False
             
+    async def _request_asset_contexts(self):
+        """Send a WebSocket post for the metaAndAssetCtxs universe snapshot."""
+        self._post_id += 1
+        await self.ws.send(json.dumps({
+            "method": "post",
+            "id": self._post_id,
+            "request": {"type": "info", "payload": {"type": "metaAndAssetCtxs"}}
+        }))
+
+    async def _poll_asset_contexts(self):
+        """Refresh the asset context snapshot while the socket is open."""
+        while self.connected:
+            await asyncio.sleep(ASSET_CTX_REFRESH_SECONDS)
+            try:
+                await self._request_asset_contexts()
+            except websockets.exceptions.ConnectionClosed:
+                break
+
     async def _handle_messages(self):
         """Process incoming WebSocket messages."""
         if not self.ws:
@@ -183,14 +285,23 @@ class HyperliquidService:
         try:
             async for message in self.ws:
                 try:
-                    data = json.loads(message)
+                    channel, data = decode_message(message)
                     self.last_update = time.time()
                     
                     # Process different message types
-                    if "allMids" in data:
-                        await self._process_mark_prices(data["allMids"])
-                    elif "liquidation" in data:
-                        await self._process_liquidations(data["liquidation"])
+                    if channel == "allMids":
+                        await self._process_mark_prices(data.get("mids", {}))
+                    elif channel == "liquidations":
+                        await self._process_liquidations(data)
+                    elif channel == "activeAssetCtx":
+                        self.asset_contexts.update_asset(data["coin"], data["ctx"])
+                    elif channel == "error":
+                        logger.warning(f"Hyperliquid error message: {data}")
+                    else:
+                        snapshot = meta_and_asset_ctxs(channel, data)
+                        if snapshot is not None:
+                            self.asset_contexts.update_universe(*snapshot)
+                            logger.debug(f"Updated asset contexts for {len(self.asset_contexts)} coins")
                         
                 except json.JSONDecodeError:
                     logger.warning(f"Received invalid JSON message: {message[:100]}...")
@@ -203,45 +314,64 @@ class HyperliquidService:
             logger.error(f"Unexpected error in message handler: {str(e)}", exc_info=True)
             
     async def _process_mark_prices(self, data):
-        """Process mark prices from WebSocket."""
+        """Process the allMids coin -> price mapping from WebSocket."""
         try:
-            for item in data:
-                if isinstance(item, list) and len(item) >= 2:
-                    coin, price = item[0], float(item[1])
-                    self.all_mark_prices[coin] = price
+            now = time.time()
+            for coin, price in data.items():
+                price = float(price)
+                self.all_mark_prices[coin] = price
+                self.realized_volatility.update(coin, price, now)
+            self.asset_contexts.update_mids(data)
                     
             logger.debug(f"Updated mark prices for {len(self.all_mark_prices)} coins")
         except Exception as e:
             logger.error(f"Error processing mark prices: {str(e)}", exc_info=True)
             
     async def _process_liquidations(self, data):
-        """Process liquidation events from WebSocket."""
+        """Normalize liquidation events from WebSocket into the shared stream."""
         try:
-            if data:
-                # Add timestamp to the liquidation data
-                data["timestamp"] = time.time()
-                
-                # Add to recent liquidations, keeping only the most recent events
-                self.liquidations.append(data)
-                if len(self.liquidations) > 100:  # Keep only last 100 liquidations
-                    self.liquidations.pop(0)
-                    
-                logger.info(f"Received liquidation: {data.get('coin')} - {data.get('side')} - {data.get('quoteSize')}")
+            for item in data if isinstance(data, list) else [data]:
+                event = from_hyperliquid(item) if item else None
+                if event is None:
+                    continue
+                self.liquidation_stream.publish(event)
+                logger.info(f"Received liquidation: {event.coin} - {event.side} - {event.value_usd}")
         except Exception as e:
             logger.error(f"Error processing liquidation data: {str(e)}", exc_info=True)
             
+    def current_marks(self) -> Dict[str, float]:
+        """
+        Latest streamed price per coin: the mark from asset contexts, else the
+        mid. The sample prices in all_mark_prices are never used.
+        """
+        marks = self.asset_contexts.column("mark_price")
+        marks = np.where(np.isnan(marks), self.asset_contexts.column("mid_price"), marks)
+        return {coin: mark for coin, mark in zip(self.asset_contexts.names, marks.tolist()) if mark == mark}
+
+    async def load_positions(self):
+        """Load clearinghouse states of the watched addresses in bulk and rebuild the heatmap."""
+        states = await fetch_clearinghouse_states(self.settings.watched_addresses, self.settings.hyperliquid_info_url)
+        self.all_positions = {address: positions_from_state(address, state) for address, state in states.items()}
+        positions = [position for rows in self.all_positions.values() for position in rows]
+        self.liquidation_heatmap.load(positions, self.current_marks())
+        self.positions_loaded_at = time.time()
+
     async def periodic_calculator(self):
         """Periodically calculate position risks based on current data."""
         try:
             while True:
                 try:
-                    positions_count = len(self.all_positions)
-                    prices_count = len(self.all_mark_prices)
-                    logger.debug(f"Checking {positions_count} positions against {prices_count} mark prices")
-                    
-                    # Calculation can be added here
+                    if (self.settings.watched_addresses
+                            and time.time() - self.positions_loaded_at >= self.settings.positions_refresh_interval):
+                        await self.load_positions()
+                    else:
+                        # Only buckets crossed by the mark moves are touched
+                        liquidated = self.liquidation_heatmap.apply_marks(self.current_marks())
+                        for coin, notional in liquidated.items():
+                            logger.info(f"Mark move through liquidation levels: {coin} ${notional:,.0f}")
+                    self.position_risks = self.liquidation_heatmap.closest(MAX_CLOSE_POSITIONS_TO_REPORT)
                     
-                    await asyncio.sleep(2)  # Run every 2 seconds
+                    await asyncio.sleep(CALCULATION_INTERVAL_SECONDS)
                 except asyncio.CancelledError:
                     logger.info("Periodic calculator task cancelled")
                     break
@@ -274,37 +404,41 @@ class HyperliquidService:
             recent_liquidations = []
             for liq in self.liquidations:
                 recent_liquidations.append({
-                    "coin": liq.get("coin", "unknown"),
-                    "side": liq.get("side", "unknown"),
-                    "size": liq.get("quantity", 0),
-                    "value_usd": liq.get("quoteSize", 0),
-                    "price": liq.get("price", 0),
-                    "timestamp": int(liq.get("timestamp", current_time) * 1000)  # Convert to milliseconds
+                    "coin": liq.coin,
+                    "side": liq.side,
+                    "size": liq.size,
+                    "value_usd": liq.value_usd,
+                    "price": liq.price,
+                    "timestamp": int(liq.timestamp * 1000)  # Convert to milliseconds
                 })
                 
+            # Funding and OI from the asset context stream, sample values until it arrives
+            btc_ctx = self.asset_contexts.get("BTC") or {}
+            eth_ctx = self.asset_contexts.get("ETH") or {}
+            
             # Create sample market data
             market_data = {
                 "btc": {
                     "price": btc_price,
                     "volume_24h": 15000000000,
-                    "open_interest": 5000000000,
-                    "funding_rate": 0.0001,
+                    "open_interest": btc_ctx.get("open_interest_usd") or 5000000000,
+                    "funding_rate": btc_ctx["funding"] if btc_ctx.get("funding") is not None else 0.0001,
                     "price_change_percent": 2.5,
                     "market_cap": 580000000000,
                     "dominance": 51.2,
-                    "volatility_7d": 0.022,
-                    "volatility_30d": 0.035
+                    "volatility_7d": self.realized_volatility.volatility("BTC", "7d"),
+                    "volatility_30d": self.realized_volatility.volatility("BTC", "30d")
                 },
                 "eth": {
                     "price": eth_price,
                     "volume_24h": 8000000000,
-                    "open_interest": 2000000000,
-                    "funding_rate": 0.00008,
+                    "open_interest": eth_ctx.get("open_interest_usd") or 2000000000,
+                    "funding_rate": eth_ctx["funding"] if eth_ctx.get("funding") is not None else 0.00008,
                     "price_change_percent": 1.8,
                     "market_cap": 276000000000,
                     "dominance": 18.5,
-                    "volatility_7d": 0.025,
-                    "volatility_30d": 0.04
+                    "volatility_7d": self.realized_volatility.volatility("ETH", "7d"),
+                    "volatility_30d": self.realized_volatility.volatility("ETH", "30d")
                 }
             }
             
@@ -350,23 +484,8 @@ class HyperliquidService:
         """Create sample data for demonstration purposes."""
         logger.info("Creating sample data for demonstration")
         
-        # Add sample liquidations
-        sample_liquidations = [
-            {"coin": "BTC", "side": "long", "quantity": 0.5, "quoteSize": 15000, "price": 30000, "timestamp": time.time()},
-            {"coin": "ETH", "side": "short", "quantity": 5.2, "quoteSize": 12000, "price": 2300, "timestamp": time.time() - 120},
-            {"coin": "SOL", "side": "long", "quantity": 120, "quoteSize": 8000, "price": 66.5, "timestamp": time.time() - 240},
-            {"coin": "DOGE", "side": "short", "quantity": 50000, "quoteSize": 5000, "price": 0.1, "timestamp": time.time() - 360},
-            {"coin": "XRP", "side": "long", "quantity": 10000, "quoteSize": 4500, "price": 0.45, "timestamp": time.time() - 480},
-            {"coin": "BNB", "side": "long", "quantity": 12, "quoteSize": 3600, "price": 300, "timestamp": time.time() - 600},
-            {"coin": "ADA", "side": "short", "quantity": 8000, "quoteSize": 3000, "price": 0.38, "timestamp": time.time() - 720},
-            {"coin": "AVAX", "side": "long", "quantity": 200, "quoteSize": 2800, "price": 14, "timestamp": time.time() - 840},
-            {"coin": "LINK", "side": "short", "quantity": 180, "quoteSize": 2200, "price": 12, "timestamp": time.time() - 960},
-            {"coin": "DOT", "side": "long", "quantity": 300, "quoteSize": 1800, "price": 6, "timestamp": time.time() - 1080}
-        ]
-        
-        # Add sample data to liquidations
-        self.liquidations = sample_liquidations  # Replace instead of extend to ensure clean state
-        logger.info(f"Added {len(sample_liquidations)} sample liquidations for demonstration")
+        # No sample liquidations: the shared stream feeds the dashboard, so
+        # only real events are published to it
         
         # Add sample mark prices
         self.all_mark_prices = {
@@ -390,21 +509,22 @@ class HyperliquidService:
 _service_instance: Optional[HyperliquidService] = None
 
 async def get_hyperliquid_service() -> HyperliquidService:
-    """Singleton accessor for HyperliquidService."""
+    """Singleton accessor for HyperliquidService; its supervisor handles reconnects."""
     global _service_instance
     if _service_instance is None:
         logger.info("Creating new HyperliquidService instance")
         settings = Settings()  # Create settings with default values
         _service_instance = HyperliquidService(settings)
-        # Auto-connect when first requested
-        asyncio.create_task(_service_instance.connect())
-        logger.info("Connect task created for HyperliquidService")
-    elif not _service_instance.connected:
-        # If existing instance but not connected, reconnect
-        logger.info("Reconnecting existing HyperliquidService instance")
-        asyncio.create_task(_service_instance.connect())
+    # Auto-connect when first requested; a no-op while the supervisor runs
+    _service_instance.start()
     return _service_instance
 
+def get_realized_volatility(symbol: str, window: str) -> Optional[float]:
+    """Realized volatility from the running service, without starting one."""
+    if _service_instance is None:
+        return None
+    return _service_instance.realized_volatility.volatility(symbol, window)
+
 # --- Public API Functions ---
 
 async def fetch_market_data():
@@ -521,6 +641,9 @@ async def fetch_market_data():
             
             # Get service instance for any available data
             service = await get_hyperliquid_service()
+            # Open interest from the asset context stream, as broadcast_data uses
+            btc_ctx = service.asset_contexts.get("BTC") or {}
+            eth_ctx = service.asset_contexts.get("ETH") or {}
             
             # Create market data for BTC
             btc_spot = spot_data_by_symbol.get("BTC", {})
@@ -538,13 +661,13 @@ async def fetch_market_data():
                 "spread_percent": btc_book.get("spread_percent", 0),
                 "depth": depth_data.get("BTC", {"bids": [], "asks": []}),
                 "volume_24h": btc_spot.get("volume_24h", 15000000000),
-                "open_interest": 5000000000,  # Fallback value
+                "open_interest": btc_ctx.get("open_interest_usd"),
                 "funding_rate": btc_futures.get("funding_rate", 0.0001),
                 "price_change_percent": btc_spot.get("price_change_percent", 0.025),
                 "market_cap": COIN_MARKET_CAP_FALLBACK["BTC"]["market_cap"],
                 "dominance": COIN_MARKET_CAP_FALLBACK["BTC"]["dominance"],
-                "volatility_7d": 0.022,  # Fallback value
-                "volatility_30d": 0.035  # Fallback value
+                "volatility_7d": service.realized_volatility.volatility("BTC", "7d"),
+                "volatility_30d": service.realized_volatility.volatility("BTC", "30d")
             }
             
             # Create market data for ETH
@@ -563,30 +686,29 @@ async def fetch_market_data():
                 "spread_percent": eth_book.get("spread_percent", 0),
                 "depth": depth_data.get("ETH", {"bids": [], "asks": []}),
                 "volume_24h": eth_spot.get("volume_24h", 8000000000),
-                "open_interest": 2000000000,  # Fallback value
+                "open_interest": eth_ctx.get("open_interest_usd"),
                 "funding_rate": eth_futures.get("funding_rate", 0.00008),
                 "price_change_percent": eth_spot.get("price_change_percent", 0.018),
                 "market_cap": COIN_MARKET_CAP_FALLBACK["ETH"]["market_cap"],
                 "dominance": COIN_MARKET_CAP_FALLBACK["ETH"]["dominance"],
-                "volatility_7d": 0.025,  # Fallback value
-                "volatility_30d": 0.04  # Fallback value
+                "volatility_7d": service.realized_volatility.volatility("ETH", "7d"),
+                "volatility_30d": service.realized_volatility.volatility("ETH", "30d")
             }
             
-            # Try to fetch open interest from Binance Futures
+            # Coins without an asset context yet take open interest from Binance Futures
             try:
-                async with session.get("https://fapi.binance.com/fapi/v1/openInterest?symbol=BTCUSDT") as response:
-                    if response.status == 200:
-                        oi_data = await response.json()
-                        if isinstance(oi_data, dict) and "openInterest" in oi_data:
-                            btc_data["open_interest"] = float(oi_data["openInterest"]) * btc_price
-                
-                async with session.get("https://fapi.binance.com/fapi/v1/openInterest?symbol=ETHUSDT") as response:
-                    if response.status == 200:
-                        oi_data = await response.json()
-                        if isinstance(oi_data, dict) and "openInterest" in oi_data:
-                            eth_data["open_interest"] = float(oi_data["openInterest"]) * eth_price
+                for coin_data, symbol, price in ((btc_data, "BTCUSDT", btc_price), (eth_data, "ETHUSDT", eth_price)):
+                    if coin_data["open_interest"]:
+                        continue
+                    async with session.get(f"https://fapi.binance.com/fapi/v1/openInterest?symbol={symbol}") as response:
+                        if response.status == 200:
+                            oi_data = await response.json()
+                            if isinstance(oi_data, dict) and "openInterest" in oi_data:
+                                coin_data["open_interest"] = float(oi_data["openInterest"]) * price
             except Exception as oi_error:
                 logger.warning(f"Failed to fetch open interest data: {oi_error}")
+            btc_data["open_interest"] = btc_data["open_interest"] or 5000000000  # Fallback value
+            eth_data["open_interest"] = eth_data["open_interest"] or 2000000000  # Fallback value
         
         # Combine data
         market_data = {
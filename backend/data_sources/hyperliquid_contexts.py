@@ -0,0 +1,147 @@
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Table column -> field of a Hyperliquid perp asset context
+CTX_FIELDS: Dict[str, str] = {
+    "funding": "funding",
+    "open_interest": "openInterest",
+    "mark_price": "markPx",
+    "oracle_price": "oraclePx",
+    "mid_price": "midPx",
+    "premium": "premium",
+    "volume_24h": "dayNtlVlm",
+    "prev_day_price": "prevDayPx",
+}
+COLUMNS = list(CTX_FIELDS)
+_COLUMN_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+
+
+def _number(value: Any) -> float:
+    """Hyperliquid sends decimals as strings and missing values as null."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def decode_message(raw: str) -> Tuple[Optional[str], Any]:
+    """
+    Split a Hyperliquid WebSocket message into (channel, data).
+
+    Every server message is an envelope ``{"channel": ..., "data": ...}``;
+    anything else decodes to (None, None).
+    """
+    message = json.loads(raw)
+    if not isinstance(message, dict) or "channel" not in message:
+        return None, None
+    return message["channel"], message.get("data")
+
+
+def meta_and_asset_ctxs(channel: Optional[str], data: Any) -> Optional[List[Any]]:
+    """
+    The ``[meta, assetCtxs]`` pair carried by a message, if any: either a
+    ``metaAndAssetCtxs`` channel push or the response to a WebSocket ``post``
+    info request for it.
+    """
+    if channel == "metaAndAssetCtxs":
+        payload = data
+    elif channel == "post" and isinstance(data, dict):
+        response = (data.get("response") or {}).get("payload") or {}
+        if response.get("type") != "metaAndAssetCtxs":
+            return None
+        payload = response.get("data")
+    else:
+        return None
+    if isinstance(payload, list) and len(payload) == 2:
+        return payload
+    return None
+
+
+class AssetContextTable:
+    """
+    Per-asset perp contexts (funding, OI, mark/oracle/mid price, premium, 24h
+    volume) held in one float matrix, one row per coin.
+
+    Rows are assigned once per coin and overwritten in place, so a universe
+    snapshot is a single fancy-indexed assignment and reads of a column across
+    all coins are array slices. Missing values are NaN.
+    """
+
+    def __init__(self, capacity: int = 256, clock=time.time):
+        self.clock = clock
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.values = np.full((capacity, len(COLUMNS)), np.nan)
+        self.updated_at = np.zeros(capacity)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, coin: str) -> bool:
+        return coin in self.index
+
+    def _rows(self, coins: List[str]) -> np.ndarray:
+        for coin in coins:
+            if coin not in self.index:
+                self.index[coin] = len(self.names)
+                self.names.append(coin)
+        if len(self.names) > len(self.values):
+            capacity = max(len(self.names), 2 * len(self.values))
+            values = np.full((capacity, len(COLUMNS)), np.nan)
+            values[:len(self.values)] = self.values
+            updated_at = np.zeros(capacity)
+            updated_at[:len(self.updated_at)] = self.updated_at
+            self.values, self.updated_at = values, updated_at
+        return np.fromiter((self.index[coin] for coin in coins), dtype=np.int64, count=len(coins))
+
+    def update_contexts(self, coins: List[str], ctxs: List[Dict[str, Any]]) -> None:
+        """Overwrite the rows of ``coins`` with the matching contexts."""
+        if not coins:
+            return
+        matrix = np.array(
+            [[_number(ctx.get(field)) for field in CTX_FIELDS.values()] for ctx in ctxs], dtype=float
+        ).reshape(len(ctxs), len(COLUMNS))
+        rows = self._rows(coins)
+        self.values[rows] = matrix
+        self.updated_at[rows] = self.clock()
+
+    def update_universe(self, meta: Dict[str, Any], ctxs: List[Dict[str, Any]]) -> None:
+        """Apply a ``metaAndAssetCtxs`` snapshot; contexts are aligned with ``meta["universe"]``."""
+        universe = meta.get("universe") or []
+        count = min(len(universe), len(ctxs))
+        self.update_contexts([asset["name"] for asset in universe[:count]], ctxs[:count])
+
+    def update_asset(self, coin: str, ctx: Dict[str, Any]) -> None:
+        """Apply a single-asset context, e.g. from the ``activeAssetCtx`` channel."""
+        self.update_contexts([coin], [ctx])
+
+    def update_mids(self, mids: Dict[str, Any]) -> None:
+        """Refresh mid prices of known coins from an ``allMids`` push."""
+        coins = [coin for coin in mids if coin in self.index]
+        if coins:
+            rows = np.fromiter((self.index[coin] for coin in coins), dtype=np.int64, count=len(coins))
+            self.values[rows, _COLUMN_INDEX["mid_price"]] = [_number(mids[coin]) for coin in coins]
+
+    def column(self, name: str) -> np.ndarray:
+        """One column for every known coin, in ``names`` order (a view)."""
+        return self.values[:len(self.names), _COLUMN_INDEX[name]]
+
+    def get(self, coin: str) -> Optional[Dict[str, Optional[float]]]:
+        """The context of ``coin`` with open interest also in USD, or None if unknown."""
+        row = self.index.get(coin)
+        if row is None:
+            return None
+        ctx = {name: (None if np.isnan(value) else float(value)) for name, value in zip(COLUMNS, self.values[row])}
+        if ctx["open_interest"] is not None and ctx["mark_price"] is not None:
+            ctx["open_interest_usd"] = ctx["open_interest"] * ctx["mark_price"]
+        else:
+            ctx["open_interest_usd"] = None
+        ctx["updated_at"] = float(self.updated_at[row])
+        return ctx
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Every coin's context, for APIs."""
+        return [{"coin": coin, **self.get(coin)} for coin in self.names]
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiohttp
+import numpy as np
+
+from data_sources.rate_limiter import get_limiter
+
+logger = logging.getLogger(__name__)
+
+BUCKET_BPS = 25.0  # Heatmap bucket width, in basis points of the mark when a book is built
+MAX_DISTANCE = 1.0  # Positions liquidating further than this fraction from the mark are left out
+DEFAULT_MAX_LEVERAGE = 50
+
+
+def _number(value: Any, default: float = np.nan) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def positions_from_state(address: str, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Open perp positions of one Hyperliquid ``clearinghouseState`` response,
+    with the margin available to each before liquidation.
+
+    Cross positions share the account's equity above its cross maintenance
+    margin; isolated positions only have their own margin above maintenance.
+    """
+    cross_available = (
+        _number((state.get("crossMarginSummary") or {}).get("accountValue"), 0.0)
+        - _number(state.get("crossMaintenanceMarginUsed"), 0.0)
+    )
+    positions = []
+    for entry in state.get("assetPositions") or []:
+        position = entry.get("position") or {}
+        size = _number(position.get("szi"), 0.0)
+        value = _number(position.get("positionValue"), 0.0)
+        if size == 0 or value <= 0:
+            continue
+        max_leverage = _number(position.get("maxLeverage"), DEFAULT_MAX_LEVERAGE) or DEFAULT_MAX_LEVERAGE
+        maintenance_rate = 1 / (2 * max_leverage)
+        leverage_type = (position.get("leverage") or {}).get("type", "cross")
+        if leverage_type == "isolated":
+            margin_available = _number(position.get("marginUsed"), 0.0) - value * maintenance_rate
+        else:
+            margin_available = cross_available
+        positions.append({
+            "address": address,
+            "coin": position.get("coin"),
+            "size": size,
+            "entry_price": _number(position.get("entryPx")),
+            "mark_price": value / abs(size),
+            "notional": value,
+            "leverage_type": leverage_type,
+            "maintenance_rate": maintenance_rate,
+            "margin_available": margin_available,
+        })
+    return positions
+
+
+def liquidation_prices(
+    mark: np.ndarray, size: np.ndarray, margin_available: np.ndarray, maintenance_rate: np.ndarray
+) -> np.ndarray:
+    """
+    Hyperliquid liquidation prices, vectorized over positions:
+    ``mark - side * margin_available / |size| / (1 - maintenance_rate * side)``.
+    """
+    side = np.sign(size)
+    return mark - side * margin_available / np.abs(size) / (1 - maintenance_rate * side)
+
+
+class _SymbolBook:
+    """
+    Positions of one coin sorted by liquidation price, with notional per
+    price bucket for longs and shorts.
+
+    Longs liquidate as the mark falls to their price and shorts as it rises,
+    so the live longs are always a prefix of the sorted long array and the
+    live shorts a suffix of the short array. A mark move only removes the
+    range it crossed and only touches those positions' buckets.
+    """
+
+    def __init__(
+        self, coin: str, mark: float, liq: np.ndarray, is_long: np.ndarray,
+        notional: np.ndarray, addresses: np.ndarray, bucket_bps: float,
+    ):
+        self.coin = coin
+        self.mark = mark
+        self.step = mark * bucket_bps / 1e4
+        # Positions already past their price at this mark are not live
+        live = np.where(is_long, liq < mark, liq > mark)
+        liq, is_long, notional, addresses = liq[live], is_long[live], notional[live], addresses[live]
+        buckets = np.floor(liq / self.step).astype(np.int64)
+        self.lo = int(buckets.min()) if len(buckets) else int(mark / self.step)
+        size = (int(buckets.max()) - self.lo + 1) if len(buckets) else 1
+        self.long_hist = np.zeros(size)
+        self.short_hist = np.zeros(size)
+
+        self.long_liq, self.long_notional, self.long_bucket, self.long_address = self._sorted(
+            liq[is_long], notional[is_long], buckets[is_long], addresses[is_long])
+        self.short_liq, self.short_notional, self.short_bucket, self.short_address = self._sorted(
+            liq[~is_long], notional[~is_long], buckets[~is_long], addresses[~is_long])
+        np.add.at(self.long_hist, self.long_bucket - self.lo, self.long_notional)
+        np.add.at(self.short_hist, self.short_bucket - self.lo, self.short_notional)
+        self.long_end = len(self.long_liq)  # Live longs: [0, long_end)
+        self.short_start = 0  # Live shorts: [short_start, len)
+        self.liquidated_notional = 0.0
+
+    @staticmethod
+    def _sorted(liq, notional, buckets, addresses):
+        order = np.argsort(liq, kind="stable")
+        return liq[order], notional[order], buckets[order], addresses[order]
+
+    def apply_mark(self, mark: float) -> float:
+        """Remove positions the move to ``mark`` liquidated; returns their notional."""
+        removed = 0.0
+        end = int(np.searchsorted(self.long_liq, mark, side="left"))
+        if end < self.long_end:
+            np.subtract.at(self.long_hist, self.long_bucket[end:self.long_end] - self.lo, self.long_notional[end:self.long_end])
+            removed += float(self.long_notional[end:self.long_end].sum())
+            self.long_end = end
+        start = int(np.searchsorted(self.short_liq, mark, side="right"))
+        if start > self.short_start:
+            np.subtract.at(self.short_hist, self.short_bucket[self.short_start:start] - self.lo, self.short_notional[self.short_start:start])
+            removed += float(self.short_notional[self.short_start:start].sum())
+            self.short_start = start
+        self.mark = mark
+        self.liquidated_notional += removed
+        return removed
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.coin,
+            "mark_price": self.mark,
+            "bucket_size": self.step,
+            "long_positions": self.long_end,
+            "short_positions": len(self.short_liq) - self.short_start,
+            "long_notional_at_risk": float(self.long_notional[:self.long_end].sum()),
+            "short_notional_at_risk": float(self.short_notional[self.short_start:].sum()),
+            "liquidated_notional": self.liquidated_notional,
+        }
+
+    def buckets(self, range_pct: float) -> List[Dict[str, float]]:
+        """Non-empty buckets within ``range_pct`` of the mark, ascending by price."""
+        first = max(int(np.floor(self.mark * (1 - range_pct) / self.step)) - self.lo, 0)
+        last = min(int(np.floor(self.mark * (1 + range_pct) / self.step)) - self.lo + 1, len(self.long_hist))
+        if first >= last:
+            return []
+        longs, shorts = self.long_hist[first:last], self.short_hist[first:last]
+        # Float residue of subtract.at counts as empty
+        occupied = np.flatnonzero((longs > 1e-9) | (shorts > 1e-9))
+        prices = (occupied + first + self.lo) * self.step
+        return [
+            {"price_low": low, "price_high": low + self.step, "long_notional": long, "short_notional": short}
+            for low, long, short in zip(prices.tolist(), longs[occupied].tolist(), shorts[occupied].tolist())
+        ]
+
+    def closest(self, limit: int) -> List[Dict[str, Any]]:
+        """The live positions nearest to liquidation on either side."""
+        rows = []
+        for liq, notional, address, side in (
+            (self.long_liq[max(self.long_end - limit, 0):self.long_end],
+             self.long_notional[max(self.long_end - limit, 0):self.long_end],
+             self.long_address[max(self.long_end - limit, 0):self.long_end], "long"),
+            (self.short_liq[self.short_start:self.short_start + limit],
+             self.short_notional[self.short_start:self.short_start + limit],
+             self.short_address[self.short_start:self.short_start + limit], "short"),
+        ):
+            for price, value, owner in zip(liq.tolist(), notional.tolist(), address.tolist()):
+                rows.append({
+                    "address": owner, "symbol": self.coin, "side": side, "liquidation_price": price,
+                    "notional": value, "distance_percent": abs(price - self.mark) / self.mark * 100,
+                })
+        return rows
+
+
+class LiquidationHeatmap:
+    """Per-coin liquidation-level books over the positions of watched addresses."""
+
+    def __init__(self, bucket_bps: float = BUCKET_BPS, max_distance: float = MAX_DISTANCE):
+        self.bucket_bps = bucket_bps
+        self.max_distance = max_distance
+        self.books: Dict[str, _SymbolBook] = {}
+
+    def load(self, positions: List[Dict[str, Any]], marks: Optional[Dict[str, float]] = None) -> None:
+        """
+        Rebuild every book from a full set of positions. Liquidation prices
+        are computed at each position's snapshot mark and the books are then
+        moved to ``marks`` where given.
+        """
+        if not positions:
+            self.books = {}
+            return
+        coins = np.array([p["coin"] for p in positions])
+        addresses = np.array([p["address"] for p in positions])
+        snapshot_mark = np.array([p["mark_price"] for p in positions])
+        notional = np.array([p["notional"] for p in positions])
+        size = np.array([p["size"] for p in positions])
+        liq = liquidation_prices(
+            snapshot_mark,
+            size,
+            np.array([p["margin_available"] for p in positions]),
+            np.array([p["maintenance_rate"] for p in positions]),
+        )
+        keep = np.isfinite(liq) & (liq > 0) & (np.abs(liq / snapshot_mark - 1) <= self.max_distance)
+
+        books = {}
+        for coin in np.unique(coins[keep]).tolist():
+            rows = keep & (coins == coin)
+            mark = (marks or {}).get(coin)
+            reference = float(np.median(snapshot_mark[rows]))
+            book = _SymbolBook(
+                coin, reference, liq[rows], size[rows] > 0, notional[rows], addresses[rows], self.bucket_bps
+            )
+            if mark:
+                book.apply_mark(float(mark))
+                book.liquidated_notional = 0.0  # Not a move we observed
+            books[coin] = book
+        self.books = books
+        logger.info(f"Liquidation heatmap rebuilt: {int(keep.sum())} positions across {len(books)} coins")
+
+    def apply_marks(self, marks: Dict[str, float]) -> Dict[str, float]:
+        """Move each book to its new mark; returns the notional liquidated per coin."""
+        liquidated = {}
+        for coin, book in self.books.items():
+            mark = marks.get(coin)
+            if mark and mark != book.mark:
+                removed = book.apply_mark(float(mark))
+                if removed:
+                    liquidated[coin] = removed
+        return liquidated
+
+    def symbols(self) -> List[Dict[str, Any]]:
+        return [book.summary() for book in self.books.values()]
+
+    def heatmap(self, coin: str, range_pct: float = 0.1) -> Optional[Dict[str, Any]]:
+        book = self.books.get(coin)
+        if book is None:
+            return None
+        return {**book.summary(), "range_pct": range_pct, "buckets": book.buckets(range_pct)}
+
+    def closest(self, limit: int) -> List[Dict[str, Any]]:
+        """The ``limit`` positions nearest to liquidation across all coins."""
+        rows = [row for book in self.books.values() for row in book.closest(limit)]
+        rows.sort(key=lambda row: row["distance_percent"])
+        return rows[:limit]
+
+
+async def fetch_clearinghouse_states(
+    addresses: Iterable[str], info_url: str, concurrency: int = 8
+) -> Dict[str, Dict[str, Any]]:
+    """
+    ``clearinghouseState`` of every address, requested concurrently over one
+    session within the host's rate limit. Failed addresses are left out.
+    """
+    limiter = get_limiter(info_url)
+    semaphore = asyncio.Semaphore(concurrency)
+    states: Dict[str, Dict[str, Any]] = {}
+
+    async def fetch(session: aiohttp.ClientSession, address: str) -> None:
+        async with semaphore:
+            await limiter.acquire()
+            try:
+                async with session.post(info_url, json={"type": "clearinghouseState", "user": address}) as response:
+                    if response.status != 200:
+                        logger.warning(f"Failed to fetch clearinghouse state for {address}: {response.status}")
+                        return
+                    states[address] = await response.json()
+            except Exception as e:
+                logger.warning(f"Error fetching clearinghouse state for {address}: {e}")
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as session:
+        await asyncio.gather(*(fetch(session, address) for address in addresses))
+    return states
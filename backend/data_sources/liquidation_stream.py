@@ -0,0 +1,181 @@
+import bisect
+import heapq
+import itertools
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional
+
+MAX_EVENTS_PER_VENUE = 1000
+
+
+class LiquidationEvent(NamedTuple):
+    """
+    One forced liquidation on any venue, normalized once when it arrives.
+
+    ``side`` is the side of the position that was liquidated ("long" or
+    "short"), not the side of the closing order.
+    """
+    timestamp: float  # Epoch seconds
+    venue: str
+    coin: str  # Base asset, e.g. "BTC"
+    side: str
+    price: float
+    size: float
+    value_usd: float
+    simulated: bool = False
+
+    def as_record(self) -> Dict[str, Any]:
+        """The dashboard's RecentLiquidation shape."""
+        return {
+            "symbol": self.coin,
+            "coin": self.coin,
+            "side": self.side,
+            "size": self.size,
+            "price": self.price,
+            "value_usd": self.value_usd,
+            "timestamp": datetime.utcfromtimestamp(self.timestamp).isoformat(),
+            "exchange": self.venue,
+            "simulated": self.simulated,
+        }
+
+
+def _positive(value: Any) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if value > 0 else 0.0
+
+
+def from_binance_force_order(event: Dict[str, Any]) -> Optional[LiquidationEvent]:
+    """
+    A Binance futures ``forceOrder`` event. The liquidation engine sells to
+    close longs and buys to close shorts; the average fill price and filled
+    quantity are used when present.
+    """
+    if event.get("e") != "forceOrder":
+        return None
+    order = event.get("o") or {}
+    price = _positive(order.get("ap")) or _positive(order.get("p"))
+    size = _positive(order.get("z")) or _positive(order.get("q"))
+    if not price or not size:
+        return None
+    return LiquidationEvent(
+        timestamp=(order.get("T") or event.get("E") or time.time() * 1000) / 1000,
+        venue="binance",
+        coin=str(order.get("s", "")).replace("USDT", ""),
+        side="long" if order.get("S") == "SELL" else "short",
+        price=price,
+        size=size,
+        value_usd=price * size,
+    )
+
+
+def from_hyperliquid(data: Dict[str, Any], now: Optional[float] = None) -> Optional[LiquidationEvent]:
+    """
+    A Hyperliquid liquidation. Accepts both the exchange's short field names
+    (``px``, ``sz``, side ``B``/``A``) and the long ones (``price``,
+    ``quantity``, ``quoteSize``, side ``long``/``short``).
+    """
+    price = _positive(data.get("px", data.get("price")))
+    size = _positive(data.get("sz", data.get("quantity")))
+    value = _positive(data.get("quoteSize")) or price * size
+    if not price or not value:
+        return None
+    side = str(data.get("side", "")).lower()
+    timestamp = data.get("time", data.get("timestamp"))
+    if timestamp is None:
+        timestamp = now if now is not None else time.time()
+    elif timestamp > 1e11:  # Milliseconds
+        timestamp /= 1000
+    return LiquidationEvent(
+        timestamp=float(timestamp),
+        venue="hyperliquid",
+        coin=str(data.get("coin", "")),
+        # A liquidated long is closed by a sell (ask) order
+        side="long" if side in ("long", "a", "sell") else "short",
+        price=price,
+        size=size or value / price,
+        value_usd=value,
+        simulated=bool(data.get("simulated", False)),
+    )
+
+
+class LiquidationStream:
+    """
+    Recent liquidations of every venue, merged by time.
+
+    Each venue keeps its own bounded, time-ordered buffer; reads merge the
+    buffers newest first. Dashboard records are built once per change and
+    reused until the next event arrives.
+    """
+
+    def __init__(self, max_events_per_venue: int = MAX_EVENTS_PER_VENUE):
+        self.max_events_per_venue = max_events_per_venue
+        self.buffers: Dict[str, Deque[LiquidationEvent]] = {}
+        self.last_update: Optional[float] = None
+        self._version = 0
+        self._records: Optional[List[Dict[str, Any]]] = None
+        self._records_version = -1
+
+    def buffer(self, venue: str) -> Deque[LiquidationEvent]:
+        """The time-ordered buffer of one venue, oldest first."""
+        buffer = self.buffers.get(venue)
+        if buffer is None:
+            buffer = self.buffers[venue] = deque(maxlen=self.max_events_per_venue)
+        return buffer
+
+    def publish(self, event: Optional[LiquidationEvent]) -> None:
+        if event is None:
+            return
+        buffer = self.buffer(event.venue)
+        if not buffer or event.timestamp >= buffer[-1].timestamp:
+            buffer.append(event)
+        else:
+            # Late arrival: keep the buffer sorted
+            if len(buffer) == buffer.maxlen:
+                buffer.popleft()
+            buffer.insert(bisect.bisect_right([e.timestamp for e in buffer], event.timestamp), event)
+        self.last_update = time.time()
+        self._version += 1
+
+    def prune(self, before: float) -> int:
+        """Drop events older than ``before`` (epoch seconds); returns how many."""
+        removed = 0
+        for buffer in self.buffers.values():
+            while buffer and buffer[0].timestamp < before:
+                buffer.popleft()
+                removed += 1
+        if removed:
+            self._version += 1
+        return removed
+
+    def events(self, since: Optional[float] = None, venue: Optional[str] = None) -> Iterator[LiquidationEvent]:
+        """Events of all venues (or one), newest first, optionally newer than ``since``."""
+        buffers = [self.buffers.get(venue, ())] if venue else list(self.buffers.values())
+        merged = heapq.merge(*(reversed(buffer) for buffer in buffers), key=lambda e: e.timestamp, reverse=True)
+        if since is None:
+            return merged
+        return itertools.takewhile(lambda e: e.timestamp > since, merged)
+
+    def recent(self, limit: Optional[int] = None, since: Optional[float] = None) -> List[LiquidationEvent]:
+        return list(itertools.islice(self.events(since), limit))
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Every buffered event as a dashboard record, newest first; cached between events."""
+        if self._records_version != self._version:
+            self._records = [event.as_record() for event in self.events()]
+            self._records_version = self._version
+        return self._records
+
+
+_stream: Optional[LiquidationStream] = None
+
+
+def get_liquidation_stream() -> LiquidationStream:
+    """The process-wide stream every venue adapter publishes to."""
+    global _stream
+    if _stream is None:
+        _stream = LiquidationStream()
+    return _stream
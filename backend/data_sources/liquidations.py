@@ -3,10 +3,12 @@ import json
 import websockets
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from collections import deque
 import logging
+import time
 import random  # For simulated data
 
+from data_sources.liquidation_stream import LiquidationEvent, from_binance_force_order, get_liquidation_stream
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,7 +16,6 @@ logger = logging.getLogger(__name__)
 # Configuration
 BINANCE_WS_URL = "wss://fstream.binance.com/ws"  # Binance Futures WebSocket URL
 MIN_LIQUIDATION_VALUE = 1000  # Lower threshold to $1k to capture more liquidations
-MAX_STORED_LIQUIDATIONS = 1000
 # Expanded list of tracked symbols
 TRACKED_SYMBOLS = [
     "BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT", 
@@ -29,7 +30,7 @@ FORCE_FALLBACK_DATA = True  # Force fallback data generation
 
 class LiquidationTracker:
     def __init__(self):
-        self.recent_liquidations = deque(maxlen=MAX_STORED_LIQUIDATIONS)
+        self.stream = get_liquidation_stream()  # Shared with the other venues
         self.last_update = None
         self.ws = None
         self.running = False
@@ -37,6 +38,11 @@ class LiquidationTracker:
         self.fallback_task = None
         logger.info("LiquidationTracker initialized")
         
+    @property
+    def recent_liquidations(self):
+        """Binance events in the shared stream, oldest first."""
+        return self.stream.buffer("binance")
+        
     async def connect_websocket(self):
         """Connect to Binance WebSocket and subscribe to liquidation streams"""
         try:
@@ -90,29 +96,16 @@ class LiquidationTracker:
                 logger.debug(f"LiquidationTracker: Ignoring untracked symbol: {symbol}")
                 return
                 
-            # Calculate liquidation value
-            price = float(order.get("p", 0))
-            quantity = float(order.get("q", 0))
-            value = price * quantity
-            
-            if value < MIN_LIQUIDATION_VALUE:
-                logger.debug(f"LiquidationTracker: Ignoring small liquidation: {symbol} {value:.2f} USD (below threshold)")
+            # Normalized once here; readers never reshape it again
+            liquidation = from_binance_force_order(event)
+            if liquidation is None or liquidation.value_usd < MIN_LIQUIDATION_VALUE:
+                logger.debug(f"LiquidationTracker: Ignoring small or empty liquidation: {symbol}")
                 return
-                
-            liquidation = {
-                "symbol": symbol,
-                "side": order.get("S", "UNKNOWN"),  # SELL or BUY
-                "price": price,
-                "quantity": quantity,
-                "value": value,
-                "time": datetime.fromtimestamp(event.get("E", 0) / 1000).isoformat()
-            }
             
-            # Add to recent liquidations
-            self.recent_liquidations.appendleft(liquidation)
+            self.stream.publish(liquidation)
             self.last_update = datetime.utcnow()
             
-            logger.info(f"LiquidationTracker: Processed liquidation: {symbol} {order.get('S')} {value:.2f} USD")
+            logger.info(f"LiquidationTracker: Processed liquidation: {symbol} {liquidation.side} {liquidation.value_usd:.2f} USD")
             
         except Exception as e:
             logger.error(f"LiquidationTracker: Error processing liquidation event: {e}")
@@ -159,7 +152,7 @@ class LiquidationTracker:
                             quantity = random.uniform(50, 500)  # Larger quantities
                             
                         value = price * quantity
-                        side = "BUY" if random.random() > 0.5 else "SELL"
+                        side = "long" if random.random() > 0.5 else "short"
                         
                         # Ensure values are above MIN_LIQUIDATION_VALUE and frequently above 1k
                         if value < 1000:  # Increase min value to 1k for more visible liquidations
@@ -171,17 +164,18 @@ class LiquidationTracker:
                                 quantity = 1000 / price * 1.5  # Ensure other liqs are visible
                             value = price * quantity
                         
-                        liquidation = {
-                            "symbol": symbol,
-                            "side": side,
-                            "price": price,
-                            "quantity": quantity,
-                            "value": value,
-                            "time": datetime.utcnow().isoformat(),
-                            "simulated": True  # Mark as simulated
-                        }
+                        liquidation = LiquidationEvent(
+                            timestamp=time.time(),
+                            venue="binance",
+                            coin=symbol.replace("USDT", ""),
+                            side=side,
+                            price=price,
+                            size=quantity,
+                            value_usd=value,
+                            simulated=True  # Mark as simulated
+                        )
                         
-                        self.recent_liquidations.appendleft(liquidation)
+                        self.stream.publish(liquidation)
                         self.last_update = datetime.utcnow()
                         
                         logger.info(f"LiquidationTracker: Generated simulated liquidation: {symbol} {side} {value:.2f} USD")
@@ -231,12 +225,7 @@ class LiquidationTracker:
                 
     def cleanup_old_liquidations(self):
         """Remove liquidations outside the time window"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=LIQUIDATION_WINDOW_HOURS)
-        removed_count = 0
-        
-        while self.recent_liquidations and datetime.fromisoformat(self.recent_liquidations[-1]["time"]) < cutoff_time:
-            self.recent_liquidations.pop()
-            removed_count += 1
+        removed_count = self.stream.prune(time.time() - LIQUIDATION_WINDOW_HOURS * 3600)
             
         if removed_count > 0:
             logger.info(f"LiquidationTracker: Removed {removed_count} old liquidations outside the time window")
@@ -247,8 +236,8 @@ class LiquidationTracker:
         liquidations_by_symbol = {}
         now = datetime.utcnow()
         
-        for liq in self.recent_liquidations:
-            symbol = liq["symbol"].replace("USDT", "")  # Remove USDT suffix for display
+        for liq in reversed(self.recent_liquidations):
+            symbol = liq.coin
             if symbol not in liquidations_by_symbol:
                 liquidations_by_symbol[symbol] = {
                     "longs": [],
@@ -261,27 +250,27 @@ class LiquidationTracker:
                     "last_1h_value": 0
                 }
                 
-            side = "longs" if liq["side"] == "BUY" else "shorts"
-            liquidations_by_symbol[symbol][side].append(liq)
-            liquidations_by_symbol[symbol]["total_value"] += liq["value"]
+            side = "longs" if liq.side == "long" else "shorts"
+            liquidations_by_symbol[symbol][side].append(liq.as_record())
+            liquidations_by_symbol[symbol]["total_value"] += liq.value_usd
             
             # Update time-based stats
-            liq_time = datetime.fromisoformat(liq["time"])
+            liq_time = datetime.utcfromtimestamp(liq.timestamp)
             time_diff = now - liq_time
             
             if time_diff <= timedelta(hours=1):
-                liquidations_by_symbol[symbol]["last_1h_value"] += liq["value"]
+                liquidations_by_symbol[symbol]["last_1h_value"] += liq.value_usd
             if time_diff <= timedelta(hours=6):
-                liquidations_by_symbol[symbol]["last_6h_value"] += liq["value"]
+                liquidations_by_symbol[symbol]["last_6h_value"] += liq.value_usd
             if time_diff <= timedelta(hours=12):
-                liquidations_by_symbol[symbol]["last_12h_value"] += liq["value"]
+                liquidations_by_symbol[symbol]["last_12h_value"] += liq.value_usd
             if time_diff <= timedelta(hours=24):
-                liquidations_by_symbol[symbol]["last_24h_value"] += liq["value"]
+                liquidations_by_symbol[symbol]["last_24h_value"] += liq.value_usd
                 
             # Update hourly stats
             hour_key = liq_time.strftime("%Y-%m-%d %H:00")
             if hour_key in liquidations_by_symbol[symbol]["hourly_stats"]:
-                liquidations_by_symbol[symbol]["hourly_stats"][hour_key] += liq["value"]
+                liquidations_by_symbol[symbol]["hourly_stats"][hour_key] += liq.value_usd
                 
         logger.info(f"LiquidationTracker: Current liquidation stats: {len(liquidations_by_symbol)} symbols with liquidations")
         return liquidations_by_symbol
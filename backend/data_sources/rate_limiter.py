@@ -0,0 +1,125 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Lower values are served first when requests queue for a token."""
+    CRITICAL = 0  # Feeds the live dashboard
+    BACKGROUND = 1  # Refreshers, history backfills
+
+
+class TokenBucketLimiter:
+    """
+    Async token bucket shared by every caller of one upstream host.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Waiting callers queue by (priority, arrival), so a dashboard-critical
+    request overtakes queued background work but never a request already
+    holding a token.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float = 1.0):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._queue: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = asyncio.Condition()
+        # Metrics
+        self._acquired = {priority.name.lower(): 0 for priority in Priority}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: Priority = Priority.BACKGROUND) -> float:
+        """Wait for a token; returns the seconds spent waiting."""
+        started = time.monotonic()
+        entry = (int(priority), next(self._sequence))
+        async with self._condition:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._queue[0] == entry and self._tokens >= 1:
+                        heapq.heappop(self._queue)
+                        self._tokens -= 1
+                        break
+                    # Only the head of the queue sleeps on the refill; the rest wait their turn
+                    timeout = (1 - self._tokens) / self.rate if self._queue[0] == entry else None
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                # Cancelled while queued: give up our place
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                raise
+            finally:
+                self._condition.notify_all()
+
+        waited = time.monotonic() - started
+        self._acquired[Priority(priority).name.lower()] += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        if waited > 1:
+            logger.info(f"Rate limiter {self.name}: waited {waited:.2f}s for a {Priority(priority).name.lower()} request")
+        return waited
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and wait statistics for monitoring."""
+        self._refill()
+        total = sum(self._acquired.values())
+        return {
+            "host": self.name,
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "tokens_available": round(self._tokens, 3),
+            "queue_depth": len(self._queue),
+            "acquired": dict(self._acquired),
+            "wait_seconds_total": round(self._wait_total, 3),
+            "wait_seconds_avg": round(self._wait_total / total, 3) if total else 0.0,
+            "wait_seconds_max": round(self._wait_max, 3),
+        }
+
+
+# Request budgets per upstream host: (tokens per second, burst capacity)
+HOST_LIMITS: Dict[str, Tuple[float, float]] = {
+    "api.coingecko.com": (1 / 6, 2),  # Free tier, roughly 10 calls per minute
+    "pro-api.coingecko.com": (5.0, 10),
+    "www.alphavantage.co": (5 / 60, 1),  # Free tier, 5 calls per minute
+    "api.hyperliquid.xyz": (10.0, 20),  # 1200 request weight per minute, clearinghouseState weighs 2
+}
+DEFAULT_LIMIT = (5.0, 5)
+
+_limiters: Dict[str, TokenBucketLimiter] = {}
+
+
+def get_limiter(url_or_host: str) -> TokenBucketLimiter:
+    """The shared limiter for the host of ``url_or_host``, created on first use."""
+    host = urlparse(url_or_host).hostname or url_or_host
+    limiter = _limiters.get(host)
+    if limiter is None:
+        rate, capacity = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+        limiter = _limiters[host] = TokenBucketLimiter(host, rate, capacity)
+    return limiter
+
+
+def limiter_metrics() -> List[Dict[str, Any]]:
+    """Metrics of every limiter created so far."""
+    return [limiter.metrics() for limiter in _limiters.values()]
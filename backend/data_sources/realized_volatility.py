@@ -0,0 +1,162 @@
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+# Rolling windows served, in minutes
+WINDOWS: Dict[str, int] = {
+    "1h": 60,
+    "4h": 4 * 60,
+    "24h": 24 * 60,
+    "7d": 7 * 24 * 60,
+    "30d": 30 * 24 * 60,
+}
+
+# Returns needed in a window before its estimate is reported: at least
+# MIN_RETURNS, and MIN_COVERAGE of the window's minutes
+MIN_RETURNS = 30
+MIN_COVERAGE = 0.8
+
+
+class _WindowedRing:
+    """
+    Fixed-size circular array of (sum of squared returns, return count) per slot,
+    with running totals over several trailing windows.
+
+    Slots are addressed by an absolute index (minute or hour number). Pushing
+    the next index adds the new slot to every window total and subtracts the
+    slot leaving it, so updates cost O(windows) and reads O(1).
+    """
+
+    def __init__(self, size: int, windows: Dict[str, int]):
+        self.size = size
+        self.windows = windows
+        self.sq = np.zeros(size)
+        self.n = np.zeros(size, dtype=np.int64)
+        self.index = np.full(size, -1, dtype=np.int64)  # Absolute index each slot holds
+        self.totals: Dict[str, Tuple[float, int]] = {name: (0.0, 0) for name in windows}
+        self.last: Optional[int] = None
+
+    def _reset(self) -> None:
+        self.sq[:] = 0.0
+        self.n[:] = 0
+        self.index[:] = -1
+        self.totals = {name: (0.0, 0) for name in self.windows}
+
+    def _advance(self, index: int, sq: float, n: int) -> None:
+        for name, length in self.windows.items():
+            total_sq, total_n = self.totals[name]
+            leaving = (index - length) % self.size
+            if self.index[leaving] == index - length:
+                total_sq -= self.sq[leaving]
+                total_n -= self.n[leaving]
+            self.totals[name] = (total_sq + sq, total_n + n)
+        slot = index % self.size
+        self.sq[slot], self.n[slot], self.index[slot] = sq, n, index
+
+    def push(self, index: int, sq: float, n: int) -> None:
+        """Store the slot for ``index``; skipped indexes count as empty slots."""
+        if self.last is not None and index <= self.last:
+            return
+        if self.last is None or index - self.last > self.size:
+            # Everything in the ring has aged out
+            self._reset()
+        else:
+            for skipped in range(self.last + 1, index):
+                self._advance(skipped, 0.0, 0)
+        self._advance(index, sq, n)
+        self.last = index
+
+
+class RealizedVolatility:
+    """
+    Streaming realized volatility of one symbol from a price feed.
+
+    Prices are sampled to 1-minute closes; each minute's squared log return is
+    kept in a 24h circular array for the intraday windows and folded into
+    hourly sums in a 30d circular array for the longer ones. Estimates are
+    annualized, zero-mean realized volatility.
+    """
+
+    def __init__(self):
+        minute_windows = {name: minutes for name, minutes in WINDOWS.items() if minutes <= 24 * 60}
+        # Completed hours only; the hour being filled is added when reading
+        hour_windows = {name: minutes // 60 - 1 for name, minutes in WINDOWS.items() if minutes > 24 * 60}
+        self._minutes = _WindowedRing(24 * 60, minute_windows)
+        self._hours = _WindowedRing(max(hour_windows.values()) + 1, hour_windows)
+        self._minute: Optional[int] = None  # Minute currently being sampled
+        self._close: Optional[float] = None  # Latest price in that minute
+        self._anchor: Optional[float] = None  # Close of the previous sampled minute
+        self._anchor_minute: Optional[int] = None
+        self._hour: Optional[int] = None
+        self._hour_sq = 0.0
+        self._hour_n = 0
+
+    def update(self, price: float, timestamp: float) -> None:
+        """Feed one price observed at ``timestamp`` (epoch seconds)."""
+        if price is None or price <= 0:
+            return
+        minute = int(timestamp // 60)
+        if self._minute is not None and minute < self._minute:
+            return
+        if self._minute is not None and minute > self._minute:
+            self._close_minute()
+        self._minute = minute
+        self._close = price
+
+    def _close_minute(self) -> None:
+        sq, n = 0.0, 0
+        # After a feed gap the move spans several minutes, so it is not a 1-minute return
+        if self._anchor is not None and self._anchor_minute == self._minute - 1:
+            r = math.log(self._close / self._anchor)
+            sq, n = r * r, 1
+        self._anchor, self._anchor_minute = self._close, self._minute
+        self._minutes.push(self._minute, sq, n)
+
+        hour = self._minute // 60
+        if self._hour is not None and hour > self._hour:
+            self._hours.push(self._hour, self._hour_sq, self._hour_n)
+            self._hour_sq, self._hour_n = 0.0, 0
+        self._hour = hour
+        self._hour_sq += sq
+        self._hour_n += n
+
+    def volatility(self, window: str) -> Optional[float]:
+        """
+        Annualized realized volatility over ``window``, or None until the
+        window is mostly covered by 1-minute returns.
+        """
+        minutes = WINDOWS[window]
+        if minutes <= 24 * 60:
+            total_sq, total_n = self._minutes.totals[window]
+        else:
+            total_sq, total_n = self._hours.totals[window]
+            # Include the hour still being filled
+            total_sq += self._hour_sq
+            total_n += self._hour_n
+        if total_n < max(MIN_RETURNS, MIN_COVERAGE * minutes):
+            return None
+        return math.sqrt(max(total_sq, 0.0) / total_n * MINUTES_PER_YEAR)
+
+
+class RealizedVolatilityTracker:
+    """Per-symbol RealizedVolatility estimators fed from a shared price stream."""
+
+    def __init__(self):
+        self._estimators: Dict[str, RealizedVolatility] = {}
+
+    def update(self, symbol: str, price: float, timestamp: float) -> None:
+        estimator = self._estimators.get(symbol)
+        if estimator is None:
+            estimator = self._estimators[symbol] = RealizedVolatility()
+        estimator.update(price, timestamp)
+
+    def volatility(self, symbol: str, window: str) -> Optional[float]:
+        estimator = self._estimators.get(symbol)
+        return estimator.volatility(window) if estimator else None
+
+    def snapshot(self, symbol: str) -> Dict[str, Optional[float]]:
+        """All windows for ``symbol``."""
+        return {window: self.volatility(symbol, window) for window in WINDOWS}
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cache lifetimes per source: (seconds fresh, further seconds served stale while revalidating)
+SOURCE_TTLS: Dict[str, Tuple[float, float]] = {
+    "alpha_vantage:monthly": (24 * 3600, 30 * 86400),  # CPI, unemployment publish monthly
+    "alpha_vantage:daily": (12 * 3600, 7 * 86400),  # Commodities and rates, one print per day
+    "coingecko:global": (300, 3600),
+    "deribit:instruments": (300, 3600),
+}
+DEFAULT_TTL = (60, 600)
+
+# Query parameters that never become part of a cache key
+SECRET_PARAMS = {"apikey", "api_key", "x_cg_pro_api_key"}
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical key of a request: the URL plus its sorted, credential-free params."""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS)
+    return f"{url}?{urlencode(items)}" if items else url
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of decoded upstream JSON responses.
+
+    Entries live in a small SQLite file (WAL mode, so the web and worker
+    processes can share it) and survive restarts. Within a source's TTL an
+    entry is served as is; for a further stale window it is still served
+    immediately while one background task refreshes it. Past that the caller
+    waits for the upstream, and if the upstream fails any older entry is
+    returned rather than nothing.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, source TEXT NOT NULL, body TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_usage ("
+            "name TEXT NOT NULL, day TEXT NOT NULL, calls INTEGER NOT NULL, PRIMARY KEY (name, day))"
+        )
+        self._conn.commit()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {"fresh": 0, "stale": 0, "miss": 0, "fallback": 0}
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """The cached body for ``key`` and its age in seconds, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT body, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), self._clock() - row[1]
+
+    def set(self, key: str, source: str, body: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, source, body, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, source, json.dumps(body), self._clock()),
+            )
+            self._conn.commit()
+
+    def _today(self) -> str:
+        return datetime.fromtimestamp(self._clock(), tz=timezone.utc).date().isoformat()
+
+    def quota_used(self, name: str) -> int:
+        """Upstream calls recorded against ``name`` today (UTC), across all processes."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT calls FROM quota_usage WHERE name = ? AND day = ?", (name, self._today())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def consume_quota(self, name: str, limit: int) -> bool:
+        """Record one call against today's ``limit`` for ``name``; False once it is spent."""
+        day = self._today()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front so two processes can't both read the last slot
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT calls FROM quota_usage WHERE name = ? AND day = ?", (name, day)
+                ).fetchone()
+                calls = row[0] if row else 0
+                if calls >= limit:
+                    self._conn.rollback()
+                    return False
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO quota_usage (name, day, calls) VALUES (?, ?, ?)", (name, day, calls + 1)
+                )
+                self._conn.commit()
+                return True
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    async def _refresh(self, key: str, source: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            body = await fetch()
+        except Exception as e:
+            logger.warning(f"Response cache refresh failed for {source}: {e}")
+            body = None
+        if body is not None:
+            self.set(key, source, body)
+        return body
+
+    def _start_refresh(self, key: str, source: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """One refresh per key at a time; later callers share the running task."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key, source, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def fetch(
+        self,
+        source: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Serve ``url`` with ``params`` from the cache, calling ``fetch`` (which
+        returns the decoded body, or None on failure) only when needed.
+        """
+        key = cache_key(url, params)
+        ttl, stale = SOURCE_TTLS.get(source, DEFAULT_TTL)
+        entry = self.get(key)
+
+        if entry is not None:
+            body, age = entry
+            if age < ttl:
+                self._stats["fresh"] += 1
+                return body
+            if age < ttl + stale:
+                self._stats["stale"] += 1
+                self._start_refresh(key, source, fetch)
+                return body
+
+        self._stats["miss"] += 1
+        body = await self._start_refresh(key, source, fetch)
+        if body is None and entry is not None:
+            self._stats["fallback"] += 1
+            logger.info(f"Serving expired {source} response after a failed refresh")
+            return entry[0]
+        return body
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT source, COUNT(*) FROM responses GROUP BY source").fetchall()
+        return {
+            "path": self.path,
+            "entries": dict(rows),
+            "refreshing": len(self._inflight),
+            **self._stats,
+        }
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """The process-wide cache at ``RESPONSE_CACHE_PATH``, opened on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(settings.RESPONSE_CACHE_PATH)
+    return _cache
+
+
+async def cached_fetch(
+    source: str,
+    url: str,
+    params: Optional[Dict[str, Any]],
+    fetch: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Fetch through the shared response cache."""
+    return await get_response_cache().fetch(source, url, params, fetch)
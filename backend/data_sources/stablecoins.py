@@ -1,31 +1,140 @@
+import asyncio
 import httpx
+import logging
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Tuple
 
-async def fetch_daily_net_flows(chain: str = "all") -> List[Dict]:
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LLAMA_STABLECOINS_URL = "https://stablecoins.llama.fi"
+HISTORY_POINTS = 30  # daily points returned per chain
+RECHECK_INTERVAL = timedelta(minutes=15)  # between conditional checks once a new daily point is due
+
+# One pooled client shared by every chain request, opened on first use
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(base_url=LLAMA_STABLECOINS_URL, timeout=20)
+    return _client
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class _Chart:
+    """Last downloaded chart of one chain and the validators to revalidate it with."""
+
+    def __init__(self, dates: np.ndarray, circulating: np.ndarray, etag: Optional[str], last_modified: Optional[str]):
+        self.dates = dates
+        self.circulating = circulating
+        self.etag = etag
+        self.last_modified = last_modified
+        self.checked_at: Optional[datetime] = None
+
+    def due(self, now: datetime) -> bool:
+        """
+        Whether to ask upstream again: only once the next daily point can
+        exist, and then no more than every RECHECK_INTERVAL until it appears.
+        """
+        if not len(self.dates):
+            return True
+        next_point = self.dates[-1].astype("datetime64[us]").item() + timedelta(days=1)
+        if now < next_point:
+            return False
+        return self.checked_at is None or now - self.checked_at >= RECHECK_INTERVAL
+
+
+_charts: Dict[str, _Chart] = {}
+
+
+def parse_chart(data: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """llama.fi chart points as ascending (datetime64[D] dates, circulating USD) arrays."""
+    timestamps = np.array([int(point["date"]) for point in data], dtype="datetime64[s]")
+    circulating = np.array(
+        [float((point.get("totalCirculating") or {}).get("peggedUSD", np.nan)) for point in data], dtype=float
+    )
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order].astype("datetime64[D]"), circulating[order]
+
+
+def net_flows(dates: np.ndarray, circulating: np.ndarray, points: int = HISTORY_POINTS) -> List[Dict]:
+    """
+    The last ``points`` days of day-over-day change in circulating supply.
+
+    Differences are taken over the whole series, so the oldest returned day
+    still has its true net flow; days without a previous value are skipped.
+    """
+    net = np.diff(circulating, prepend=np.nan)
+    valid = np.flatnonzero(np.isfinite(net))[-points:]
+    return [
+        {"date": date, "net": flow, "circulating": circ}
+        for date, flow, circ in zip(dates[valid].tolist(), net[valid].tolist(), circulating[valid].tolist())
+    ]
+
+
+async def _refresh_chart(chain: str, now: datetime) -> _Chart:
+    chart = _charts.get(chain)
+    if chart is not None and not chart.due(now):
+        return chart
+
+    headers = {}
+    if chart is not None and chart.etag:
+        headers["If-None-Match"] = chart.etag
+    if chart is not None and chart.last_modified:
+        headers["If-Modified-Since"] = chart.last_modified
+    try:
+        response = await get_client().get(f"/stablecoincharts/{chain}", headers=headers)
+        if response.status_code == 304:
+            chart.checked_at = now
+            return chart
+        response.raise_for_status()
+        dates, circulating = parse_chart(response.json())
+    except Exception as e:
+        if chart is None:
+            raise
+        logger.warning(f"Serving cached stablecoin chart for {chain} after fetch error: {e}")
+        chart.checked_at = now
+        return chart
+
+    chart = _charts[chain] = _Chart(dates, circulating, response.headers.get("etag"), response.headers.get("last-modified"))
+    chart.checked_at = now
+    logger.info(f"Downloaded stablecoin chart for {chain}: {len(dates)} points, latest {dates[-1] if len(dates) else None}")
+    return chart
+
+
+async def fetch_daily_net_flows(chain: str = "all", now: Optional[datetime] = None) -> List[Dict]:
     """
     Fetch stablecoin net flows from llama.fi API.
-    
+
+    The chart is downloaded once and then only revalidated (ETag /
+    If-Modified-Since) after a new daily point is due, so most calls are
+    served from memory.
+
     Args:
         chain: Chain identifier (default: "all")
-        
+        now: Current UTC time, for tests
+
     Returns:
         List of dictionaries containing date, net flow, and circulating supply
     """
-    url = f"https://stablecoins.llama.fi/stablecoincharts/{chain}"
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Process the last 30 points
-        points = []
-        for point in data[-30:]:
-            points.append({
-                "date": datetime.fromtimestamp(point["date"]).date(),
-                "net": float(point["totalCirculating"]["peggedUSD"]),
-                "circulating": float(point["totalCirculating"]["peggedUSD"])
-            })
-            
-        return points 
\ No newline at end of file
+    chart = await _refresh_chart(chain, now or datetime.utcnow())
+    return net_flows(chart.dates, chart.circulating)
+
+
+async def fetch_chain_net_flows(chains: Sequence[str], now: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+    """Net flows of several chains, fetched concurrently over the shared client; failed chains are omitted."""
+    results = await asyncio.gather(*(fetch_daily_net_flows(chain, now) for chain in chains), return_exceptions=True)
+    flows = {}
+    for chain, result in zip(chains, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error fetching stablecoin flows for {chain}: {result}")
+        else:
+            flows[chain] = result
+    return flows
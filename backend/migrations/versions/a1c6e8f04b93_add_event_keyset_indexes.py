@@ -0,0 +1,35 @@
+"""add_event_keyset_indexes
+
+Revision ID: a1c6e8f04b93
+Revises: f3b9d4e62a17
+Create Date: 2025-05-02 09:30:00.000000
+
+Composite (symbol, timestamp, id) indexes backing the keyset-paginated
+liquidation and large-trade endpoints. They lead with symbol, so the
+single-column symbol indexes become redundant and are dropped.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c6e8f04b93'
+down_revision: Union[str, None] = 'f3b9d4e62a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['liquidations', 'trades_large']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(f'idx_{table}_symbol_timestamp', table, ['symbol', 'timestamp', 'id'], unique=False)
+        op.drop_index(f'ix_{table}_symbol', table_name=table)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.create_index(f'ix_{table}_symbol', table, ['symbol'], unique=False)
+        op.drop_index(f'idx_{table}_symbol_timestamp', table_name=table)
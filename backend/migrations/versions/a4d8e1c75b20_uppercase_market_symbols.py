@@ -0,0 +1,45 @@
+"""uppercase_market_symbols
+
+Revision ID: a4d8e1c75b20
+Revises: c9e4a2d7f815
+Create Date: 2025-05-09 09:00:00.000000
+
+The ingest worker stored market snapshots under the lower-case keys of the
+market data feed ("btc", "eth"), while liquidations, trades and the readers
+of the rollups use upper case. Snapshots are now stored upper case. Existing
+rollups are renamed so local volatility history is usable straight away;
+the latest-state and bubble rows are dropped, and are rewritten on the
+worker's next cycle.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8e1c75b20'
+down_revision: Union[str, None] = 'c9e4a2d7f815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        UPDATE ohlcv_rollups SET symbol = UPPER(symbol)
+        WHERE symbol <> UPPER(symbol)
+          AND NOT EXISTS (
+              SELECT 1 FROM ohlcv_rollups AS upper_rollup
+              WHERE upper_rollup.symbol = UPPER(ohlcv_rollups.symbol)
+                AND upper_rollup."interval" = ohlcv_rollups."interval"
+                AND upper_rollup.bucket = ohlcv_rollups.bucket
+          )
+    """)
+    op.execute("DELETE FROM ohlcv_rollups WHERE symbol <> UPPER(symbol)")
+    op.execute("DELETE FROM latest_market_state WHERE symbol <> UPPER(symbol)")
+    op.execute("DELETE FROM bubble_outliers WHERE symbol <> UPPER(symbol)")
+
+
+def downgrade() -> None:
+    # Upper-case rows are valid under the old code too
+    pass
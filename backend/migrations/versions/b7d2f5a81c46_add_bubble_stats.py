@@ -0,0 +1,38 @@
+"""add_bubble_stats
+
+Revision ID: b7d2f5a81c46
+Revises: a1c6e8f04b93
+Create Date: 2025-05-06 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f5a81c46'
+down_revision: Union[str, None] = 'a1c6e8f04b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Running mean / variance per symbol so bubble z-scores update in O(1)
+    op.create_table(
+        'bubble_stats',
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('mean', sa.Float(), nullable=False),
+        sa.Column('variance', sa.Float(), nullable=False),
+        sa.Column('pending_bucket', sa.DateTime(), nullable=True),
+        sa.Column('pending_close', sa.Float(), nullable=True),
+        sa.Column('ts_recomputed', sa.DateTime(), nullable=True),
+        sa.Column('ts_updated', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('symbol'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bubble_stats')
@@ -0,0 +1,112 @@
+"""partition_hot_tables
+
+Revision ID: c4e1a9d27b3f
+Revises: 7a7e3b207ec6
+Create Date: 2025-04-22 10:00:00.000000
+
+Convert market_snapshots, liquidations and trades_large into tables
+range-partitioned by day on "timestamp" (Postgres only). Expired days can
+then be dropped as whole partitions instead of deleted row by row. On
+other dialects the tables stay plain heap tables.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1a9d27b3f'
+down_revision: Union[str, None] = '7a7e3b207ec6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Days of partitions created ahead of the newest row
+PREMAKE_DAYS = 7
+
+# table -> list of (index name, columns) recreated on the partitioned parent
+HOT_TABLES = {
+    'market_snapshots': [
+        ('ix_market_snapshots_symbol', 'symbol'),
+        ('ix_market_snapshots_timestamp', '"timestamp"'),
+        ('idx_market_snapshots_symbol_timestamp', 'symbol, "timestamp"'),
+    ],
+    'liquidations': [
+        ('ix_liquidations_symbol', 'symbol'),
+        ('ix_liquidations_timestamp', '"timestamp"'),
+        ('idx_liquidations_timestamp', '"timestamp"'),
+    ],
+    'trades_large': [
+        ('ix_trades_large_symbol', 'symbol'),
+        ('ix_trades_large_timestamp', '"timestamp"'),
+        ('idx_trades_large_timestamp', '"timestamp"'),
+    ],
+}
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def _create_indexes(table: str) -> None:
+    for index_name, columns in HOT_TABLES[table]:
+        op.execute(f'CREATE INDEX {index_name} ON {table} ({columns})')
+
+
+def _swap_in(table: str, new_table: str) -> None:
+    """Copy rows into new_table, drop the old table and take over its name."""
+    op.execute(f'INSERT INTO {new_table} SELECT * FROM {table}')
+    op.execute(f'DROP TABLE {table}')
+    op.execute(f'ALTER TABLE {new_table} RENAME TO {table}')
+    op.execute(f'ALTER TABLE {table} RENAME CONSTRAINT {new_table}_pkey TO {table}_pkey')
+    _create_indexes(table)
+
+
+def upgrade() -> None:
+    if not _is_postgres():
+        # SQLite and friends keep the plain-table layout
+        return
+
+    for table in HOT_TABLES:
+        new_table = f'{table}_partitioned'
+        op.execute(
+            f'CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ("timestamp")'
+        )
+        # The partition key has to be part of the primary key
+        op.execute(f'ALTER TABLE {new_table} ADD PRIMARY KEY (id, "timestamp")')
+
+        # One partition per day from the oldest existing row up to PREMAKE_DAYS ahead
+        op.execute(f"""
+            DO $$
+            DECLARE
+                day date;
+                last_day date;
+            BEGIN
+                SELECT COALESCE(MIN("timestamp")::date, CURRENT_DATE),
+                       GREATEST(CURRENT_DATE, COALESCE(MAX("timestamp")::date, CURRENT_DATE)) + {PREMAKE_DAYS}
+                  INTO day, last_day
+                  FROM {table};
+                WHILE day <= last_day LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF {new_table} FOR VALUES FROM (%L) TO (%L)',
+                        '{table}_p' || to_char(day, 'YYYYMMDD'), day, day + 1
+                    );
+                    day := day + 1;
+                END LOOP;
+            END $$;
+        """)
+
+        _swap_in(table, new_table)
+
+
+def downgrade() -> None:
+    if not _is_postgres():
+        return
+
+    for table in HOT_TABLES:
+        new_table = f'{table}_plain'
+        op.execute(f'CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE {new_table} ADD PRIMARY KEY (id)')
+        # Dropping the partitioned parent drops all of its partitions too
+        _swap_in(table, new_table)
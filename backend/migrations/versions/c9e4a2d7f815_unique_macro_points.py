@@ -0,0 +1,40 @@
+"""unique_macro_points
+
+Revision ID: c9e4a2d7f815
+Revises: b7d2f5a81c46
+Create Date: 2025-05-08 09:00:00.000000
+
+Full Alpha Vantage series are now upserted into macro_points, deduplicated
+on (indicator, timestamp). Existing duplicates are removed, keeping one row
+per observation, and the composite index becomes unique so it can serve as
+the ON CONFLICT target.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e4a2d7f815'
+down_revision: Union[str, None] = 'b7d2f5a81c46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DELETE FROM macro_points
+        WHERE id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MIN(id) AS keep_id FROM macro_points GROUP BY indicator, timestamp
+            ) AS keep
+        )
+    """)
+    op.drop_index('idx_macro_points_indicator_timestamp', table_name='macro_points')
+    op.create_index('idx_macro_points_indicator_timestamp', 'macro_points', ['indicator', 'timestamp'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_macro_points_indicator_timestamp', table_name='macro_points')
+    op.create_index('idx_macro_points_indicator_timestamp', 'macro_points', ['indicator', 'timestamp'], unique=False)
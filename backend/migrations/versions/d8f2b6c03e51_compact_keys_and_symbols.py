@@ -0,0 +1,189 @@
+"""compact_keys_and_symbols
+
+Revision ID: d8f2b6c03e51
+Revises: c4e1a9d27b3f
+Create Date: 2025-04-24 09:00:00.000000
+
+Replace the string primary keys of market_snapshots (symbol + ISO timestamp)
+and liquidations / trades_large (uuid4 text) with bigint sequence keys, add
+a normalized symbols dimension referenced through symbol_id, and drop the
+indexes that duplicate another index on the same table.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f2b6c03e51'
+down_revision: Union[str, None] = 'c4e1a9d27b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HOT_TABLES = ['market_snapshots', 'liquidations', 'trades_large']
+
+# Indexes made redundant by another index covering the same leading columns
+REDUNDANT_INDEXES = {
+    'market_snapshots': [('ix_market_snapshots_symbol', ['symbol'])],
+    'liquidations': [('ix_liquidations_timestamp', ['timestamp'])],
+    'trades_large': [('ix_trades_large_timestamp', ['timestamp'])],
+}
+
+# Indexes kept on each table after the upgrade
+KEPT_INDEXES = {
+    'market_snapshots': [
+        ('idx_market_snapshots_timestamp', ['timestamp']),
+        ('idx_market_snapshots_symbol_timestamp', ['symbol', 'timestamp']),
+    ],
+    'liquidations': [
+        ('ix_liquidations_symbol', ['symbol']),
+        ('idx_liquidations_timestamp', ['timestamp']),
+    ],
+    'trades_large': [
+        ('ix_trades_large_symbol', ['symbol']),
+        ('idx_trades_large_timestamp', ['timestamp']),
+    ],
+}
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def _columns(table: str) -> list:
+    """Post-upgrade column layout of each hot table (without the id column)."""
+    common = [
+        sa.Column('symbol_id', sa.Integer(), sa.ForeignKey('symbols.id'), nullable=True),
+        sa.Column('symbol', sa.String(), nullable=False),
+    ]
+    if table == 'market_snapshots':
+        return common + [
+            sa.Column('timestamp', sa.DateTime(), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.Column('open', sa.Float(), nullable=True),
+            sa.Column('high', sa.Float(), nullable=True),
+            sa.Column('low', sa.Float(), nullable=True),
+            sa.Column('close', sa.Float(), nullable=True),
+            sa.Column('volume', sa.Float(), nullable=True),
+            sa.Column('volume_24h', sa.Float(), nullable=True),
+            sa.Column('percent_change_1h', sa.Float(), nullable=True),
+            sa.Column('percent_change_24h', sa.Float(), nullable=True),
+            sa.Column('percent_change_7d', sa.Float(), nullable=True),
+            sa.Column('funding_rate', sa.Float(), nullable=True),
+            sa.Column('ts_created', sa.DateTime(), nullable=True),
+        ]
+    if table == 'liquidations':
+        return common + [
+            sa.Column('side', sa.String(), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.Column('quantity', sa.Float(), nullable=False),
+            sa.Column('timestamp', sa.DateTime(), nullable=False),
+            sa.Column('exchange', sa.String(), nullable=True),
+            sa.Column('value_usd', sa.Float(), nullable=False),
+            sa.Column('position_size', sa.Float(), nullable=True),
+            sa.Column('leverage', sa.Integer(), nullable=True),
+            sa.Column('ts_created', sa.DateTime(), nullable=True),
+        ]
+    return common + [
+        sa.Column('side', sa.String(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('quantity', sa.Float(), nullable=False),
+        sa.Column('value_usd', sa.Float(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('exchange', sa.String(), nullable=True),
+        sa.Column('is_liquidation', sa.String(), nullable=True),
+        sa.Column('ts_created', sa.DateTime(), nullable=True),
+    ]
+
+
+def _upgrade_postgres(table: str) -> None:
+    for index_name, _ in REDUNDANT_INDEXES[table]:
+        op.execute(f'DROP INDEX IF EXISTS {index_name}')
+    if table == 'market_snapshots':
+        # Match the name the ORM model uses for the timestamp index
+        op.execute('ALTER INDEX IF EXISTS ix_market_snapshots_timestamp RENAME TO idx_market_snapshots_timestamp')
+
+    # Swap the text key for a bigint sequence; existing rows are numbered by the ADD COLUMN rewrite
+    op.execute(f'ALTER TABLE {table} DROP CONSTRAINT {table}_pkey')
+    op.execute(f'ALTER TABLE {table} DROP COLUMN id')
+    op.execute(f'CREATE SEQUENCE {table}_id_seq AS BIGINT')
+    op.execute(f"ALTER TABLE {table} ADD COLUMN id BIGINT NOT NULL DEFAULT nextval('{table}_id_seq')")
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    # Partitioned tables need the partition key in the primary key
+    op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, "timestamp")')
+
+    op.execute(f'ALTER TABLE {table} ADD COLUMN symbol_id INTEGER REFERENCES symbols (id)')
+    op.execute(f'UPDATE {table} SET symbol_id = s.id FROM symbols s WHERE s.symbol = {table}.symbol')
+
+
+def _upgrade_generic(table: str) -> None:
+    """Rebuild the table; SQLite cannot change a primary key in place."""
+    new_table = f'{table}_new'
+    columns = _columns(table)
+    op.create_table(
+        new_table,
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        *columns,
+    )
+
+    names = ', '.join(c.name for c in columns if c.name != 'symbol_id')
+    op.execute(f'INSERT INTO {new_table} ({names}) SELECT {names} FROM {table} ORDER BY timestamp')
+    op.execute(
+        f'UPDATE {new_table} SET symbol_id = '
+        f'(SELECT id FROM symbols WHERE symbols.symbol = {new_table}.symbol)'
+    )
+
+    op.drop_table(table)
+    op.rename_table(new_table, table)
+    for index_name, index_columns in KEPT_INDEXES[table]:
+        op.create_index(index_name, table, index_columns, unique=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'symbols',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('ts_created', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('symbol'),
+    )
+    op.execute(
+        'INSERT INTO symbols (symbol) '
+        'SELECT symbol FROM market_snapshots '
+        'UNION SELECT symbol FROM liquidations '
+        'UNION SELECT symbol FROM trades_large'
+    )
+
+    for table in HOT_TABLES:
+        if _is_postgres():
+            _upgrade_postgres(table)
+        else:
+            _upgrade_generic(table)
+
+
+def downgrade() -> None:
+    for table in HOT_TABLES:
+        if _is_postgres():
+            op.execute(f'ALTER TABLE {table} DROP COLUMN symbol_id')
+            op.execute(f'ALTER TABLE {table} DROP CONSTRAINT {table}_pkey')
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT')
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN id TYPE VARCHAR USING id::text')
+            op.execute(f'DROP SEQUENCE {table}_id_seq')
+            op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, "timestamp")')
+            if table == 'market_snapshots':
+                op.execute('ALTER INDEX idx_market_snapshots_timestamp RENAME TO ix_market_snapshots_timestamp')
+        else:
+            with op.batch_alter_table(table, recreate='always') as batch_op:
+                batch_op.drop_column('symbol_id')
+                batch_op.alter_column('id', type_=sa.String(), existing_nullable=False)
+            if table == 'market_snapshots':
+                op.drop_index('idx_market_snapshots_timestamp', table_name=table)
+                op.create_index('ix_market_snapshots_timestamp', table, ['timestamp'], unique=False)
+
+        for index_name, index_columns in REDUNDANT_INDEXES[table]:
+            op.create_index(index_name, table, index_columns, unique=False)
+
+    op.drop_table('symbols')
@@ -0,0 +1,60 @@
+"""add_rollup_tables
+
+Revision ID: e5a7c3f91d28
+Revises: d8f2b6c03e51
+Create Date: 2025-04-28 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3f91d28'
+down_revision: Union[str, None] = 'd8f2b6c03e51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # OHLCV candles per symbol at 1m, 5m, 1h and 1d
+    op.create_table(
+        'ohlcv_rollups',
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('interval', sa.String(), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('open', sa.Float(), nullable=False),
+        sa.Column('high', sa.Float(), nullable=False),
+        sa.Column('low', sa.Float(), nullable=False),
+        sa.Column('close', sa.Float(), nullable=False),
+        sa.Column('volume', sa.Float(), nullable=True),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+        sa.Column('first_ts', sa.DateTime(), nullable=False),
+        sa.Column('last_ts', sa.DateTime(), nullable=False),
+        sa.Column('ts_updated', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('symbol', 'interval', 'bucket')
+    )
+    op.create_index('idx_ohlcv_rollups_interval_bucket', 'ohlcv_rollups', ['interval', 'bucket'], unique=False)
+
+    # Liquidation and large-trade volume per symbol and side
+    op.create_table(
+        'flow_rollups',
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('side', sa.String(), nullable=False),
+        sa.Column('interval', sa.String(), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Float(), nullable=False),
+        sa.Column('value_usd', sa.Float(), nullable=False),
+        sa.Column('ts_updated', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('kind', 'symbol', 'side', 'interval', 'bucket')
+    )
+    op.create_index('idx_flow_rollups_kind_interval_bucket', 'flow_rollups', ['kind', 'interval', 'bucket'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('flow_rollups')
+    op.drop_table('ohlcv_rollups')
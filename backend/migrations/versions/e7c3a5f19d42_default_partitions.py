@@ -0,0 +1,45 @@
+"""default_partitions
+
+Revision ID: e7c3a5f19d42
+Revises: a4d8e1c75b20
+Create Date: 2025-05-10 09:00:00.000000
+
+Give each daily-partitioned hot table a DEFAULT partition (Postgres only).
+Rows whose day has no partition yet, e.g. after the worker was down for
+longer than PARTITION_PREMAKE_DAYS, land there instead of failing the
+insert. The worker moves them into the day partition when it creates it.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c3a5f19d42'
+down_revision: Union[str, None] = 'a4d8e1c75b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONED_TABLES = ['market_snapshots', 'liquidations', 'trades_large']
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    if not _is_postgres():
+        return
+
+    for table in PARTITIONED_TABLES:
+        op.execute(f'CREATE TABLE IF NOT EXISTS {table}_pdefault PARTITION OF {table} DEFAULT')
+
+
+def downgrade() -> None:
+    if not _is_postgres():
+        return
+
+    # Rows still in a default partition have no day partition to go to and are dropped with it
+    for table in PARTITIONED_TABLES:
+        op.execute(f'DROP TABLE IF EXISTS {table}_pdefault')
@@ -0,0 +1,55 @@
+"""add_latest_market_state
+
+Revision ID: f3b9d4e62a17
+Revises: e5a7c3f91d28
+Create Date: 2025-04-30 10:00:00.000000
+
+One row per symbol holding its most recent market snapshot, so /api/data no
+longer has to aggregate the whole market_snapshots table.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d4e62a17'
+down_revision: Union[str, None] = 'e5a7c3f91d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'latest_market_state',
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('symbol_id', sa.Integer(), sa.ForeignKey('symbols.id'), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('volume_24h', sa.Float(), nullable=True),
+        sa.Column('percent_change_1h', sa.Float(), nullable=True),
+        sa.Column('percent_change_24h', sa.Float(), nullable=True),
+        sa.Column('percent_change_7d', sa.Float(), nullable=True),
+        sa.Column('funding_rate', sa.Float(), nullable=True),
+        sa.Column('ts_updated', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('symbol'),
+    )
+
+    # Seed from the newest snapshot of each symbol; the highest id breaks timestamp ties
+    op.execute(
+        'INSERT INTO latest_market_state '
+        '(symbol, symbol_id, timestamp, price, volume_24h, percent_change_1h, '
+        'percent_change_24h, percent_change_7d, funding_rate, ts_updated) '
+        'SELECT s.symbol, s.symbol_id, s.timestamp, s.price, s.volume_24h, s.percent_change_1h, '
+        's.percent_change_24h, s.percent_change_7d, s.funding_rate, CURRENT_TIMESTAMP '
+        'FROM market_snapshots s '
+        'WHERE s.id = ('
+        'SELECT m.id FROM market_snapshots m WHERE m.symbol = s.symbol '
+        'ORDER BY m.timestamp DESC, m.id DESC LIMIT 1)'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('latest_market_state')
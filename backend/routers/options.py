@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Dict, Any, Optional
 from services.deribit_options import get_btc_options, filter_options
+from services.options_analytics import CURRENCIES, OptionsAnalytics, get_options_analytics
 
 router = APIRouter(prefix="/options", tags=["options"])
 
@@ -16,7 +17,7 @@ async def get_btc_options_data(
     Get BTC options data from Deribit API with optional filtering
     """
     # Fetch options data from Deribit
-    result = get_btc_options(expired=include_expired)
+    result = await get_btc_options(expired=include_expired)
     
     if not result["success"]:
         raise HTTPException(status_code=500, detail=result["error"])
@@ -32,7 +33,7 @@ async def get_btc_options_data(
     # Apply filters if provided
     if any([option_type, min_strike is not None, max_strike is not None, expiry_date]):
         filtered_data = filter_options(
-            result["data"], 
+            result["chain"], 
             option_type=option_type, 
             min_strike=min_strike, 
             max_strike=max_strike, 
@@ -53,4 +54,72 @@ async def get_btc_options_data(
         "data": result["data"],
         "filtered": False,
         **summary_counts # Include original counts
-    } 
\ No newline at end of file
+    }
+
+async def _analytics_for(currency: str) -> OptionsAnalytics:
+    currency = currency.upper()
+    if currency not in CURRENCIES:
+        raise HTTPException(status_code=404, detail=f"Unsupported currency: {currency}")
+    analytics = await get_options_analytics(currency)
+    if analytics is None:
+        raise HTTPException(status_code=503, detail="Deribit book summaries unavailable")
+    return analytics
+
+@router.get("/{currency}/analytics")
+async def get_options_analytics_summary(currency: str) -> Dict[str, Any]:
+    """
+    Open interest, put/call ratios and max pain per expiry from live Deribit book summaries
+    """
+    analytics = await _analytics_for(currency)
+    return {
+        "success": True,
+        "currency": analytics.currency,
+        "updated_at": analytics.updated_at,
+        **analytics.totals(),
+        "expiries": analytics.expiry_summary(),
+    }
+
+@router.get("/{currency}/greeks")
+async def get_options_greeks(
+    currency: str,
+    expiry_date: Optional[str] = Query(None, description="Filter by specific expiry date (YYYY-MM-DD)")
+) -> Dict[str, Any]:
+    """
+    Black-76 implied volatility, delta, gamma and vega per instrument
+    """
+    analytics = await _analytics_for(currency)
+    return {
+        "success": True,
+        "currency": analytics.currency,
+        "updated_at": analytics.updated_at,
+        "data": analytics.instruments(expiry_date),
+    }
+
+@router.get("/{currency}/open-interest")
+async def get_options_open_interest(
+    currency: str,
+    expiry_date: Optional[str] = Query(None, description="Filter by specific expiry date (YYYY-MM-DD)")
+) -> Dict[str, Any]:
+    """
+    Call and put open interest by strike
+    """
+    analytics = await _analytics_for(currency)
+    return {
+        "success": True,
+        "currency": analytics.currency,
+        "updated_at": analytics.updated_at,
+        "data": analytics.open_interest_by_strike(expiry_date),
+    }
+
+@router.get("/{currency}/surface")
+async def get_options_iv_surface(currency: str) -> Dict[str, Any]:
+    """
+    Implied volatility surface on an expiry x strike grid
+    """
+    analytics = await _analytics_for(currency)
+    return {
+        "success": True,
+        "currency": analytics.currency,
+        "updated_at": analytics.updated_at,
+        **analytics.surface(),
+    }
@@ -0,0 +1,76 @@
+"""
+Benchmark bubble-outlier scoring: the vectorized one-pass detector versus
+scoring each symbol separately, on minute-level price windows.
+
+Usage: python scripts/bench_bubbles.py [symbols] [days]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from worker.bubbles import price_matrix, window_stats, score_symbols
+
+MINUTE = 60
+
+
+def make_rows(symbols: int, days: int, start: datetime):
+    """Random-walk closes for every symbol and minute, with about 1% of minutes missing."""
+    rng = np.random.default_rng(7)
+    minutes = days * 24 * 60
+    walks = 100.0 * np.exp(np.cumsum(rng.normal(0, 1e-3, size=(symbols, minutes)), axis=1))
+    keep = rng.random((symbols, minutes)) > 0.01
+    sym_idx, minute_idx = np.nonzero(keep)
+    names = [f"SYM{i:03d}" for i in range(symbols)]
+    timestamps = np.datetime64(start, "s") + minute_idx.astype("timedelta64[m]")
+    return [names[i] for i in sym_idx], timestamps, walks[keep], walks[:, -1] * 1.05
+
+
+def per_symbol(symbols, timestamps, prices, current_by_name, start, columns):
+    """Group rows per symbol, then compute each baseline in its own pass."""
+    grouped = {}
+    for i, name in enumerate(symbols):
+        grouped.setdefault(name, []).append(i)
+    results = []
+    for name, idx in grouped.items():
+        window = np.full(columns, np.nan)
+        offsets = (timestamps[idx] - np.datetime64(start, "s")).astype(np.int64) // MINUTE
+        window[offsets] = prices[idx]
+        mean, std = np.nanmean(window), np.nanstd(window)
+        results.append((name, (current_by_name[name] - mean) / std))
+    results.sort(key=lambda r: -abs(r[1]))
+    return results
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    start = datetime(2025, 1, 1)
+    columns = days * 24 * 60
+    names = [f"SYM{i:03d}" for i in range(symbols)]
+
+    rows, timestamps, prices, current = make_rows(symbols, days, start)
+    print(f"{len(rows):,} minute closes across {symbols} symbols x {days} days")
+
+    started = time.perf_counter()
+    windows = price_matrix(rows, timestamps, prices, start, MINUTE, columns)
+    built = time.perf_counter()
+    counts, means, variances = window_stats(windows)
+    ranked = score_symbols(names, current, means, variances, counts, days, min_samples=60)
+    vectorized = time.perf_counter() - started
+    print(f"vectorized   {vectorized:8.2f} s  (matrix {built - started:.2f} s, scoring {vectorized - (built - started):.2f} s)")
+
+    started = time.perf_counter()
+    baseline = per_symbol(rows, timestamps, prices, dict(zip(names, current)), start, columns)
+    looped = time.perf_counter() - started
+    print(f"per-symbol   {looped:8.2f} s  ({looped / vectorized:.1f}x slower)")
+
+    assert [r["symbol"] for r in ranked[:10]] == [name for name, _ in baseline[:10]]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark insert throughput and on-disk size of the hot tables with the old
+string primary keys and duplicate indexes versus the compact integer keys.
+
+Usage: python scripts/bench_keys.py [rows]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import Table, Column, String, Float, DateTime, Index, MetaData, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.models.symbol import Symbol
+from app.models.market_snapshot import MarketSnapshot
+from app.models.liquidation import Liquidation
+
+SYMBOLS = ["BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOGE", "AVAX", "DOT", "LINK"]
+BATCH_SIZE = 1000
+
+# Layout created by 01_init_schema, including its duplicate timestamp indexes
+legacy_metadata = MetaData()
+legacy_snapshots = Table(
+    "market_snapshots", legacy_metadata,
+    Column("id", String, primary_key=True),
+    Column("symbol", String, nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Column("price", Float, nullable=False),
+    Column("volume_24h", Float),
+    Column("funding_rate", Float),
+    Index("ix_market_snapshots_symbol", "symbol"),
+    Index("ix_market_snapshots_timestamp", "timestamp"),
+    Index("idx_market_snapshots_symbol_timestamp", "symbol", "timestamp"),
+)
+legacy_liquidations = Table(
+    "liquidations", legacy_metadata,
+    Column("id", String, primary_key=True),
+    Column("symbol", String, nullable=False),
+    Column("side", String, nullable=False),
+    Column("price", Float, nullable=False),
+    Column("quantity", Float, nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Column("value_usd", Float, nullable=False),
+    Index("ix_liquidations_symbol", "symbol"),
+    Index("ix_liquidations_timestamp", "timestamp"),
+    Index("idx_liquidations_timestamp", "timestamp"),
+)
+
+
+def make_rows(rows: int, compact: bool):
+    start = datetime(2025, 1, 1)
+    snapshots, liquidations = [], []
+    for i in range(rows):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        ts = start + timedelta(seconds=i)
+        snapshot = {"symbol": symbol, "timestamp": ts, "price": 100.0 + i, "volume_24h": 1e9, "funding_rate": 1e-4}
+        liquidation = {"symbol": symbol, "side": "sell", "price": 100.0, "quantity": 1.0,
+                       "timestamp": ts, "value_usd": 100.0}
+        if compact:
+            symbol_id = SYMBOLS.index(symbol) + 1
+            snapshot["symbol_id"] = symbol_id
+            liquidation["symbol_id"] = symbol_id
+        else:
+            snapshot["id"] = f"{symbol}_{ts.isoformat()}"
+            liquidation["id"] = str(uuid.uuid4())
+        snapshots.append(snapshot)
+        liquidations.append(liquidation)
+    return snapshots, liquidations
+
+
+async def run(label: str, rows: int, compact: bool) -> None:
+    path = os.path.join(tempfile.mkdtemp(), f"{label}.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    if compact:
+        metadata = Base.metadata
+        tables = [Symbol.__table__, MarketSnapshot.__table__, Liquidation.__table__]
+        snapshot_table, liquidation_table = MarketSnapshot.__table__, Liquidation.__table__
+    else:
+        metadata = legacy_metadata
+        tables = None
+        snapshot_table, liquidation_table = legacy_snapshots, legacy_liquidations
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: metadata.create_all(c, tables=tables))
+        if compact:
+            await conn.execute(insert(Symbol.__table__), [{"symbol": s} for s in SYMBOLS])
+
+    snapshots, liquidations = make_rows(rows, compact)
+    started = time.perf_counter()
+    for i in range(0, rows, BATCH_SIZE):
+        async with engine.begin() as conn:
+            await conn.execute(insert(snapshot_table), snapshots[i:i + BATCH_SIZE])
+            await conn.execute(insert(liquidation_table), liquidations[i:i + BATCH_SIZE])
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"{label:<8} {rows * 2:>10,} rows  {elapsed:8.2f} s  {rows * 2 / elapsed:>10,.0f} rows/s  {size_mb:8.1f} MB")
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"Inserting {rows:,} snapshots + {rows:,} liquidations in batches of {BATCH_SIZE}")
+    await run("legacy", rows, compact=False)
+    await run("compact", rows, compact=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark the /api/data latest-snapshot lookup: the GROUP BY / max(timestamp)
+join over market_snapshots versus reading the latest_market_state table.
+
+Usage: python scripts/bench_latest_state.py [rows] [symbols]
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.models.symbol import Symbol
+from app.models.market_snapshot import MarketSnapshot
+from app.models.latest_market_state import LatestMarketState
+
+BATCH_SIZE = 100_000
+REPEATS = 5
+
+
+def seed(path: str, rows: int, symbols: int) -> None:
+    """Fill the snapshot table with the plain sqlite3 driver; far faster than the ORM."""
+    names = [f"SYM{i}" for i in range(symbols)]
+    start = datetime(2025, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO symbols (id, symbol) VALUES (?, ?)", [(i + 1, n) for i, n in enumerate(names)])
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = [
+            (i % symbols + 1, names[i % symbols],
+             (start + timedelta(seconds=i // symbols * 20)).isoformat(sep=" "), 100.0 + i % 1000)
+            for i in range(offset, min(offset + BATCH_SIZE, rows))
+        ]
+        conn.executemany(
+            "INSERT INTO market_snapshots (symbol_id, symbol, timestamp, price) VALUES (?, ?, ?, ?)", batch
+        )
+        conn.commit()
+    conn.execute(
+        "INSERT INTO latest_market_state (symbol, symbol_id, timestamp, price) "
+        "SELECT symbol, symbol_id, max(timestamp), price FROM market_snapshots GROUP BY symbol"
+    )
+    conn.commit()
+    conn.close()
+
+
+async def timed(engine, query) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        async with engine.connect() as conn:
+            result = await conn.execute(query)
+            result.all()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    path = os.path.join(tempfile.mkdtemp(), "latest.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    tables = [Symbol.__table__, MarketSnapshot.__table__, LatestMarketState.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(c, tables=tables))
+
+    print(f"Seeding {rows:,} snapshots across {symbols} symbols")
+    seed(path, rows, symbols)
+
+    subquery = select(
+        MarketSnapshot.symbol,
+        func.max(MarketSnapshot.timestamp).label("max_timestamp")
+    ).group_by(MarketSnapshot.symbol).subquery()
+    group_by_query = select(MarketSnapshot).join(
+        subquery,
+        and_(
+            MarketSnapshot.symbol == subquery.c.symbol,
+            MarketSnapshot.timestamp == subquery.c.max_timestamp
+        )
+    )
+
+    old = await timed(engine, group_by_query)
+    new = await timed(engine, select(LatestMarketState))
+    await engine.dispose()
+
+    print(f"group by max(timestamp)  {old * 1000:10.2f} ms")
+    print(f"latest_market_state      {new * 1000:10.2f} ms  ({old / new:,.0f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""
+Load-test the Deribit option ticker cache offline against the local replay
+stand-in: ingest throughput, analytics update cost, and read latency of the
+in-memory chain the router serves.
+
+Usage: python scripts/bench_options_stream.py [expiries] [strikes] [rounds]
+       python scripts/bench_options_stream.py --recording ticks.ndjson
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import deribit_options, options_analytics
+from services.deribit_options import DeribitTickerCache
+from services.deribit_replay import DeribitReplayServer, load_recording, synthetic_session
+from services.options_analytics import OptionsAnalytics, get_options_analytics
+
+
+async def run(instruments, ticks) -> None:
+    currency = instruments[0]["base_currency"]
+    analytics = OptionsAnalytics(currency)
+    options_analytics._analytics[currency] = analytics
+    update_seconds = []
+
+    def on_batch(rows, full):
+        started = time.perf_counter()
+        analytics.update(rows, full=full)
+        update_seconds.append(time.perf_counter() - started)
+
+    async with DeribitReplayServer(instruments, ticks, speed=0) as server:
+        cache = DeribitTickerCache(currency, url=server.url, on_batch=on_batch, flush_interval=0.1)
+        deribit_options._ticker_caches[currency] = cache
+        started = time.perf_counter()
+        cache.start()
+        while cache.messages < len(ticks):
+            await asyncio.sleep(0.01)
+        ingest = time.perf_counter() - started
+        await asyncio.sleep(0.2)  # Let the last batch flush
+
+        reads = 1000
+        started = time.perf_counter()
+        for _ in range(reads):
+            (await get_options_analytics(currency)).expiry_summary()
+        read = (time.perf_counter() - started) / reads
+        await cache.stop()
+
+    print(f"{len(instruments)} instruments, {len(ticks)} ticker messages")
+    print(f"ingest: {ingest:.2f} s ({len(ticks) / ingest:,.0f} msg/s)")
+    print(f"analytics batches: {len(update_seconds)}, "
+          f"mean {sum(update_seconds) / len(update_seconds) * 1000:.1f} ms, max {max(update_seconds) * 1000:.1f} ms")
+    print(f"summary read from memory: {read * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--recording":
+        instruments, ticks = load_recording(sys.argv[2])
+    else:
+        args = [int(arg) for arg in sys.argv[1:4]]
+        expiries, strikes, rounds = args + [8, 40, 20][len(args):]
+        instruments, ticks = synthetic_session(expiries=expiries, strikes=strikes, rounds=rounds)
+    asyncio.run(run(instruments, ticks))
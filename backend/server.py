@@ -12,13 +12,14 @@ import sys
 # Load environment variables from .env file in parent directory
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
 from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.logging import setup_logging
 from data_aggregator import gather_dashboard_data
 from data_sources.hyperliquid import get_hyperliquid_service
@@ -34,24 +35,20 @@ from data_sources.trades import (
     get_trade_tracker
 )
 from data_sources.binance_utils import get_top_symbols_from_binance
-from data_sources.alpha_vantage import (
-    fetch_latest_cpi,
-    fetch_latest_fed_funds_rate,
-    fetch_latest_unemployment,
-    fetch_latest_wti,
-    fetch_latest_brent,
-    fetch_latest_natural_gas,
-    fetch_latest_copper,
-    fetch_latest_corn,
-    fetch_latest_wheat,
-    fetch_latest_coffee,
-    fetch_latest_sugar
-)
-from app.models.schemas import ApiResponse, DashboardData, MacroData, MacroDataPoint
+from data_sources.rate_limiter import limiter_metrics
+from data_sources.response_cache import get_response_cache
+from data_sources.alpha_vantage import MACRO_INDICATORS
+from worker.macro import macro_refresh_loop, load_latest_macro_points, load_macro_history
+from app.models.schemas import ApiResponse, DashboardData, MacroData, MacroDataPoint, MacroHistory
+import shared_state
 from shared_state import macro_data_cache
 import aiohttp
 from fastapi.responses import JSONResponse
 from routers.options import router as options_router
+from app.api.routes import history_router
+from services.deribit_options import close_client as close_deribit_client, stop_ticker_caches
+from services.options_analytics import start_options_streams
+from services.funding_monitor import get_funding_monitor, start_funding_monitor, stop_funding_monitor
 
 # Initialize logging
 setup_logging()
@@ -73,6 +70,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(options_router, prefix="/api")
+app.include_router(history_router)
 
 # Error handling middleware
 class ErrorHandlingMiddleware(BaseHTTPMiddleware):
@@ -164,6 +162,80 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/api/metrics/rate-limits")
+async def get_rate_limit_metrics():
+    """Queue depth and wait times of the per-host upstream rate limiters"""
+    return {
+        "limiters": limiter_metrics(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/metrics/response-cache")
+async def get_response_cache_metrics():
+    """Hit rates and entry counts of the persistent upstream response cache"""
+    return {
+        "cache": get_response_cache().metrics(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/hyperliquid/asset-contexts")
+async def get_hyperliquid_asset_contexts():
+    """Funding, open interest and prices per Hyperliquid perp from the WebSocket stream"""
+    service = await get_hyperliquid_service()
+    return {
+        "assets": service.asset_contexts.snapshot(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/liquidation-heatmap")
+async def get_liquidation_heatmap_symbols():
+    """Notional at risk per coin over the watched Hyperliquid accounts"""
+    service = await get_hyperliquid_service()
+    return {
+        "symbols": service.liquidation_heatmap.symbols(),
+        "closest": service.position_risks,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/liquidation-heatmap/{symbol}")
+async def get_liquidation_heatmap(
+    symbol: str,
+    range_pct: float = Query(0.1, gt=0, le=1.0, description="Price range around the mark, as a fraction"),
+):
+    """Long and short notional per liquidation price bucket for one coin"""
+    service = await get_hyperliquid_service()
+    heatmap = service.liquidation_heatmap.heatmap(symbol.upper(), range_pct)
+    if heatmap is None:
+        raise HTTPException(status_code=404, detail=f"No tracked positions for {symbol}")
+    return {**heatmap, "timestamp": datetime.now().isoformat()}
+
+@app.get("/api/funding/spreads")
+async def get_funding_spreads(
+    limit: int = Query(settings.FUNDING_SPREADS_TOP_N, ge=1, le=settings.FUNDING_SPREADS_TOP_N,
+                       description="Maximum spreads returned"),
+):
+    """Widest annualized funding spreads between Binance and Hyperliquid"""
+    monitor = get_funding_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=503, detail="Funding monitor is not running")
+    return {
+        "spreads": monitor.spreads[:limit],
+        "version": monitor.version,
+        "symbols_tracked": len(monitor.table),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/funding/{symbol}")
+async def get_symbol_funding(symbol: str):
+    """Current and predicted funding of one coin on each venue"""
+    monitor = get_funding_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=503, detail="Funding monitor is not running")
+    funding = monitor.table.get(symbol) or monitor.table.get(symbol.upper())
+    if funding is None:
+        raise HTTPException(status_code=404, detail=f"No funding data for {symbol}")
+    return {**funding, "timestamp": datetime.now().isoformat()}
+
 @app.get("/api/data")
 async def get_data():
     """API endpoint to get dashboard data"""
@@ -247,90 +319,24 @@ async def broadcast_data():
         await asyncio.sleep(1) # Consider making this interval configurable
 
 async def fetch_and_cache_macro_data():
-    """Fetches all macro data points and caches them in shared_state."""
+    """Rebuilds the shared macro cache from the newest observations in macro_points."""
     global macro_data_cache
-    # Warn about rate limits
-    logger.warning("Fetching multiple Alpha Vantage endpoints. Be mindful of the 25 requests/day free limit.")
-    logger.info("Fetching initial macro & commodity data from Alpha Vantage...")
-    
-    # Fetch all data points concurrently
-    results = await asyncio.gather(
-        fetch_latest_cpi(),
-        fetch_latest_fed_funds_rate(),
-        fetch_latest_unemployment(),
-        fetch_latest_wti(),
-        fetch_latest_brent(),
-        fetch_latest_natural_gas(),
-        fetch_latest_copper(),
-        fetch_latest_corn(),
-        fetch_latest_wheat(),
-        fetch_latest_coffee(),
-        fetch_latest_sugar(),
-        return_exceptions=True # Return exceptions instead of raising them
-    )
-    
-    # Unpack results, handling potential errors
-    cpi_res, fed_res, unemp_res, wti_res, brent_res, ng_res, copper_res, corn_res, wheat_res, coffee_res, sugar_res = \
-        [(r if isinstance(r, tuple) else r) for r in results] # Keep exceptions as is, tuples as is
-
-    def create_point(name: str, result: Optional[Union[Tuple[str, str], Exception]]) -> Optional[MacroDataPoint]:
-        """Tries to create a MacroDataPoint from fetch result. Handles errors.
-        
-        Args:
-            name: Name of the data point (e.g., 'CPI')
-            result: Output from fetch function - Tuple(date_str, value_str), None, or Exception.
-
-        Returns:
-            MacroDataPoint if successful, None otherwise.
-        """
-        if isinstance(result, Exception):
-            logger.warning(f"Failed to fetch {name}: {result}")
-            return None
-        elif result is None:
-            logger.warning(f"No data received for {name} (likely rate limited or API error).")
-            return None
-        elif isinstance(result, tuple) and len(result) == 2:
-            date_str, value_str = result
-            try:
-                # Attempt to parse date and value
-                timestamp_dt = datetime.strptime(date_str, '%Y-%m-%d')
-                value_float = float(value_str)
-                return MacroDataPoint(timestamp=timestamp_dt, value=value_float)
-            except (ValueError, TypeError) as e:
-                logger.error(f"Error parsing data for {name}: Date='{date_str}', Value='{value_str}'. Error: {e}")
-                return None
-        else:
-            logger.error(f"Unexpected result format for {name}: {result}")
-            return None
-
-    # Create points, handling None returns
-    cpi_point = create_point("CPI (Monthly)", cpi_res)
-    fed_point = create_point("Fed Rate (Daily)", fed_res)
-    unemp_point = create_point("Unemployment (Monthly)", unemp_res)
-    wti_point = create_point("WTI Oil (Daily)", wti_res)
-    brent_point = create_point("Brent Oil (Daily)", brent_res)
-    ng_point = create_point("Natural Gas (Daily)", ng_res)
-    copper_point = create_point("Copper (Daily)", copper_res)
-    corn_point = create_point("Corn (Daily)", corn_res)
-    wheat_point = create_point("Wheat (Daily)", wheat_res)
-    coffee_point = create_point("Coffee (Daily)", coffee_res)
-    sugar_point = create_point("Sugar (Daily)", sugar_res)
-
-    # Assign to cache, using None if creation failed
-    macro_data_cache = MacroData(
-        cpi=cpi_point,
-        fed_rate=fed_point,
-        unemployment=unemp_point,
-        wti_oil=wti_point,
-        brent_oil=brent_point,
-        natural_gas=ng_point,
-        copper=copper_point,
-        corn=corn_point,
-        wheat=wheat_point,
-        coffee=coffee_point,
-        sugar=sugar_point
-    )
-    logger.info("Finished fetching macro & commodity data.")
+    async with SessionLocal() as session:
+        points = await load_latest_macro_points(session)
+    macro_data_cache = shared_state.macro_data_cache = MacroData(**{
+        indicator: MacroDataPoint(timestamp=point.timestamp, value=point.value)
+        for indicator, point in points.items()
+    })
+    logger.info(f"Macro cache rebuilt from {len(points)} stored indicators.")
+
+async def macro_cache_loop():
+    """Rebuilds the macro cache from macro_points every MACRO_REFRESH_INTERVAL seconds."""
+    while True:
+        try:
+            await fetch_and_cache_macro_data()
+        except Exception as e:
+            logger.error(f"Error rebuilding macro cache: {str(e)}")
+        await asyncio.sleep(settings.MACRO_REFRESH_INTERVAL)
 
 @app.on_event("startup")
 async def startup_event():
@@ -352,9 +358,24 @@ async def startup_event():
         top_symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
         logger.info(f"Using default symbols: {top_symbols}")
     
-    # Fetch initial macro data (async)
-    asyncio.create_task(fetch_and_cache_macro_data())
-    logger.info("Macro data fetching task scheduled.")
+    # The worker fetches macro data and owns the Alpha Vantage quota; web
+    # instances only re-read what it stored in macro_points
+    if settings.MACRO_REFRESH_IN_WEB:
+        asyncio.create_task(macro_refresh_loop(SessionLocal, on_refresh=fetch_and_cache_macro_data))
+    else:
+        asyncio.create_task(macro_cache_loop())
+    logger.info("Macro data refresh task scheduled.")
+    
+    # Keep Deribit option tickers streaming into the options analytics
+    if settings.OPTIONS_STREAM_ENABLED:
+        start_options_streams()
+        logger.info("Deribit options ticker streams started.")
+    
+    # Stream Binance funding and compare it with Hyperliquid's asset contexts
+    if settings.FUNDING_MONITOR_ENABLED:
+        hyperliquid_service = await get_hyperliquid_service()
+        start_funding_monitor(hyperliquid_contexts=hyperliquid_service.asset_contexts)
+        logger.info("Funding rate monitor started.")
     
     # Initialize and start trackers
     logger.info("Initializing trackers...")
@@ -419,12 +440,30 @@ async def shutdown_event():
     else:
         logger.warning("Hyperliquid service instance not found during shutdown.")
 
+    await stop_ticker_caches()
+    await stop_funding_monitor()
+    await close_deribit_client()
+
     logger.info("--- LOG: Server shutting down... --- ")
 
 @app.get("/api/macro", response_model=Optional[MacroData])
 async def get_macro_data():
     return macro_data_cache
 
+@app.get("/api/macro/history", response_model=MacroHistory)
+async def get_macro_history(
+    indicator: str,
+    start: Optional[datetime] = Query(None, description="Earliest observation date"),
+    end: Optional[datetime] = Query(None, description="Latest observation date"),
+    points: int = Query(500, ge=2, le=5000, description="Maximum points returned"),
+):
+    """Stored observations of one macro indicator, downsampled for charting"""
+    if indicator not in MACRO_INDICATORS:
+        raise HTTPException(status_code=404, detail=f"Unknown indicator: {indicator}")
+    async with SessionLocal() as session:
+        history, total = await load_macro_history(session, indicator, start, end, points)
+    return MacroHistory(indicator=indicator, total_points=total, points=history)
+
 @app.get("/api/coindesk/events")
 async def get_coindesk_events(
     asset: str, 
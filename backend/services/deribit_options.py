@@ -1,94 +1,194 @@
-import requests
+import asyncio
+import httpx
+import itertools
+import json
 import logging
+import random
+import time
+import websockets
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
+
+import numpy as np
+
+from app.core.config import settings
+from data_sources.response_cache import cached_fetch
 
 logger = logging.getLogger(__name__)
 
 DERIBIT_API_URL = "https://www.deribit.com/api/v2/public"
 
-def get_btc_options(expired: bool = False) -> Dict[str, Any]:
+# One pooled client for every Deribit request, opened on first use
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """The shared Deribit HTTP client; connections are kept alive between requests."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+    return _client
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def _request(endpoint: str, params: Dict[str, str]) -> Dict[str, Any]:
+    response = await get_client().get(endpoint, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+class OptionChain:
     """
-    Fetch BTC options data from Deribit API
-    
-    Args:
-        expired: Whether to include expired options (default: False)
-        
-    Returns:
-        Dictionary with options data or error information
+    Processed option instruments with lookup indexes built once per fetch.
+
+    Strikes are held in a sorted array so a strike range is two binary
+    searches, and expiry dates and option types map to position arrays, so
+    filtering never rescans the whole chain.
     """
-    try:
+
+    def __init__(self, options: List[Dict[str, Any]]):
+        self.options = options
+        strikes = np.array([opt.get("strike") or 0 for opt in options], dtype=float)
+        self._strike_order = np.argsort(strikes, kind="stable")
+        self._sorted_strikes = strikes[self._strike_order]
+
+        by_expiry: Dict[Optional[str], List[int]] = {}
+        by_type: Dict[str, List[int]] = {}
+        for i, opt in enumerate(options):
+            by_expiry.setdefault(opt.get("expiration_date"), []).append(i)
+            by_type.setdefault((opt.get("option_type") or "").lower(), []).append(i)
+        self._by_expiry = {key: np.array(value, dtype=np.int64) for key, value in by_expiry.items()}
+        self._by_type = {key: np.array(value, dtype=np.int64) for key, value in by_type.items()}
+
+        self.total_count = len(options)
+        self.call_count = len(self._by_type.get("call", ()))
+        self.put_count = len(self._by_type.get("put", ()))
+        self.expiring_soon_count = sum(1 for opt in options if opt.get("expiring_soon"))
+
+    @property
+    def expiries(self) -> List[str]:
+        return sorted(key for key in self._by_expiry if key)
+
+    def filter(
+        self,
+        option_type: Optional[str] = None,
+        min_strike: Optional[float] = None,
+        max_strike: Optional[float] = None,
+        expiry_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Options matching every given criterion, in chain order."""
+        selected: Optional[np.ndarray] = None
+
+        if min_strike is not None or max_strike is not None:
+            lo = np.searchsorted(self._sorted_strikes, min_strike, "left") if min_strike is not None else 0
+            hi = np.searchsorted(self._sorted_strikes, max_strike, "right") if max_strike is not None else self.total_count
+            selected = np.sort(self._strike_order[lo:hi])
+
+        for index, key in ((self._by_expiry, expiry_date), (self._by_type, option_type and option_type.lower())):
+            if not key:
+                continue
+            positions = index.get(key, np.empty(0, dtype=np.int64))
+            selected = positions if selected is None else np.intersect1d(selected, positions, assume_unique=True)
+
+        if selected is None:
+            return self.options
+        return [self.options[i] for i in selected]
+
+
+# Built chains per (currency, expired), reused for OPTIONS_CHAIN_TTL seconds
+_chains: Dict[Tuple[str, bool], Tuple[float, OptionChain]] = {}
+_chain_locks: Dict[Tuple[str, bool], asyncio.Lock] = {}
+
+def _process_option(option: Dict[str, Any]) -> Dict[str, Any]:
+    expiration_timestamp = option.get("expiration_timestamp")
+    return {
+        "instrument_name": option.get("instrument_name"),
+        "expiration_timestamp": expiration_timestamp,
+        "expiration_date": datetime.fromtimestamp(
+            expiration_timestamp / 1000
+        ).strftime("%Y-%m-%d") if expiration_timestamp else None,
+        "strike": option.get("strike"),
+        "option_type": option.get("option_type", "").lower(),
+        "settlement_period": option.get("settlement_period"),
+        "quote_currency": option.get("quote_currency"),
+        "base_currency": option.get("base_currency"),
+        "is_active": option.get("is_active", False),
+        "creation_timestamp": option.get("creation_timestamp"),
+        "expiring_soon": is_expiring_soon(expiration_timestamp)
+    }
+
+async def get_options_chain(currency: str = "BTC", expired: bool = False) -> Optional[OptionChain]:
+    """
+    The indexed option chain for ``currency``, or None when Deribit can't be reached.
+
+    A built chain is served from memory for OPTIONS_CHAIN_TTL seconds;
+    concurrent requests for an expired chain share one rebuild.
+    """
+    stream = _ticker_caches.get(currency)
+    if not expired and stream is not None and stream.live and stream.chain is not None:
+        # The ticker stream keeps the listing current without any REST calls
+        return stream.chain
+
+    key = (currency, expired)
+    cached = _chains.get(key)
+    if cached and time.monotonic() - cached[0] < settings.OPTIONS_CHAIN_TTL:
+        return cached[1]
+
+    async with _chain_locks.setdefault(key, asyncio.Lock()):
+        cached = _chains.get(key)
+        if cached and time.monotonic() - cached[0] < settings.OPTIONS_CHAIN_TTL:
+            return cached[1]
+
         endpoint = f"{DERIBIT_API_URL}/get_instruments"
         params = {
-            "currency": "BTC",
+            "currency": currency,
             "kind": "option",
             "expired": "true" if expired else "false"
         }
-        
-        response = requests.get(endpoint, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("result"):
-            # Process the data to extract only the relevant fields and calculate summaries
-            processed_options = []
-            total_count = 0
-            call_count = 0
-            put_count = 0
-            expiring_soon_count = 0
-            
-            for option in data["result"]:
-                expiring_soon_flag = is_expiring_soon(option.get("expiration_timestamp"))
-                option_type = option.get("option_type", "").lower()
-                
-                processed_options.append({
-                    "instrument_name": option.get("instrument_name"),
-                    "expiration_timestamp": option.get("expiration_timestamp"),
-                    "expiration_date": datetime.fromtimestamp(
-                        option.get("expiration_timestamp") / 1000
-                    ).strftime("%Y-%m-%d") if option.get("expiration_timestamp") else None,
-                    "strike": option.get("strike"),
-                    "option_type": option_type,
-                    "settlement_period": option.get("settlement_period"),
-                    "quote_currency": option.get("quote_currency"),
-                    "base_currency": option.get("base_currency"),
-                    "is_active": option.get("is_active", False),
-                    "creation_timestamp": option.get("creation_timestamp"),
-                    "expiring_soon": expiring_soon_flag
-                })
-                
-                # Update counts
-                total_count += 1
-                if option_type == 'call':
-                    call_count += 1
-                elif option_type == 'put':
-                    put_count += 1
-                if expiring_soon_flag:
-                    expiring_soon_count += 1
+        # The instrument list changes a few times a day; the persistent cache covers restarts
+        data = await cached_fetch("deribit:instruments", endpoint, params, lambda: _request(endpoint, params))
+        if not data or not data.get("result"):
+            return None
 
-            return {
-                "success": True,
-                "data": processed_options,
-                "total_count": total_count,
-                "call_count": call_count,
-                "put_count": put_count,
-                "expiring_soon_count": expiring_soon_count
-            }
-        else:
+        chain = OptionChain([_process_option(option) for option in data["result"]])
+        _chains[key] = (time.monotonic(), chain)
+        return chain
+
+async def get_btc_options(expired: bool = False) -> Dict[str, Any]:
+    """
+    Fetch BTC options data from Deribit API
+
+    Args:
+        expired: Whether to include expired options (default: False)
+
+    Returns:
+        Dictionary with options data or error information
+    """
+    try:
+        chain = await get_options_chain("BTC", expired)
+        if chain is None:
             return {
                 "success": False,
                 "error": "No result found in the API response",
                 "data": []
             }
-            
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching from Deribit API: {str(e)}")
+
         return {
-            "success": False,
-            "error": f"API request failed: {str(e)}",
-            "data": []
+            "success": True,
+            "data": chain.options,
+            "chain": chain,
+            "total_count": chain.total_count,
+            "call_count": chain.call_count,
+            "put_count": chain.put_count,
+            "expiring_soon_count": chain.expiring_soon_count
         }
+
     except Exception as e:
         logger.error(f"Unexpected error processing Deribit data: {str(e)}")
         return {
@@ -100,24 +200,239 @@ def get_btc_options(expired: bool = False) -> Dict[str, Any]:
 def is_expiring_soon(expiration_timestamp: Optional[int]) -> bool:
     """
     Check if an option is expiring within the next 7 days
-    
+
     Args:
         expiration_timestamp: The expiration timestamp in milliseconds
-        
+
     Returns:
         True if the option expires within the next 7 days, False otherwise
     """
     if not expiration_timestamp:
         return False
-        
+
     now_ms = int(datetime.now().timestamp() * 1000)
     diff_ms = expiration_timestamp - now_ms
     diff_days = diff_ms / (1000 * 60 * 60 * 24)
-    
+
     return 0 <= diff_days <= 7
 
+def ticker_row(data: Dict[str, Any]) -> Dict[str, Any]:
+    """A Deribit ticker notification in book-summary shape."""
+    return {
+        "instrument_name": data.get("instrument_name"),
+        "mark_price": data.get("mark_price"),
+        "mark_iv": data.get("mark_iv"),
+        "underlying_price": data.get("underlying_price"),
+        "open_interest": data.get("open_interest"),
+        "volume": (data.get("stats") or {}).get("volume"),
+        "timestamp": data.get("timestamp"),
+    }
+
+
+class DeribitTickerCache:
+    """
+    Live option tickers for one currency over a Deribit JSON-RPC WebSocket.
+
+    On connect it lists the currency's options over the socket, subscribes
+    to every instrument's ticker channel in batches and answers Deribit's
+    heartbeat test requests. The latest ticker per instrument is kept in
+    memory; instruments that changed are handed to ``on_batch`` at most every
+    ``flush_interval`` seconds, and the whole listing (with ``full=True``)
+    after each relisting so delisted options drop out. Connection loss is
+    retried with jittered exponential backoff.
+    """
+
+    SUBSCRIBE_BATCH = 200  # channels per public/subscribe call
+    HEARTBEAT_INTERVAL = 30  # seconds, the Deribit minimum is 10
+    RELIST_INTERVAL = 600  # seconds between instrument relistings
+    MAX_BACKOFF = 60.0
+
+    def __init__(
+        self,
+        currency: str,
+        url: Optional[str] = None,
+        on_batch: Optional[Callable[[List[Dict[str, Any]], bool], Any]] = None,
+        flush_interval: Optional[float] = None,
+        record_path: Optional[str] = None,
+    ):
+        self.currency = currency
+        self.url = url or settings.DERIBIT_WS_URL
+        self.on_batch = on_batch
+        self.flush_interval = flush_interval if flush_interval is not None else settings.OPTIONS_STREAM_FLUSH_INTERVAL
+        self.record_path = record_path
+        self.tickers: Dict[str, Dict[str, Any]] = {}
+        self.chain: Optional[OptionChain] = None
+        self.connected = False
+        self.last_message: Optional[float] = None
+        self.messages = 0
+        self._pending: set = set()
+        self._calls: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def live(self) -> bool:
+        """Connected and heard from within two heartbeat intervals."""
+        return (
+            self.connected and self.last_message is not None
+            and time.monotonic() - self.last_message < 2 * self.HEARTBEAT_INTERVAL
+        )
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                await self._session()
+                attempt = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Deribit {self.currency} ticker stream error: {e}")
+            finally:
+                self.connected = False
+            delay = min(self.MAX_BACKOFF, 2 ** attempt) * random.uniform(0.5, 1.0)
+            attempt += 1
+            logger.info(f"Reconnecting Deribit {self.currency} ticker stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _call(self, method: str, params: Dict[str, Any]) -> Any:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._calls[request_id] = future
+        await self._ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+        try:
+            return await asyncio.wait_for(future, timeout=10)
+        finally:
+            self._calls.pop(request_id, None)
+
+    async def _session(self) -> None:
+        async with websockets.connect(self.url, ping_interval=None, max_size=None) as ws:
+            self._ws = ws
+            reader = asyncio.create_task(self._read(ws))
+            flusher = asyncio.create_task(self._flush_loop())
+            try:
+                await self._call("public/set_heartbeat", {"interval": self.HEARTBEAT_INTERVAL})
+                self.connected = True
+                logger.info(f"Deribit {self.currency} ticker stream connected")
+                subscribed: set = set()
+                while True:
+                    subscribed = await self._relist(subscribed)
+                    done, _ = await asyncio.wait({reader}, timeout=self.RELIST_INTERVAL)
+                    if done:
+                        break
+            finally:
+                flusher.cancel()
+                reader.cancel()
+                self._ws = None
+            # Surface why the reader stopped
+            if reader.done() and not reader.cancelled() and reader.exception():
+                raise reader.exception()
+
+    async def _relist(self, subscribed: set) -> set:
+        """Refresh the instrument listing and subscribe to any new tickers."""
+        instruments = await self._call(
+            "public/get_instruments", {"currency": self.currency, "kind": "option", "expired": False}
+        )
+        self.chain = OptionChain([_process_option(option) for option in instruments])
+        names = {option["instrument_name"] for option in instruments}
+        for name in set(self.tickers) - names:
+            del self.tickers[name]
+            self._pending.discard(name)
+
+        channels = [f"ticker.{name}.{settings.OPTIONS_TICKER_INTERVAL}" for name in sorted(names - subscribed)]
+        for i in range(0, len(channels), self.SUBSCRIBE_BATCH):
+            await self._call("public/subscribe", {"channels": channels[i:i + self.SUBSCRIBE_BATCH]})
+        if subscribed and self.on_batch:
+            self._emit(list(self.tickers.values()), True)
+        return names
+
+    async def _read(self, ws) -> None:
+        record = open(self.record_path, "a") if self.record_path else None
+        started = time.monotonic()
+        try:
+            async for raw in ws:
+                self.last_message = time.monotonic()
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._calls.get(message["id"])
+                    if future and not future.done():
+                        if "error" in message:
+                            future.set_exception(RuntimeError(f"Deribit error: {message['error']}"))
+                        else:
+                            future.set_result(message.get("result"))
+                    continue
+
+                method = message.get("method")
+                params = message.get("params") or {}
+                if method == "heartbeat":
+                    if params.get("type") == "test_request":
+                        # Sent inline and not awaited for: a closed socket ends this reader anyway
+                        await ws.send(json.dumps(
+                            {"jsonrpc": "2.0", "id": next(self._ids), "method": "public/test", "params": {}}
+                        ))
+                elif method == "subscription":
+                    data = params.get("data") or {}
+                    name = data.get("instrument_name")
+                    if name:
+                        self.tickers[name] = ticker_row(data)
+                        self._pending.add(name)
+                        self.messages += 1
+                        if record:
+                            record.write(json.dumps({"t": round(self.last_message - started, 3), **params}) + "\n")
+        finally:
+            if record:
+                record.close()
+
+    def _emit(self, rows: List[Dict[str, Any]], full: bool) -> None:
+        try:
+            self.on_batch(rows, full)
+        except Exception as e:
+            logger.error(f"Error applying Deribit {self.currency} ticker batch: {e}", exc_info=True)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending and self.on_batch:
+                rows = [self.tickers[name] for name in self._pending if name in self.tickers]
+                self._pending.clear()
+                self._emit(rows, False)
+
+
+_ticker_caches: Dict[str, DeribitTickerCache] = {}
+
+def start_ticker_cache(currency: str, on_batch=None, url: Optional[str] = None) -> DeribitTickerCache:
+    """Start (once) the ticker stream for ``currency``."""
+    cache = _ticker_caches.get(currency)
+    if cache is None:
+        cache = _ticker_caches[currency] = DeribitTickerCache(currency, url=url, on_batch=on_batch)
+    cache.start()
+    return cache
+
+def get_ticker_cache(currency: str) -> Optional[DeribitTickerCache]:
+    return _ticker_caches.get(currency)
+
+async def stop_ticker_caches() -> None:
+    for cache in list(_ticker_caches.values()):
+        await cache.stop()
+    _ticker_caches.clear()
+
 def filter_options(
-    options: List[Dict[str, Any]], 
+    options: Union[OptionChain, List[Dict[str, Any]]],
     option_type: Optional[str] = None,
     min_strike: Optional[float] = None,
     max_strike: Optional[float] = None,
@@ -125,30 +440,21 @@ def filter_options(
 ) -> List[Dict[str, Any]]:
     """
     Filter options based on specified criteria
-    
+
     Args:
-        options: List of option dictionaries
+        options: An indexed OptionChain, or a list of option dictionaries to index
         option_type: Filter by option type (call or put)
         min_strike: Minimum strike price
         max_strike: Maximum strike price
         expiry_date: Filter by specific expiry date (format: YYYY-MM-DD)
-        
+
     Returns:
         Filtered list of options
     """
-    result = options
-
-    if option_type:
-        option_type = option_type.lower()
-        result = [opt for opt in result if opt.get("option_type", "").lower() == option_type]
-    
-    if min_strike is not None:
-        result = [opt for opt in result if opt.get("strike", 0) >= min_strike]
-    
-    if max_strike is not None:
-        result = [opt for opt in result if opt.get("strike", 0) <= max_strike]
-    
-    if expiry_date:
-        result = [opt for opt in result if opt.get("expiration_date") == expiry_date]
-    
-    return result 
\ No newline at end of file
+    chain = options if isinstance(options, OptionChain) else OptionChain(options)
+    return chain.filter(
+        option_type=option_type,
+        min_strike=min_strike,
+        max_strike=max_strike,
+        expiry_date=expiry_date
+    )
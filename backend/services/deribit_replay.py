@@ -0,0 +1,202 @@
+"""
+Local stand-in for the Deribit JSON-RPC WebSocket, for exercising the option
+ticker cache offline.
+
+It answers the calls DeribitTickerCache makes (set_heartbeat, test,
+get_instruments, subscribe), sends heartbeat test requests, and replays
+ticker notifications either from a recording written by
+``DeribitTickerCache(record_path=...)`` or from a synthetic session.
+"""
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import websockets
+
+from services.options_analytics import EXPIRY_HOUR_UTC, SECONDS_PER_YEAR, black76_price, parse_instrument
+
+
+def instruments_from_names(names: Iterable[str]) -> List[Dict[str, Any]]:
+    """get_instruments entries for option names like ``BTC-27JUN25-90000-C``."""
+    instruments = []
+    for name in sorted(set(names)):
+        parsed = parse_instrument(name)
+        if parsed is None:
+            continue
+        expiry, strike, is_call = parsed
+        instruments.append({
+            "instrument_name": name,
+            "kind": "option",
+            "base_currency": name.split("-")[0],
+            "quote_currency": name.split("-")[0],
+            "strike": strike,
+            "option_type": "call" if is_call else "put",
+            "expiration_timestamp": int(expiry * 1000),
+            "is_active": True,
+        })
+    return instruments
+
+
+def load_recording(path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """(instruments, ticks) from an NDJSON recording of ticker notifications."""
+    with open(path) as f:
+        ticks = [json.loads(line) for line in f if line.strip()]
+    names = [tick["data"]["instrument_name"] for tick in ticks]
+    return instruments_from_names(names), ticks
+
+
+def synthetic_session(
+    currency: str = "BTC",
+    expiries: int = 4,
+    strikes: int = 20,
+    rounds: int = 10,
+    forward: float = 95000.0,
+    interval: float = 0.1,
+    seed: int = 7,
+    start: Optional[datetime] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    A random-walk session: every instrument ticks once per round, priced by
+    Black-76 off a moving forward with a smile. Returns (instruments, ticks).
+    """
+    rng = random.Random(seed)
+    start = start or datetime.now(timezone.utc)
+    first_expiry = (start + timedelta(days=7)).replace(hour=EXPIRY_HOUR_UTC, minute=0, second=0, microsecond=0)
+    names = []
+    for e in range(expiries):
+        expiry = (first_expiry + timedelta(days=28 * e)).strftime("%d%b%y").upper()
+        for k in range(strikes):
+            strike = round(forward * (0.6 + 0.8 * k / max(strikes - 1, 1)), -3)
+            names += [f"{currency}-{expiry}-{strike:.0f}-C", f"{currency}-{expiry}-{strike:.0f}-P"]
+    instruments = instruments_from_names(names)
+
+    ticks = []
+    for r in range(rounds):
+        forward *= 1 + rng.gauss(0, 0.001)
+        now = start.timestamp() + r * interval
+        for instrument in instruments:
+            is_call = instrument["option_type"] == "call"
+            years = max(instrument["expiration_timestamp"] / 1000 - now, 60) / SECONDS_PER_YEAR
+            vol = 0.5 + 0.3 * abs(instrument["strike"] / forward - 1)
+            price = float(black76_price(forward, instrument["strike"], years, vol, is_call))
+            ticks.append({
+                "t": round(r * interval, 3),
+                "channel": f"ticker.{instrument['instrument_name']}.100ms",
+                "data": {
+                    "instrument_name": instrument["instrument_name"],
+                    "mark_price": price / forward,
+                    "mark_iv": vol * 100,
+                    "underlying_price": forward,
+                    "open_interest": rng.uniform(0, 500),
+                    "stats": {"volume": rng.uniform(0, 50)},
+                    "timestamp": int(now * 1000),
+                },
+            })
+    return instruments, ticks
+
+
+class DeribitReplayServer:
+    """
+    Serves ``instruments`` and replays ``ticks`` to each connected client.
+
+    Replay starts once a client has subscribed to a ticker channel for every
+    listed instrument, then follows the recorded offsets divided by ``speed``
+    (``speed=0`` sends as fast as possible). Use as an async context manager;
+    ``url`` is set once it is listening.
+    """
+
+    def __init__(
+        self,
+        instruments: List[Dict[str, Any]],
+        ticks: List[Dict[str, Any]],
+        speed: float = 1.0,
+        loop: bool = False,
+        heartbeat_interval: Optional[float] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.instruments = instruments
+        self.ticks = ticks
+        self.speed = speed
+        self.loop = loop
+        self.heartbeat_interval = heartbeat_interval
+        self.host = host
+        self.port = port
+        self.url: Optional[str] = None
+        self.stats = {"connections": 0, "subscribed_channels": 0, "sent": 0, "heartbeat_replies": 0}
+        self._server = None
+
+    async def __aenter__(self) -> "DeribitReplayServer":
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"ws://{self.host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws) -> None:
+        self.stats["connections"] += 1
+        subscribed: set = set()
+        wanted = {f"ticker.{i['instrument_name']}" for i in self.instruments}
+        tasks: List[asyncio.Task] = []
+        replaying = False
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                method, params = message.get("method"), message.get("params") or {}
+                if method == "public/set_heartbeat":
+                    result = "ok"
+                    interval = self.heartbeat_interval or params.get("interval", 30)
+                    tasks.append(asyncio.create_task(self._heartbeat(ws, interval)))
+                elif method == "public/test":
+                    self.stats["heartbeat_replies"] += 1
+                    result = {"version": "replay"}
+                elif method == "public/get_instruments":
+                    result = [i for i in self.instruments if i["base_currency"] == params.get("currency")]
+                elif method == "public/subscribe":
+                    channels = params.get("channels", [])
+                    subscribed.update(channels)
+                    self.stats["subscribed_channels"] += len(channels)
+                    result = channels
+                else:
+                    await ws.send(json.dumps({
+                        "jsonrpc": "2.0", "id": message.get("id"),
+                        "error": {"code": -32601, "message": "Method not found"},
+                    }))
+                    continue
+                await ws.send(json.dumps({"jsonrpc": "2.0", "id": message.get("id"), "result": result}))
+
+                if not replaying and wanted <= {channel.rsplit(".", 1)[0] for channel in subscribed}:
+                    replaying = True
+                    tasks.append(asyncio.create_task(self._replay(ws, subscribed)))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _heartbeat(self, ws, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await ws.send(json.dumps({"jsonrpc": "2.0", "method": "heartbeat", "params": {"type": "test_request"}}))
+
+    async def _replay(self, ws, subscribed: set) -> None:
+        while True:
+            previous = self.ticks[0]["t"] if self.ticks else 0.0
+            for tick in self.ticks:
+                if self.speed > 0 and tick["t"] > previous:
+                    await asyncio.sleep((tick["t"] - previous) / self.speed)
+                previous = tick["t"]
+                if tick["channel"] not in subscribed:
+                    continue
+                await ws.send(json.dumps({
+                    "jsonrpc": "2.0", "method": "subscription",
+                    "params": {"channel": tick["channel"], "data": tick["data"]},
+                }))
+                self.stats["sent"] += 1
+            if not self.loop:
+                return
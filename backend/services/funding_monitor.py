@@ -0,0 +1,367 @@
+"""
+Cross-exchange funding rate monitor.
+
+Binance's all-market ``!markPrice@arr@1s`` stream and Hyperliquid's asset
+contexts feed one symbol-indexed table of the current (last settled) and
+predicted funding per venue. Spreads between venues are recomputed only for
+the rows that changed, and the top spreads are republished only when they
+change.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+import numpy as np
+import websockets
+
+from app.core.config import settings
+from data_sources.rate_limiter import get_limiter
+
+logger = logging.getLogger(__name__)
+
+VENUES = ("binance", "hyperliquid")
+VENUE_INDEX = {venue: i for i, venue in enumerate(VENUES)}
+FUNDING_INTERVAL_HOURS = {"binance": 8.0, "hyperliquid": 1.0}  # Defaults; Binance varies per symbol
+SETTLEMENT_INTERVALS = {1.0, 2.0, 4.0, 8.0}  # Binance funding intervals, in hours
+HOURS_PER_YEAR = 24 * 365
+
+
+def normalize_symbol(symbol: str) -> Optional[str]:
+    """
+    Binance USDT perpetual symbol as the Hyperliquid coin name, e.g.
+    ``BTCUSDT`` -> ``BTC`` and ``1000PEPEUSDT`` -> ``kPEPE``; None for other
+    quote currencies.
+    """
+    if not symbol.endswith("USDT"):
+        return None
+    coin = symbol[:-4]
+    if coin.startswith("1000") and len(coin) > 4:
+        coin = "k" + coin[4:]
+    return coin
+
+
+class FundingTable:
+    """
+    Funding per coin and venue in (coins x venues) arrays, one row per coin
+    assigned on first sight. Rates are per funding interval as the venue
+    reports them; spreads compare annualized predicted rates.
+
+    Binance settles some symbols every 4h or 1h instead of 8h. Intervals set
+    with ``set_intervals`` apply from the coin's first row. Between those
+    loads, a Binance settlement one step shorter than the known interval
+    shortens it; longer steps may just be missed settlements.
+    """
+
+    def __init__(self, capacity: int = 512):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        shape = (capacity, len(VENUES))
+        self.predicted = np.full(shape, np.nan)
+        self.current = np.full(shape, np.nan)  # Rate of the last settlement seen
+        self.next_funding = np.zeros(shape)  # Epoch seconds
+        self.interval = np.tile([FUNDING_INTERVAL_HOURS[venue] for venue in VENUES], (capacity, 1))
+        self.updated_at = np.zeros(shape)
+        self.spread = np.full(capacity, np.nan)  # Annualized binance - hyperliquid predicted
+        self.known_intervals: Dict[str, Dict[str, float]] = {venue: {} for venue in VENUES}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _rows(self, coins: List[str]) -> np.ndarray:
+        first_new = len(self.names)
+        for coin in coins:
+            if coin not in self.index:
+                self.index[coin] = len(self.names)
+                self.names.append(coin)
+        if len(self.names) > len(self.spread):
+            capacity = max(len(self.names), 2 * len(self.spread))
+            for name, fill in (("predicted", np.nan), ("current", np.nan), ("next_funding", 0.0), ("updated_at", 0.0)):
+                old = getattr(self, name)
+                new = np.full((capacity, len(VENUES)), fill)
+                new[:len(old)] = old
+                setattr(self, name, new)
+            interval = np.tile([FUNDING_INTERVAL_HOURS[venue] for venue in VENUES], (capacity, 1))
+            interval[:len(self.interval)] = self.interval
+            self.interval = interval
+            spread = np.full(capacity, np.nan)
+            spread[:len(self.spread)] = self.spread
+            self.spread = spread
+        for venue, intervals in self.known_intervals.items():
+            for row in range(first_new, len(self.names)):
+                hours = intervals.get(self.names[row])
+                if hours:
+                    self.interval[row, VENUE_INDEX[venue]] = hours
+        return np.fromiter((self.index[coin] for coin in coins), dtype=np.int64, count=len(coins))
+
+    def _update_spread(self, rows: np.ndarray) -> None:
+        annualized = self.predicted[rows] / self.interval[rows] * HOURS_PER_YEAR
+        self.spread[rows] = annualized[:, VENUE_INDEX["binance"]] - annualized[:, VENUE_INDEX["hyperliquid"]]
+
+    def set_intervals(self, venue: str, intervals: Dict[str, float]) -> None:
+        """
+        Funding interval in hours per coin, for rows present and to come.
+        Coins of the previous set that are missing revert to the default.
+        """
+        previous, self.known_intervals[venue] = self.known_intervals[venue], dict(intervals)
+        present = [coin for coin in {**previous, **intervals} if coin in self.index]
+        if present:
+            rows = np.fromiter((self.index[coin] for coin in present), dtype=np.int64, count=len(present))
+            default = FUNDING_INTERVAL_HOURS[venue]
+            self.interval[rows, VENUE_INDEX[venue]] = [intervals.get(coin, default) for coin in present]
+            self._update_spread(rows)
+
+    def update(
+        self, venue: str, coins: List[str], predicted: np.ndarray, next_funding: np.ndarray, now: float,
+    ) -> np.ndarray:
+        """
+        Apply one venue's rates for ``coins``. Where the next funding time has
+        moved on, the previously predicted rate has settled and becomes the
+        current one. Returns the rows written.
+        """
+        rows = self._rows(coins)
+        v = VENUE_INDEX[venue]
+        next_funding = np.asarray(next_funding, dtype=float)
+        previous = self.next_funding[rows, v]
+        moved = (previous > 0) & (next_funding > previous)
+        settled = rows[moved]
+        self.current[settled, v] = self.predicted[settled, v]
+        if venue == "binance":
+            # A shorter step is a shorter interval; a longer one may span
+            # missed settlements, so lengthening waits for set_intervals
+            step = np.round((next_funding[moved] - previous[moved]) / 3600)
+            shorter = np.isin(step, list(SETTLEMENT_INTERVALS)) & (step < self.interval[settled, v])
+            self.interval[settled[shorter], v] = step[shorter]
+        self.predicted[rows, v] = predicted
+        self.next_funding[rows, v] = next_funding
+        self.updated_at[rows, v] = now
+        self._update_spread(rows)
+        return rows
+
+    def _row(self, row: int) -> Dict[str, Any]:
+        venues = {}
+        for venue, v in VENUE_INDEX.items():
+            predicted = self.predicted[row, v]
+            if np.isnan(predicted):
+                continue
+            current = self.current[row, v]
+            venues[venue] = {
+                "predicted_rate": float(predicted),
+                "current_rate": None if np.isnan(current) else float(current),
+                "interval_hours": float(self.interval[row, v]),
+                "annualized_rate": float(predicted / self.interval[row, v] * HOURS_PER_YEAR),
+                "next_funding_time": float(self.next_funding[row, v]),
+            }
+        spread = self.spread[row]
+        return {
+            "symbol": self.names[row],
+            "venues": venues,
+            "annualized_spread": None if np.isnan(spread) else float(spread),
+        }
+
+    def get(self, coin: str) -> Optional[Dict[str, Any]]:
+        row = self.index.get(coin)
+        return None if row is None else self._row(row)
+
+    def top_spreads(self, limit: int) -> List[Dict[str, Any]]:
+        """Coins with the widest absolute annualized spread, widest first."""
+        spread = np.abs(self.spread[:len(self.names)])
+        rows = np.flatnonzero(~np.isnan(spread))
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-spread[rows], limit - 1)[:limit]]
+        rows = rows[np.argsort(-spread[rows], kind="stable")]
+        return [self._row(row) for row in rows.tolist()]
+
+
+async def fetch_funding_intervals(url: str) -> Dict[str, float]:
+    """
+    Funding interval in hours per coin from Binance ``fundingInfo``, which
+    lists only the symbols whose interval or caps were adjusted.
+    """
+    await get_limiter(url).acquire()
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as session:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            data = await response.json()
+    intervals = {}
+    for item in data:
+        coin = normalize_symbol(item.get("symbol", ""))
+        if coin is not None and item.get("fundingIntervalHours"):
+            intervals[coin] = float(item["fundingIntervalHours"])
+    return intervals
+
+
+class FundingMonitor:
+    """
+    Keeps the funding table current from the Binance mark price stream and
+    Hyperliquid's asset context table, and publishes the top spreads.
+
+    Binance funding intervals are loaded from ``fundingInfo`` on start and
+    every ``INTERVAL_REFRESH`` seconds after.
+    The Binance socket reconnects with jittered exponential backoff.
+    Hyperliquid rows are merged once per ``publish_interval``, taking only
+    the coins whose context changed since the last merge. ``on_spreads`` is
+    called with the new list whenever the top spreads change.
+    """
+
+    MAX_BACKOFF = 60.0
+    INTERVAL_REFRESH = 3600.0
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        funding_info_url: Optional[str] = None,
+        hyperliquid_contexts=None,
+        top_n: Optional[int] = None,
+        publish_interval: float = 1.0,
+        on_spreads: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+        clock=time.time,
+    ):
+        self.url = url or settings.BINANCE_MARK_PRICE_WS_URL
+        self.funding_info_url = funding_info_url or settings.BINANCE_FUNDING_INFO_URL
+        self.hyperliquid_contexts = hyperliquid_contexts
+        self.top_n = top_n or settings.FUNDING_SPREADS_TOP_N
+        self.publish_interval = publish_interval
+        self.on_spreads = on_spreads
+        self.clock = clock
+        self.table = FundingTable()
+        self.spreads: List[Dict[str, Any]] = []
+        self.version = 0  # Bumped each time the published spreads change
+        self.connected = False
+        self.messages = 0
+        self._hyperliquid_merged_at = 0.0
+        self._tasks: List[asyncio.Task] = []
+
+    def apply_binance(self, updates: List[Dict[str, Any]]) -> None:
+        """Apply a batch of ``markPriceUpdate`` events."""
+        coins, rates, next_funding = [], [], []
+        for update in updates:
+            coin = normalize_symbol(update.get("s", ""))
+            if coin is None or update.get("r") in (None, ""):
+                continue
+            coins.append(coin)
+            rates.append(float(update["r"]))
+            next_funding.append(float(update.get("T", 0)) / 1000)
+        if coins:
+            self.table.update("binance", coins, np.array(rates), np.array(next_funding), self.clock())
+
+    def merge_hyperliquid(self, contexts) -> int:
+        """Copy funding of Hyperliquid coins updated since the last merge; returns how many."""
+        count = len(contexts)
+        if not count:
+            return 0
+        changed = np.flatnonzero(contexts.updated_at[:count] > self._hyperliquid_merged_at)
+        funding = contexts.column("funding")[changed]
+        changed = changed[~np.isnan(funding)]
+        if not len(changed):
+            return 0
+        now = self.clock()
+        self._hyperliquid_merged_at = float(contexts.updated_at[:count].max())
+        # Hyperliquid settles on the hour
+        next_hour = (np.floor(now / 3600) + 1) * 3600
+        self.table.update(
+            "hyperliquid", [contexts.names[i] for i in changed.tolist()],
+            contexts.column("funding")[changed], np.full(len(changed), next_hour), now,
+        )
+        return len(changed)
+
+    def publish(self) -> bool:
+        """Recompute the top spreads; returns True (and notifies) if they changed."""
+        if self.hyperliquid_contexts is not None:
+            self.merge_hyperliquid(self.hyperliquid_contexts)
+        spreads = self.table.top_spreads(self.top_n)
+        if spreads == self.spreads:
+            return False
+        self.spreads = spreads
+        self.version += 1
+        if self.on_spreads:
+            self.on_spreads(spreads)
+        return True
+
+    def start(self) -> None:
+        if not any(not task.done() for task in self._tasks):
+            self._tasks = [
+                asyncio.create_task(self._interval_loop()),
+                asyncio.create_task(self.run()),
+                asyncio.create_task(self._publish_loop()),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def load_funding_intervals(self) -> None:
+        try:
+            intervals = await fetch_funding_intervals(self.funding_info_url)
+        except Exception as e:
+            logger.warning(f"Could not load Binance funding intervals: {e}")
+            return
+        self.table.set_intervals("binance", intervals)
+        logger.info(f"Loaded Binance funding intervals for {len(intervals)} symbols")
+
+    async def _interval_loop(self) -> None:
+        while True:
+            await self.load_funding_intervals()
+            await asyncio.sleep(self.INTERVAL_REFRESH)
+
+    async def run(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    self.connected = True
+                    attempt = 0
+                    logger.info("Binance mark price stream connected")
+                    async for raw in ws:
+                        message = json.loads(raw)
+                        # Combined-stream URLs wrap the payload in {"stream", "data"}
+                        if isinstance(message, dict):
+                            message = message.get("data", message)
+                        self.apply_binance(message if isinstance(message, list) else [message])
+                        self.messages += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Binance mark price stream error: {e}")
+            finally:
+                self.connected = False
+            delay = min(self.MAX_BACKOFF, 2 ** attempt) * random.uniform(0.5, 1.0)
+            attempt += 1
+            logger.info(f"Reconnecting Binance mark price stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _publish_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Error publishing funding spreads: {e}", exc_info=True)
+
+
+_monitor: Optional[FundingMonitor] = None
+
+
+def start_funding_monitor(hyperliquid_contexts=None) -> FundingMonitor:
+    """Start the process-wide monitor once."""
+    global _monitor
+    if _monitor is None:
+        _monitor = FundingMonitor(hyperliquid_contexts=hyperliquid_contexts)
+    _monitor.start()
+    return _monitor
+
+
+def get_funding_monitor() -> Optional[FundingMonitor]:
+    return _monitor
+
+
+async def stop_funding_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
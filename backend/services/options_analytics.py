@@ -0,0 +1,385 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from services.deribit_options import DERIBIT_API_URL, get_client, get_ticker_cache, start_ticker_cache
+
+logger = logging.getLogger(__name__)
+
+CURRENCIES = ("BTC", "ETH")
+SECONDS_PER_YEAR = 365 * 86400
+EXPIRY_HOUR_UTC = 8  # Deribit options settle at 08:00 UTC
+
+# Greeks older than this are recomputed even if the instrument's inputs didn't change,
+# since time to expiry keeps shrinking
+GREEKS_MAX_AGE = 300  # seconds
+
+# Fields compared to decide whether an instrument changed between updates
+INPUT_FIELDS = ("mark_price", "forward", "open_interest", "volume")
+
+
+# --- Vectorized Black-76 ---
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF via the Abramowitz-Stegun erf approximation (|error| < 1.5e-7)."""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def _d1_d2(forward, strike, expiry_years, sigma) -> Tuple[np.ndarray, np.ndarray]:
+    vol_sqrt_t = sigma * np.sqrt(expiry_years)
+    d1 = (np.log(forward / strike) + 0.5 * vol_sqrt_t ** 2) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t
+
+
+def black76_price(forward, strike, expiry_years, sigma, is_call) -> np.ndarray:
+    """Undiscounted Black-76 option value in quote currency (Deribit prices at zero rate)."""
+    d1, d2 = _d1_d2(forward, strike, expiry_years, sigma)
+    call = forward * norm_cdf(d1) - strike * norm_cdf(d2)
+    put = strike * norm_cdf(-d2) - forward * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def black76_greeks(forward, strike, expiry_years, sigma, is_call) -> Dict[str, np.ndarray]:
+    """Forward delta, gamma, and vega per 1 vol point of every option at once."""
+    d1, _ = _d1_d2(forward, strike, expiry_years, sigma)
+    pdf = norm_pdf(d1)
+    sqrt_t = np.sqrt(expiry_years)
+    return {
+        "delta": np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0),
+        "gamma": pdf / (forward * sigma * sqrt_t),
+        "vega": forward * pdf * sqrt_t / 100.0,
+    }
+
+
+def implied_volatility(price, forward, strike, expiry_years, is_call, iterations: int = 60) -> np.ndarray:
+    """
+    Black-76 implied volatility of every option at once by vectorized bisection.
+
+    Bisection is slower to converge than Newton but cannot diverge on deep
+    wings where vega vanishes. Prices outside the no-arbitrage bounds, or
+    already-expired options, give NaN.
+    """
+    price, forward, strike, expiry_years = (np.asarray(a, dtype=float) for a in (price, forward, strike, expiry_years))
+    intrinsic = np.where(is_call, np.maximum(forward - strike, 0.0), np.maximum(strike - forward, 0.0))
+    upper_bound = np.where(is_call, forward, strike)
+    valid = (expiry_years > 0) & (price > intrinsic) & (price < upper_bound) & (forward > 0) & (strike > 0)
+
+    t = np.where(valid, expiry_years, 1.0)
+    lo = np.full(price.shape, 1e-4)
+    hi = np.full(price.shape, 10.0)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        too_high = black76_price(forward, strike, t, mid, is_call) > price
+        hi = np.where(too_high, mid, hi)
+        lo = np.where(too_high, lo, mid)
+    return np.where(valid, 0.5 * (lo + hi), np.nan)
+
+
+def max_pain(strikes: np.ndarray, is_call: np.ndarray, open_interest: np.ndarray) -> Optional[float]:
+    """Settlement strike at which option holders' total payout (in OI) is smallest."""
+    if not len(strikes):
+        return None
+    candidates = np.unique(strikes)
+    moneyness = candidates[:, None] - strikes[None, :]
+    payout = np.where(is_call, np.maximum(moneyness, 0.0), np.maximum(-moneyness, 0.0)) @ open_interest
+    return float(candidates[np.argmin(payout)])
+
+
+def parse_instrument(name: str) -> Optional[Tuple[float, float, bool]]:
+    """(expiry epoch seconds, strike, is_call) of a name like ``BTC-27JUN25-90000-C``."""
+    try:
+        _, expiry, strike, kind = name.split("-")
+        expiry_dt = datetime.strptime(expiry, "%d%b%y").replace(hour=EXPIRY_HOUR_UTC, tzinfo=timezone.utc)
+        return expiry_dt.timestamp(), float(strike.replace("d", ".")), kind == "C"
+    except ValueError:
+        return None
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return numerator / denominator if denominator else None
+
+
+def _clean(value: float) -> Optional[float]:
+    return value if np.isfinite(value) else None
+
+
+class OptionsAnalytics:
+    """
+    Greeks, implied volatility and open-interest aggregates for one currency's options.
+
+    Instruments live in parallel NumPy arrays indexed by instrument. Each
+    update compares incoming book summaries with the stored inputs and
+    re-solves IV and greeks only for instruments that changed (or whose
+    greeks have aged past GREEKS_MAX_AGE), and re-aggregates only the
+    expiries those instruments belong to.
+    """
+
+    def __init__(self, currency: str):
+        self.currency = currency
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._arrays: Dict[str, np.ndarray] = {
+            field: np.empty(0) for field in (
+                "expiry", "strike", "mark_price", "forward", "open_interest", "volume",
+                "iv", "delta", "gamma", "vega", "computed_at",
+            )
+        }
+        self._is_call = np.empty(0, dtype=bool)
+        self._expiry_stats: Dict[float, Dict[str, Any]] = {}
+        self.updated_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _append(self, rows: List[Tuple[str, Tuple[float, float, bool]]]) -> None:
+        start = len(self.names)
+        for offset, (name, _) in enumerate(rows):
+            self.names.append(name)
+            self._index[name] = start + offset
+        expiry, strike, is_call = (np.array(column) for column in zip(*(parsed for _, parsed in rows)))
+        for field, array in self._arrays.items():
+            extra = {"expiry": expiry, "strike": strike}.get(field, np.full(len(rows), np.nan))
+            self._arrays[field] = np.concatenate([array, extra])
+        self._is_call = np.concatenate([self._is_call, is_call.astype(bool)])
+
+    def _remove(self, keep: np.ndarray) -> None:
+        self.names = [name for name, kept in zip(self.names, keep) if kept]
+        self._index = {name: i for i, name in enumerate(self.names)}
+        for field, array in self._arrays.items():
+            self._arrays[field] = array[keep]
+        self._is_call = self._is_call[keep]
+
+    def update(self, summaries: Iterable[Dict[str, Any]], now: Optional[float] = None, full: bool = True) -> int:
+        """
+        Apply Deribit book summaries (or ticker-shaped rows with the same keys).
+
+        With ``full`` the rows are the whole listing and instruments missing
+        from it are dropped; otherwise they update a subset. Returns the number
+        of instruments whose greeks were recomputed.
+        """
+        now = now if now is not None else time.time()
+        rows = {row["instrument_name"]: row for row in summaries if row.get("instrument_name")}
+
+        stale_expiries = set()
+        if full:
+            keep = np.array([name in rows for name in self.names], dtype=bool)
+            if not keep.all():
+                stale_expiries.update(self._arrays["expiry"][~keep].tolist())
+                self._remove(keep)
+
+        new_rows = [
+            (name, parsed) for name in rows
+            if name not in self._index and (parsed := parse_instrument(name)) is not None
+        ]
+        if new_rows:
+            self._append(new_rows)
+
+        positions = np.array([self._index[name] for name in rows if name in self._index], dtype=np.int64)
+        if len(positions):
+            incoming = {
+                "mark_price": [rows[self.names[i]].get("mark_price") for i in positions],
+                "forward": [rows[self.names[i]].get("underlying_price") for i in positions],
+                "open_interest": [rows[self.names[i]].get("open_interest") or 0.0 for i in positions],
+                "volume": [rows[self.names[i]].get("volume") or 0.0 for i in positions],
+            }
+            changed = np.zeros(len(positions), dtype=bool)
+            for field in INPUT_FIELDS:
+                values = np.array(incoming[field], dtype=float)
+                current = self._arrays[field][positions]
+                changed |= ~((values == current) | (np.isnan(values) & np.isnan(current)))
+                self._arrays[field][positions] = values
+            stale_expiries.update(self._arrays["expiry"][positions[changed]].tolist())
+
+        # Inputs changed, or greeks aged out as expiry approached
+        dirty = np.zeros(len(self.names), dtype=bool)
+        if len(positions):
+            dirty[positions[changed]] = True
+        dirty |= ~(now - self._arrays["computed_at"] < GREEKS_MAX_AGE)
+        self._recompute(np.flatnonzero(dirty), now)
+
+        for expiry in stale_expiries:
+            self._aggregate_expiry(expiry)
+        self.updated_at = now
+        return int(dirty.sum())
+
+    def _recompute(self, idx: np.ndarray, now: float) -> None:
+        if not len(idx):
+            return
+        a = self._arrays
+        forward, strike, is_call = a["forward"][idx], a["strike"][idx], self._is_call[idx]
+        years = (a["expiry"][idx] - now) / SECONDS_PER_YEAR
+        # Deribit quotes option marks in the underlying coin
+        price = a["mark_price"][idx] * forward
+        with np.errstate(invalid="ignore", divide="ignore"):
+            iv = implied_volatility(price, forward, strike, years, is_call)
+            greeks = black76_greeks(forward, strike, np.where(years > 0, years, np.nan), iv, is_call)
+        a["iv"][idx] = iv
+        for name, values in greeks.items():
+            a[name][idx] = values
+        a["computed_at"][idx] = now
+
+    def _aggregate_expiry(self, expiry: float) -> None:
+        a = self._arrays
+        mask = a["expiry"] == expiry
+        if not mask.any():
+            self._expiry_stats.pop(expiry, None)
+            return
+        is_call = self._is_call[mask]
+        oi, volume, strikes = a["open_interest"][mask], a["volume"][mask], a["strike"][mask]
+        call_oi, put_oi = float(oi[is_call].sum()), float(oi[~is_call].sum())
+        call_volume, put_volume = float(volume[is_call].sum()), float(volume[~is_call].sum())
+        forwards = a["forward"][mask]
+        forwards = forwards[np.isfinite(forwards)]
+        self._expiry_stats[expiry] = {
+            "expiry": datetime.fromtimestamp(expiry, tz=timezone.utc).strftime("%Y-%m-%d"),
+            "call_open_interest": call_oi,
+            "put_open_interest": put_oi,
+            "put_call_oi_ratio": _ratio(put_oi, call_oi),
+            "call_volume": call_volume,
+            "put_volume": put_volume,
+            "put_call_volume_ratio": _ratio(put_volume, call_volume),
+            "max_pain": max_pain(strikes, is_call, oi),
+            "forward": float(np.median(forwards)) if len(forwards) else None,
+        }
+
+    # --- Read side ---
+
+    def _expiry_mask(self, expiry_date: Optional[str]) -> np.ndarray:
+        if not expiry_date:
+            return np.ones(len(self.names), dtype=bool)
+        matches = [e for e, stats in self._expiry_stats.items() if stats["expiry"] == expiry_date]
+        return np.isin(self._arrays["expiry"], matches)
+
+    def expiry_summary(self) -> List[Dict[str, Any]]:
+        """Open interest, volume, put/call ratios and max pain per expiry, nearest first."""
+        return [self._expiry_stats[expiry] for expiry in sorted(self._expiry_stats)]
+
+    def totals(self) -> Dict[str, Any]:
+        call_oi = sum(stats["call_open_interest"] for stats in self._expiry_stats.values())
+        put_oi = sum(stats["put_open_interest"] for stats in self._expiry_stats.values())
+        call_volume = sum(stats["call_volume"] for stats in self._expiry_stats.values())
+        put_volume = sum(stats["put_volume"] for stats in self._expiry_stats.values())
+        return {
+            "instrument_count": len(self.names),
+            "call_open_interest": call_oi,
+            "put_open_interest": put_oi,
+            "put_call_oi_ratio": _ratio(put_oi, call_oi),
+            "put_call_volume_ratio": _ratio(put_volume, call_volume),
+        }
+
+    def open_interest_by_strike(self, expiry_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Call and put open interest summed per strike, across expiries unless one is given."""
+        mask = self._expiry_mask(expiry_date)
+        strikes, inverse = np.unique(self._arrays["strike"][mask], return_inverse=True)
+        oi, is_call = self._arrays["open_interest"][mask], self._is_call[mask]
+        calls = np.bincount(inverse, weights=np.where(is_call, oi, 0.0), minlength=len(strikes))
+        puts = np.bincount(inverse, weights=np.where(is_call, 0.0, oi), minlength=len(strikes))
+        return [
+            {"strike": float(strike), "call_open_interest": float(c), "put_open_interest": float(p)}
+            for strike, c, p in zip(strikes, calls, puts)
+        ]
+
+    def instruments(self, expiry_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-instrument inputs, implied volatility and greeks, ordered by expiry then strike."""
+        a = self._arrays
+        idx = np.flatnonzero(self._expiry_mask(expiry_date))
+        idx = idx[np.lexsort((a["strike"][idx], a["expiry"][idx]))]
+        return [
+            {
+                "instrument_name": self.names[i],
+                "expiry": datetime.fromtimestamp(a["expiry"][i], tz=timezone.utc).strftime("%Y-%m-%d"),
+                "strike": float(a["strike"][i]),
+                "option_type": "call" if self._is_call[i] else "put",
+                "mark_price": _clean(a["mark_price"][i]),
+                "underlying_price": _clean(a["forward"][i]),
+                "open_interest": float(a["open_interest"][i]),
+                "iv": _clean(a["iv"][i]),
+                "delta": _clean(a["delta"][i]),
+                "gamma": _clean(a["gamma"][i]),
+                "vega": _clean(a["vega"][i]),
+            }
+            for i in idx
+        ]
+
+    def surface(self) -> Dict[str, Any]:
+        """Implied volatility on an expiry x strike grid (out-of-the-money side per strike)."""
+        a = self._arrays
+        expiries = sorted(self._expiry_stats)
+        strikes = np.unique(a["strike"])
+        grid = np.full((len(expiries), len(strikes)), np.nan)
+        # OTM options carry the cleaner vol: calls above the forward, puts below
+        otm = np.where(self._is_call, a["strike"] >= a["forward"], a["strike"] < a["forward"])
+        rows = np.searchsorted(expiries, a["expiry"][otm])
+        cols = np.searchsorted(strikes, a["strike"][otm])
+        grid[rows, cols] = a["iv"][otm]
+        return {
+            "expiries": [self._expiry_stats[e]["expiry"] for e in expiries],
+            "strikes": strikes.tolist(),
+            "iv": [[_clean(v) for v in row] for row in grid.tolist()],
+        }
+
+
+# One analytics instance per currency, refreshed from REST at most every OPTIONS_SUMMARY_TTL seconds
+_analytics: Dict[str, OptionsAnalytics] = {}
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def fetch_book_summaries(currency: str) -> Optional[List[Dict[str, Any]]]:
+    """Book summaries of every live option on ``currency`` in one request."""
+    try:
+        response = await get_client().get(
+            f"{DERIBIT_API_URL}/get_book_summary_by_currency",
+            params={"currency": currency, "kind": "option"},
+        )
+        response.raise_for_status()
+        return response.json().get("result")
+    except Exception as e:
+        logger.error(f"Error fetching Deribit {currency} book summaries: {e}")
+        return None
+
+
+def start_options_streams(url: Optional[str] = None) -> None:
+    """Feed every currency's analytics from a Deribit ticker stream instead of REST polling."""
+    for currency in CURRENCIES:
+        analytics = _analytics.setdefault(currency, OptionsAnalytics(currency))
+        start_ticker_cache(currency, on_batch=lambda rows, full, a=analytics: a.update(rows, full=full), url=url)
+
+
+async def get_options_analytics(currency: str) -> Optional[OptionsAnalytics]:
+    """
+    Analytics for ``currency``. While its ticker stream is live this is a pure
+    memory read; otherwise book summaries are polled when older than
+    OPTIONS_SUMMARY_TTL and applied incrementally.
+    """
+    stream = get_ticker_cache(currency)
+    if stream is not None and stream.live and currency in _analytics and _analytics[currency].updated_at:
+        return _analytics[currency]
+
+    analytics = _analytics.get(currency)
+    if analytics and analytics.updated_at and time.time() - analytics.updated_at < settings.OPTIONS_SUMMARY_TTL:
+        return analytics
+
+    async with _locks.setdefault(currency, asyncio.Lock()):
+        analytics = _analytics.setdefault(currency, OptionsAnalytics(currency))
+        if analytics.updated_at and time.time() - analytics.updated_at < settings.OPTIONS_SUMMARY_TTL:
+            return analytics
+        summaries = await fetch_book_summaries(currency)
+        if summaries is None:
+            # Serve the previous state if there is one
+            return analytics if analytics.updated_at else None
+        recomputed = analytics.update(summaries)
+        logger.info(f"Options analytics {currency}: {len(analytics)} instruments, {recomputed} recomputed")
+        return analytics
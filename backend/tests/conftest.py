@@ -46,6 +46,19 @@ async def session(engine):
         yield session
         await session.rollback()
 
+@pytest.fixture(scope="function")
+async def server_client(session):
+    """HTTP client for the deployed app (server.app), reading from the test session."""
+    from httpx import ASGITransport, AsyncClient
+    from app.core.database import get_db
+    from server import app
+
+    app.dependency_overrides[get_db] = lambda: session
+    try:
+        yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
 @pytest.fixture(scope="function")
 def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
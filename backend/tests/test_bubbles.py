@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.core.config import settings
+from app.models.market_snapshot import MarketSnapshot
+from app.models.ohlcv_rollup import OhlcvRollup
+from app.models.latest_market_state import LatestMarketState
+from app.models.bubble_outlier import BubbleOutlier
+from app.models.bubble_stat import BubbleStat
+from worker.bubbles import window_stats, score_symbols, fold_close, refresh_bubble_outliers
+from worker.ingest import upsert_bubble_outliers
+
+NOW = datetime(2025, 5, 5, 0, 30, 0)
+
+
+def test_window_stats_and_ranking():
+    """Z-scores are ranked by magnitude; sparse or flat windows are not scored."""
+    windows = np.array([
+        [100.0, 101.0, 99.0, 100.0, np.nan],
+        [10.0, 10.0, 10.0, 10.0, 10.0],
+        [50.0, np.nan, np.nan, np.nan, np.nan],
+        [20.0, 21.0, 19.0, 20.0, 20.0],
+    ])
+    counts, means, variances = window_stats(windows)
+    assert list(counts) == [4, 5, 1, 5]
+    assert variances[0] == pytest.approx(np.var([100, 101, 99, 100]))
+
+    current = np.array([103.0, 12.0, 60.0, 18.0])
+    results = score_symbols(["AAA", "FLAT", "SPARSE", "BBB"], current, means, variances, counts,
+                            lookback_days=30, min_samples=3)
+    assert [(r["symbol"], r["rank"]) for r in results] == [("AAA", 1), ("BBB", 2)]
+    assert results[0]["z_score"] == pytest.approx(3 / np.std([100, 101, 99, 100]))
+    assert results[0]["percent_deviation"] == pytest.approx(3.0)
+    assert results[1]["direction"] == "down"
+
+
+def test_fold_close_matches_window_stats_until_window_fills():
+    """Before the window fills the running stats equal a full recompute of the same closes."""
+    closes = [100.0, 102.0, 98.0, 101.0]
+    count, mean, variance = 0, 0.0, 0.0
+    for close in closes:
+        count, mean, variance = fold_close(count, mean, variance, close, alpha=0.01)
+    counts, means, variances = window_stats(np.array([closes + [np.nan]]))
+    assert count == counts[0] == 4
+    assert mean == pytest.approx(means[0])
+    assert variance == pytest.approx(variances[0])
+    assert variance == pytest.approx(np.var(closes))
+
+
+@pytest.mark.asyncio
+async def test_recompute_then_incremental_update(session, monkeypatch):
+    """A full recompute seeds persisted stats; later snapshots update them in place."""
+    monkeypatch.setattr(settings, "BUBBLE_LOOKBACK_DAYS", 7)
+    monkeypatch.setattr(settings, "BUBBLE_MIN_SAMPLES", 24)
+    monkeypatch.setattr(settings, "BUBBLE_RECOMPUTE_INTERVAL", 6 * 3600)
+    for hour in range(48):
+        bucket = NOW.replace(minute=0) - timedelta(hours=48 - hour)
+        for symbol, base in (("BTC", 100.0), ("ETH", 50.0)):
+            price = base + (hour % 2)
+            session.add(OhlcvRollup(symbol=symbol, interval="1h", bucket=bucket, open=price, high=price,
+                                    low=price, close=price, sample_count=1, first_ts=bucket, last_ts=bucket))
+    session.add(LatestMarketState(symbol="BTC", timestamp=NOW, price=110.0))
+    session.add(LatestMarketState(symbol="ETH", timestamp=NOW, price=50.5))
+    await session.commit()
+
+    outliers = await refresh_bubble_outliers([], session, now=NOW)
+    await upsert_bubble_outliers(outliers, session)
+    await session.commit()
+
+    result = await session.execute(select(BubbleOutlier).order_by(BubbleOutlier.rank))
+    btc, eth = result.scalars().all()
+    assert (btc.symbol, btc.rank, btc.direction) == ("BTC", 1, "up")
+    assert btc.z_score > 10
+    assert eth.z_score == pytest.approx(0.0)
+
+    btc_stat = await session.get(BubbleStat, "BTC")
+    assert (btc_stat.count, btc_stat.ts_recomputed) == (48, NOW)
+    assert btc_stat.mean == pytest.approx(100.5)
+
+    # Next hour: the pending 110 close is folded in and ETH falls sharply
+    later = NOW + timedelta(hours=1)
+    snapshots = [
+        MarketSnapshot(symbol="BTC", timestamp=later, price=100.5),
+        MarketSnapshot(symbol="ETH", timestamp=later, price=45.0),
+    ]
+    outliers = await refresh_bubble_outliers(snapshots, session, now=later)
+    await session.commit()
+
+    assert [o["symbol"] for o in outliers] == ["ETH", "BTC"]
+    assert outliers[0]["direction"] == "down"
+    await session.refresh(btc_stat)
+    assert btc_stat.count == 49
+    assert btc_stat.mean == pytest.approx(100.5 + (110.0 - 100.5) / 49)
+    assert btc_stat.ts_recomputed == NOW
@@ -0,0 +1,48 @@
+import pytest
+from datetime import datetime
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.latest_market_state import LatestMarketState
+from app.models.liquidation import Liquidation
+from app.models.stablecoin_flow import StablecoinFlow
+from app.api.routes import get_dashboard_data, dashboard_cache
+
+NOW = datetime(2025, 5, 1, 9, 0, 0)
+
+
+@pytest.fixture
+async def file_session(tmp_path):
+    """File-backed database so the concurrent reads get real pooled connections."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dashboard.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(StablecoinFlow.metadata.create_all)
+    dashboard_cache.clear()
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    dashboard_cache.clear()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_dashboard_data_cached_until_ingest_version_changes(file_session):
+    """Repeated polls reuse the cached payload until new rows are committed."""
+    file_session.add(LatestMarketState(symbol="BTC", timestamp=NOW, price=95000.0, ts_updated=NOW))
+    file_session.add(StablecoinFlow(date=NOW.date(), net=1.5e8, circulating=2.1e11))
+    await file_session.commit()
+
+    first = await get_dashboard_data(db=file_session)
+    assert first["market_data"]["BTC"]["price"] == 95000.0
+    assert first["recent_liquidations"] == []
+    assert first["stablecoin_flow_24h"] == 1.5e8
+    assert await get_dashboard_data(db=file_session) is first
+
+    file_session.add(Liquidation(symbol="BTC", side="sell", price=94000.0, quantity=2.0,
+                                 value_usd=188000.0, timestamp=NOW, exchange="binance"))
+    await file_session.commit()
+
+    second = await get_dashboard_data(db=file_session)
+    assert second is not first
+    assert second["recent_liquidations"][0]["coin"] == "BTC"
+    assert second["recent_liquidations"][0]["value_usd"] == 188000.0
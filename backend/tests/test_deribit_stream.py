@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from services import deribit_options, options_analytics
+from services.deribit_options import DeribitTickerCache, get_options_chain
+from services.deribit_replay import DeribitReplayServer, load_recording, synthetic_session
+from services.options_analytics import OptionsAnalytics, get_options_analytics
+
+
+async def wait_for(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_ticker_stream_feeds_analytics_without_rest(tmp_path, monkeypatch):
+    """Replayed tickers fill the chain and analytics; reads then make no upstream calls."""
+    instruments, ticks = synthetic_session(expiries=2, strikes=5, rounds=3)
+    analytics = OptionsAnalytics("BTC")
+    monkeypatch.setattr(options_analytics, "_analytics", {"BTC": analytics})
+    monkeypatch.setattr(deribit_options, "_ticker_caches", {})
+
+    async def no_rest(*args, **kwargs):
+        raise AssertionError("REST called while the stream is live")
+
+    monkeypatch.setattr(options_analytics, "fetch_book_summaries", no_rest)
+    monkeypatch.setattr(deribit_options, "_request", no_rest)
+
+    recording = str(tmp_path / "ticks.ndjson")
+    async with DeribitReplayServer(instruments, ticks, speed=0, heartbeat_interval=0.05) as server:
+        cache = DeribitTickerCache(
+            "BTC", url=server.url, flush_interval=0.02, record_path=recording,
+            on_batch=lambda rows, full: analytics.update(rows, full=full),
+        )
+        deribit_options._ticker_caches["BTC"] = cache
+        cache.start()
+        try:
+            await wait_for(lambda: cache.messages == len(ticks) and len(analytics) == len(instruments))
+            await wait_for(lambda: server.stats["heartbeat_replies"] > 0)
+            assert server.stats["connections"] == 1
+            assert server.stats["subscribed_channels"] == len(instruments)
+
+            assert await get_options_analytics("BTC") is analytics
+            assert len(analytics.expiry_summary()) == 2
+            assert all(row["iv"] is not None for row in analytics.instruments())
+            chain = await get_options_chain("BTC")
+            assert chain.total_count == len(instruments)
+        finally:
+            await cache.stop()
+
+    # The recording replays into the same instrument set
+    replayed_instruments, replayed_ticks = load_recording(recording)
+    assert len(replayed_ticks) == len(ticks)
+    assert {i["instrument_name"] for i in replayed_instruments} == {i["instrument_name"] for i in instruments}
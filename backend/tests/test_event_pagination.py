@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from app.models.liquidation import Liquidation
+from app.api.routes import get_liquidations
+
+NOW = datetime(2025, 5, 2, 12, 0, 0)
+
+
+async def seed(session):
+    # Two pairs share a timestamp so the id tie-breaker is exercised
+    offsets = [0, 0, 10, 20, 20, 30]
+    for i, offset in enumerate(offsets):
+        session.add(Liquidation(
+            symbol="BTC" if i % 3 else "ETH",
+            side="sell" if i % 2 else "BUY",
+            price=100.0,
+            quantity=float(i + 1),
+            value_usd=100.0 * (i + 1),
+            timestamp=NOW + timedelta(seconds=offset),
+        ))
+    await session.commit()
+
+
+async def fetch(session, **filters):
+    params = {"symbol": None, "side": None, "min_value_usd": None, "start": None, "end": None, "cursor": None}
+    params.update(filters)
+    return await get_liquidations(db=session, **params)
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_every_row_once(session):
+    """Walking the cursors returns all rows newest first with no gaps or repeats."""
+    await seed(session)
+
+    seen, cursor = [], None
+    while True:
+        page = await fetch(session, cursor=cursor, limit=2)
+        seen.extend(page["liquidations"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [row["id"] for row in seen] == [6, 5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_filters_and_invalid_cursor(session):
+    """Symbol, side and value filters combine; a malformed cursor is a 400."""
+    await seed(session)
+
+    page = await fetch(session, symbol="BTC", side="buy", min_value_usd=250.0, limit=10)
+    assert [row["id"] for row in page["liquidations"]] == [5, 3]
+    assert page["next_cursor"] is None
+
+    with pytest.raises(HTTPException) as exc:
+        await fetch(session, cursor="not-a-cursor", limit=10)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_event_endpoints_are_served_by_the_app(session, server_client):
+    """The deployed app mounts the paginated liquidation and trade endpoints."""
+    await seed(session)
+    async with server_client as client:
+        liquidations = await client.get("/api/liquidations", params={"symbol": "ETH"})
+        trades = await client.get("/api/trades")
+    assert liquidations.status_code == trades.status_code == 200
+    assert [row["id"] for row in liquidations.json()["liquidations"]] == [4, 1]
+    assert trades.json()["trades"] == []
+
+
+@pytest.mark.asyncio
+async def test_time_filters_accept_utc_offsets(session, server_client):
+    """``Z`` and offset bounds are compared as UTC against the stored naive timestamps."""
+    await seed(session)
+    async with server_client as client:
+        response = await client.get("/api/liquidations", params={
+            "start": "2025-05-02T12:00:10Z", "end": "2025-05-02T14:00:20+02:00",
+        })
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()["liquidations"]] == [5, 4, 3]
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base
+from app.models.trade_large import TradeLarge
+from app.api.routes import export_history
+
+NOW = datetime(2025, 5, 3, 8, 0, 0)
+
+
+@pytest.fixture
+async def file_session(tmp_path, monkeypatch):
+    """File-backed database so the export can open its own streaming connection."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # Small chunks so a handful of rows spans several
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 2)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        for i in range(5):
+            session.add(TradeLarge(symbol="BTC" if i % 2 else "ETH", side="buy", price=100.0, quantity=1.0,
+                                   value_usd=100.0 * i, timestamp=NOW + timedelta(minutes=i)))
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def collect(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+async def export(session, **params):
+    defaults = {"format": "ndjson", "symbol": None, "side": None, "min_value_usd": None, "start": None, "end": None}
+    defaults.update(params)
+    return await export_history("trades", db=session, **defaults)
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_and_csv(file_session):
+    """Filtered rows come back oldest first in both text formats."""
+    response = await export(file_session, symbol="BTC")
+    rows = [json.loads(line) for line in (await collect(response)).decode().splitlines()]
+    assert [row["value_usd"] for row in rows] == [100.0, 300.0]
+    assert rows[0]["timestamp"] == (NOW + timedelta(minutes=1)).isoformat()
+
+    response = await export(file_session, format="csv", start=NOW + timedelta(minutes=2))
+    assert response.media_type == "text/csv"
+    reader = list(csv.DictReader(io.StringIO((await collect(response)).decode())))
+    assert [row["symbol"] for row in reader] == ["ETH", "BTC", "ETH"]
+
+
+@pytest.mark.asyncio
+async def test_export_arrow(file_session):
+    """Arrow output is a valid IPC stream carrying every matching row."""
+    pa = pytest.importorskip("pyarrow")
+    response = await export(file_session, format="arrow", min_value_usd=100.0)
+    table = pa.ipc.open_stream(await collect(response)).read_all()
+    assert table.num_rows == 4
+    assert table.column("value_usd").to_pylist() == [100.0, 200.0, 300.0, 400.0]
+
+
+@pytest.mark.asyncio
+async def test_export_is_served_by_the_app(file_session):
+    """The deployed app mounts the export endpoint, streaming with the chosen media type."""
+    from httpx import ASGITransport, AsyncClient
+    from app.core.database import get_db
+    from server import app
+
+    app.dependency_overrides[get_db] = lambda: file_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/export/trades", params={"format": "csv", "symbol": "ETH"})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert [row["value_usd"] for row in csv.DictReader(io.StringIO(response.text))] == ["0.0", "200.0", "400.0"]
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import pytest
+import websockets
+from data_sources.hyperliquid_contexts import AssetContextTable
+from services import funding_monitor
+from services.funding_monitor import FundingMonitor, FundingTable, normalize_symbol
+
+NOW = 1_746_090_000.0
+NEXT = 1_746_115_200  # Next 8h settlement, epoch seconds
+
+
+def mark_price(symbol, rate, next_funding=NEXT):
+    return {"e": "markPriceUpdate", "E": int(NOW * 1000), "s": symbol, "p": "1.0", "r": str(rate), "T": next_funding * 1000}
+
+
+def test_symbols_map_to_hyperliquid_coins():
+    """USDT perps map to Hyperliquid names, 1000x contracts to their k-prefixed coin."""
+    assert normalize_symbol("BTCUSDT") == "BTC"
+    assert normalize_symbol("1000PEPEUSDT") == "kPEPE"
+    assert normalize_symbol("BTCUSDC") is None
+
+
+def test_settlement_moves_predicted_to_current_and_spreads_rank():
+    """A later next-funding time settles the old prediction; spreads compare annualized rates."""
+    table = FundingTable(capacity=1)
+    table.update("binance", ["BTC", "ETH"], [0.0001, 0.0003], [NEXT, NEXT], NOW)
+    table.update("hyperliquid", ["BTC", "ETH", "SOL"], [0.0000125, -0.00001, 0.00002], [NOW + 600] * 3, NOW)
+    table.update("binance", ["BTC"], [0.0002], [NEXT + 8 * 3600], NOW + 1)
+
+    btc = table.get("BTC")
+    assert btc["venues"]["binance"] == pytest.approx({
+        "predicted_rate": 0.0002, "current_rate": 0.0001, "interval_hours": 8.0,
+        "annualized_rate": 0.0002 / 8 * 8760, "next_funding_time": NEXT + 8 * 3600,
+    })
+    assert btc["venues"]["hyperliquid"]["current_rate"] is None
+    assert btc["annualized_spread"] == pytest.approx((0.0002 / 8 - 0.0000125) * 8760)
+    # SOL has no Binance rate, so no spread
+    assert [row["symbol"] for row in table.top_spreads(5)] == ["ETH", "BTC"]
+    assert [row["symbol"] for row in table.top_spreads(1)] == ["ETH"]
+
+
+def test_binance_intervals_are_per_symbol():
+    """Loaded intervals apply from first sight; a shorter settlement step shortens one."""
+    table = FundingTable(capacity=1)
+    table.set_intervals("binance", {"SOL": 4.0})
+    table.update("binance", ["BTC", "SOL", "ETH"], [0.0001] * 3, [NEXT] * 3, NOW)
+    table.update("hyperliquid", ["BTC", "SOL", "ETH"], [0.0] * 3, [NOW + 600] * 3, NOW)
+    assert table.get("SOL")["venues"]["binance"]["annualized_rate"] == pytest.approx(0.0001 / 4 * 8760)
+    assert [row["symbol"] for row in table.top_spreads(3)] == ["SOL", "BTC", "ETH"]
+
+    # BTC moved to hourly funding; SOL skipped a 4h settlement, which is not a longer interval
+    table.update("binance", ["BTC", "SOL"], [0.0001] * 2, [NEXT + 3600, NEXT + 8 * 3600], NOW + 1)
+    assert table.get("BTC")["venues"]["binance"]["interval_hours"] == 1.0
+    assert table.get("SOL")["venues"]["binance"]["interval_hours"] == 4.0
+    assert table.top_spreads(1)[0]["annualized_spread"] == pytest.approx(0.0001 * 8760)
+
+    # A reload without SOL restores its default
+    table.set_intervals("binance", {"BTC": 1.0})
+    assert table.get("SOL")["venues"]["binance"]["interval_hours"] == 8.0
+
+
+@pytest.mark.asyncio
+async def test_monitor_streams_binance_and_publishes_only_changes(monkeypatch):
+    """Mark price arrays from the socket and Hyperliquid contexts feed spreads, republished on change."""
+    async def intervals(url):
+        return {"ETH": 4.0}
+
+    monkeypatch.setattr(funding_monitor, "fetch_funding_intervals", intervals)
+    sent = asyncio.Event()
+
+    async def binance(ws):
+        await ws.send(json.dumps([mark_price("BTCUSDT", 0.0001), mark_price("ETHUSDT", 0.0003), mark_price("BTCUSDC", 0.5)]))
+        await ws.send(json.dumps([mark_price("ETHUSDT", 0.0004)]))
+        sent.set()
+        await ws.wait_closed()
+
+    contexts = AssetContextTable(clock=lambda: NOW)
+    contexts.update_contexts(["BTC", "ETH"], [{"funding": "0.0000125"}, {"funding": "0.00001"}])
+    published = []
+    async with websockets.serve(binance, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        monitor = FundingMonitor(
+            url=f"ws://127.0.0.1:{port}", hyperliquid_contexts=contexts, top_n=5,
+            publish_interval=0.01, on_spreads=published.append, clock=lambda: NOW,
+        )
+        monitor.start()
+        try:
+            await asyncio.wait_for(sent.wait(), 5)
+            # Wait until the second ETH rate has been published
+            while not published or published[-1][0]["venues"]["binance"]["predicted_rate"] != 0.0004:
+                await asyncio.sleep(0.01)
+        finally:
+            await monitor.stop()
+
+    assert len(monitor.table) == 2
+    assert monitor.version == len(published) and published[-1] is monitor.spreads
+    assert [row["symbol"] for row in monitor.spreads] == ["ETH", "BTC"]
+    assert monitor.spreads[0]["venues"]["binance"]["predicted_rate"] == 0.0004
+    assert monitor.spreads[0]["venues"]["binance"]["interval_hours"] == 4.0
+
+    # New Hyperliquid funding changes the ranking and is republished
+    contexts.clock = lambda: NOW + 5
+    contexts.update_contexts(["BTC"], [{"funding": "-0.0005"}])
+    assert monitor.publish() and [row["symbol"] for row in published[-1]] == ["BTC", "ETH"]
+    assert not monitor.publish()
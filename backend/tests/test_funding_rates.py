@@ -26,7 +26,6 @@ async def test_funding_rates_storage():
     async with SessionLocal() as session:
         # Insert a test market snapshot
         test_snapshot = MarketSnapshot(
-            id="BTC_2024-04-16T21:00:00",
             symbol="BTC",
             timestamp=datetime.utcnow(),
             price=50000.0,
@@ -0,0 +1,106 @@
+import json
+import pytest
+from data_sources import hyperliquid
+from data_sources.hyperliquid import HyperliquidService, Settings
+from data_sources.hyperliquid_contexts import AssetContextTable, decode_message, meta_and_asset_ctxs
+
+META = {"universe": [{"name": "BTC", "szDecimals": 5}, {"name": "ETH", "szDecimals": 4}]}
+CTXS = [
+    {"funding": "0.0000125", "openInterest": "1000.5", "markPx": "95000.0", "oraclePx": "94990.0",
+     "midPx": "95001.0", "premium": "0.0001", "dayNtlVlm": "1200000000.0", "prevDayPx": "94000.0"},
+    {"funding": "-0.00002", "openInterest": "20000.0", "markPx": "3500.0", "oraclePx": "3501.0",
+     "midPx": None, "premium": "-0.0003", "dayNtlVlm": "500000000.0", "prevDayPx": "3400.0"},
+]
+
+
+def envelope(channel, data):
+    return json.dumps({"channel": channel, "data": data})
+
+
+def test_snapshots_and_single_asset_updates_write_rows_in_place():
+    """A universe snapshot fills one row per coin; later updates overwrite them without growing."""
+    table = AssetContextTable(capacity=1, clock=lambda: 100.0)
+    post = {"id": 1, "response": {"type": "info", "payload": {"type": "metaAndAssetCtxs", "data": [META, CTXS]}}}
+    table.update_universe(*meta_and_asset_ctxs(*decode_message(envelope("post", post))))
+
+    btc = table.get("BTC")
+    assert btc["funding"] == 0.0000125
+    assert btc["open_interest_usd"] == pytest.approx(1000.5 * 95000.0)
+    assert table.get("ETH")["mid_price"] is None
+
+    table.update_asset("ETH", {**CTXS[1], "funding": "0.00001"})
+    table.update_mids({"ETH": "3502.5", "DOGE": "0.1"})
+    assert len(table) == 2 and "DOGE" not in table
+    assert list(table.column("funding")) == [0.0000125, 0.00001]
+    assert table.get("ETH")["mid_price"] == 3502.5
+
+
+def test_non_envelope_messages_are_ignored():
+    """Messages without a channel decode to nothing and carry no snapshot."""
+    assert decode_message(json.dumps({"allMids": {}})) == (None, None)
+    assert meta_and_asset_ctxs("post", {"id": 2, "response": {"type": "info", "payload": {"type": "meta"}}}) is None
+
+
+@pytest.mark.asyncio
+async def test_service_dispatches_channel_envelopes():
+    """allMids, activeAssetCtx and metaAndAssetCtxs pushes all land in the service state."""
+
+    class Socket:
+        def __init__(self, messages):
+            self.messages = messages
+
+        def __aiter__(self):
+            return self._iter()
+
+        async def _iter(self):
+            for message in self.messages:
+                yield message
+
+    service = HyperliquidService(Settings())
+    service.ws = Socket([
+        envelope("metaAndAssetCtxs", [META, CTXS]),
+        envelope("allMids", {"mids": {"BTC": "95100.5"}}),
+        envelope("activeAssetCtx", {"coin": "ETH", "ctx": {**CTXS[1], "openInterest": "25000.0"}}),
+    ])
+    await service._handle_messages()
+    assert service.all_mark_prices == {"BTC": 95100.5}
+    assert service.asset_contexts.get("BTC")["mid_price"] == 95100.5
+    assert service.asset_contexts.get("ETH")["open_interest"] == 25000.0
+    market = (await service.broadcast_data())["data"]["market_data"]
+    assert market["eth"]["funding_rate"] == -0.00002
+
+
+@pytest.mark.asyncio
+async def test_fetch_market_data_reads_open_interest_from_contexts(monkeypatch):
+    """The worker's market data uses streamed open interest and skips Binance's OI endpoint for it."""
+    service = HyperliquidService(Settings())
+    service.asset_contexts.update_universe(*meta_and_asset_ctxs(*decode_message(envelope(
+        "post", {"id": 1, "response": {"type": "info", "payload": {"type": "metaAndAssetCtxs", "data": [META, CTXS[:1]]}}}
+    ))))
+    requested = []
+
+    class Response:
+        status = 503
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class Session(Response):
+        def get(self, url):
+            requested.append(url)
+            return Response()
+
+    async def fake_service():
+        return service
+
+    monkeypatch.setattr(hyperliquid.aiohttp, "ClientSession", Session)
+    monkeypatch.setattr(hyperliquid, "get_hyperliquid_service", fake_service)
+
+    market_data = await hyperliquid.fetch_market_data()
+    assert market_data["btc"]["open_interest"] == pytest.approx(1000.5 * 95000.0)
+    assert market_data["eth"]["open_interest"] == 2000000000  # No context and Binance down
+    oi_requests = [url for url in requested if "openInterest" in url]
+    assert oi_requests == ["https://fapi.binance.com/fapi/v1/openInterest?symbol=ETHUSDT"]
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import pytest
+import websockets
+from data_sources import hyperliquid
+from data_sources.hyperliquid import HyperliquidService, Settings, get_hyperliquid_service
+
+META = {"universe": [{"name": "BTC"}]}
+CTXS = [{"funding": "0.00001", "openInterest": "10.0", "markPx": "95000.0"}]
+
+
+class FlappingHyperliquid:
+    """
+    WebSocket stand-in that drops every odd connection straight away and the
+    others shortly after they subscribe, answering pings and info posts.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.open = 0
+        self.max_open = 0
+        self.pings = 0
+        self.subscriptions = []  # Channels subscribed, per connection
+
+    async def drop(self, ws):
+        await asyncio.sleep(0.1)
+        await ws.close()
+
+    async def handler(self, ws):
+        self.connections += 1
+        self.open += 1
+        self.max_open = max(self.max_open, self.open)
+        subscribed = []
+        self.subscriptions.append(subscribed)
+        dropper = None
+        try:
+            if self.connections % 2:
+                await ws.close()
+                return
+            async for raw in ws:
+                message = json.loads(raw)
+                if message["method"] == "subscribe":
+                    subscribed.append(message["subscription"]["type"])
+                    await ws.send(json.dumps({"channel": "subscriptionResponse", "data": message}))
+                    if len(subscribed) == 2:
+                        dropper = asyncio.create_task(self.drop(ws))
+                elif message["method"] == "ping":
+                    self.pings += 1
+                    await ws.send(json.dumps({"channel": "pong"}))
+                elif message["method"] == "post":
+                    payload = {"type": "metaAndAssetCtxs", "data": [META, CTXS]}
+                    await ws.send(json.dumps({"channel": "post", "data": {
+                        "id": message["id"], "response": {"type": "info", "payload": payload},
+                    }}))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.open -= 1
+            if dropper is not None:
+                dropper.cancel()
+
+
+def supervisors():
+    return [t for t in asyncio.all_tasks() if t.get_coro().__qualname__ == "HyperliquidService._run"]
+
+
+@pytest.mark.asyncio
+async def test_one_supervisor_and_one_socket_under_flapping_connectivity(monkeypatch):
+    """Repeated accessor calls never add tasks; each reconnect resubscribes on a single socket."""
+    upstream = FlappingHyperliquid()
+    async with websockets.serve(upstream.handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        service = HyperliquidService(Settings(
+            hyperliquid_ws_url=f"ws://127.0.0.1:{port}",
+            hyperliquid_info_url="http://127.0.0.1:9/info",  # Refused, like an unreachable REST API
+            hyperliquid_heartbeat_interval=0.02,
+            hyperliquid_retry_base_delay=0.01,
+            hyperliquid_retry_max_delay=0.05,
+        ))
+        monkeypatch.setattr(hyperliquid, "_service_instance", service)
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 10
+            while upstream.connections < 6:
+                assert loop.time() < deadline, "timed out"
+                assert await get_hyperliquid_service() is service
+                assert len(supervisors()) == 1
+                await asyncio.sleep(0.005)
+
+            assert upstream.max_open == 1
+            served = upstream.subscriptions[1::2]
+            assert all(channels == ["allMids", "liquidations"] for channels in served[:-1])
+            assert upstream.pings > 0
+            assert service.asset_contexts.get("BTC")["funding"] == 0.00001
+        finally:
+            await service.stop()
+    assert supervisors() == []
+    assert service.ws is None
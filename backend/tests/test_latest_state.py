@@ -0,0 +1,30 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.models.market_snapshot import MarketSnapshot
+from app.models.latest_market_state import LatestMarketState
+from worker.ingest import upsert_latest_market_state
+
+NOW = datetime(2025, 4, 30, 12, 0, 0)
+
+
+def snapshot(symbol, price, seconds):
+    return MarketSnapshot(symbol=symbol, timestamp=NOW + timedelta(seconds=seconds), price=price)
+
+
+@pytest.mark.asyncio
+async def test_latest_state_keeps_newest_snapshot(session):
+    """Each symbol keeps its newest snapshot; late-arriving older ones are ignored."""
+    await upsert_latest_market_state(
+        [snapshot("BTC", 100.0, 0), snapshot("BTC", 101.0, 20), snapshot("ETH", 3000.0, 0)],
+        session,
+    )
+    await session.commit()
+
+    await upsert_latest_market_state([snapshot("BTC", 99.0, 10), snapshot("ETH", 3010.0, 40)], session)
+    await session.commit()
+
+    result = await session.execute(select(LatestMarketState).order_by(LatestMarketState.symbol))
+    btc, eth = result.scalars().all()
+    assert (btc.price, btc.timestamp) == (101.0, NOW + timedelta(seconds=20))
+    assert (eth.price, eth.timestamp) == (3010.0, NOW + timedelta(seconds=40))
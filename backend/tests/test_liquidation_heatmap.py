@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from data_sources import hyperliquid
+from data_sources.hyperliquid import HyperliquidService, Settings
+from data_sources.liquidation_heatmap import LiquidationHeatmap, liquidation_prices, positions_from_state
+
+STATE = {
+    "crossMarginSummary": {"accountValue": "600.0"},
+    "crossMaintenanceMarginUsed": "500.0",
+    "assetPositions": [
+        {"position": {"coin": "BTC", "szi": "1.0", "entryPx": "100.0", "positionValue": "100.0",
+                      "marginUsed": "10.0", "maxLeverage": 50, "leverage": {"type": "isolated", "value": 10}}},
+        {"position": {"coin": "ETH", "szi": "-100.0", "entryPx": "10.0", "positionValue": "1000.0",
+                      "marginUsed": "100.0", "maxLeverage": 25, "leverage": {"type": "cross", "value": 10}}},
+    ],
+}
+
+
+def test_liquidation_price_matches_margin_at_maintenance():
+    """At the computed price, equity left equals the maintenance margin."""
+    btc, eth = positions_from_state("0xabc", STATE)
+    liq = liquidation_prices(*(np.array([btc[k], eth[k]]) for k in ("mark_price", "size", "margin_available", "maintenance_rate")))
+    # Isolated long: 10 margin + (p - 100) == 1% of p
+    assert liq[0] == pytest.approx(90 / 0.99)
+    # Cross short: 100 available above maintenance, shared by the account
+    assert liq[1] == pytest.approx(10 + 100 / 100 / 1.02)
+
+
+def test_mark_moves_match_a_full_rebuild():
+    """Incremental bucket updates equal recomputing from the positions still live."""
+    rng = np.random.default_rng(3)
+    n = 500
+    positions = [
+        {"address": f"0x{i}", "coin": "BTC", "size": float(rng.choice([-1, 1]) * rng.uniform(0.1, 2)),
+         "mark_price": 100.0, "notional": 0.0, "margin_available": float(rng.uniform(1, 30)),
+         "maintenance_rate": 0.01}
+        for i in range(n)
+    ]
+    for position in positions:
+        position["notional"] = abs(position["size"]) * 100.0
+    heatmap = LiquidationHeatmap(bucket_bps=50)
+    heatmap.load(positions)
+    book = heatmap.books["BTC"]
+    liq = liquidation_prices(*(np.array([p[k] for p in positions]) for k in ("mark_price", "size", "margin_available", "maintenance_rate")))
+    is_long = np.array([p["size"] > 0 for p in positions])
+    notional = np.array([p["notional"] for p in positions])
+    tracked = (liq > 0) & (np.abs(liq / 100 - 1) <= 1)  # Within MAX_DISTANCE of the mark
+    assert 0 < tracked.sum() < n
+
+    low = high = 100.0
+    for mark in [97.0, 99.0, 104.0, 88.0, 101.0, 112.0]:
+        heatmap.apply_marks({"BTC": mark})
+        low, high = min(low, mark), max(high, mark)
+        live_long = tracked & is_long & (liq < low)
+        live_short = tracked & ~is_long & (liq > high)
+        buckets = np.where(tracked, np.floor(liq / book.step).astype(int) - book.lo, 0)
+        expected_long = np.bincount(buckets[live_long], notional[live_long], minlength=len(book.long_hist))
+        expected_short = np.bincount(buckets[live_short], notional[live_short], minlength=len(book.short_hist))
+        np.testing.assert_allclose(book.long_hist, expected_long, atol=1e-6)
+        np.testing.assert_allclose(book.short_hist, expected_short, atol=1e-6)
+
+    summary = heatmap.symbols()[0]
+    assert summary["long_positions"] == int(live_long.sum())
+    assert summary["liquidated_notional"] == pytest.approx(notional[tracked & ~(live_long | live_short)].sum())
+    rows = heatmap.heatmap("BTC", range_pct=1.0)["buckets"]
+    assert sum(row["long_notional"] + row["short_notional"] for row in rows) == pytest.approx(
+        notional[live_long | live_short].sum())
+
+
+@pytest.mark.asyncio
+async def test_calculator_loads_watched_positions(monkeypatch):
+    """Clearinghouse states become all_positions, the heatmap and the nearest position risks."""
+    async def states(addresses, info_url):
+        return {address: STATE for address in addresses}
+
+    monkeypatch.setattr(hyperliquid, "fetch_clearinghouse_states", states)
+    service = HyperliquidService(Settings(watched_addresses=["0xabc", "0xdef"]))
+    service.asset_contexts.update_contexts(["BTC", "ETH"], [{"markPx": "95.0"}, {"markPx": "10.5"}])
+    await service.load_positions()
+
+    assert len(service.all_positions["0xdef"]) == 2
+    assert {row["symbol"] for row in service.liquidation_heatmap.symbols()} == {"BTC", "ETH"}
+    assert service.liquidation_heatmap.heatmap("BTC")["long_notional_at_risk"] == 200.0
+    nearest = service.liquidation_heatmap.closest(1)[0]
+    assert nearest["symbol"] == "BTC" and nearest["side"] == "long"
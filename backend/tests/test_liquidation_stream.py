@@ -0,0 +1,82 @@
+import time
+import pytest
+from data_sources import liquidation_stream
+from data_sources.hyperliquid import HyperliquidService, Settings
+from data_sources.liquidation_stream import LiquidationEvent, LiquidationStream, from_binance_force_order, from_hyperliquid
+from data_sources.liquidations import LiquidationTracker
+
+T0 = float(int(time.time()))  # Recent, so the 48h window keeps it
+
+
+def force_order(side, ts_ms, price="94000", qty="2"):
+    return {"e": "forceOrder", "E": ts_ms + 5, "o": {
+        "s": "BTCUSDT", "S": side, "p": "93000", "ap": price, "q": qty, "z": qty, "T": ts_ms,
+    }}
+
+
+def test_adapters_normalize_venue_fields():
+    """Both venues map to the liquidated position's side, base coin, USD value and epoch seconds."""
+    binance = from_binance_force_order(force_order("SELL", int(T0 * 1000)))
+    assert binance == LiquidationEvent(T0, "binance", "BTC", "long", 94000.0, 2.0, 188000.0)
+    assert from_binance_force_order({"e": "aggTrade"}) is None
+
+    hyperliquid = from_hyperliquid({"coin": "ETH", "side": "B", "px": "3500", "sz": "10", "time": int(T0 * 1000)})
+    assert hyperliquid == LiquidationEvent(T0, "hyperliquid", "ETH", "short", 3500.0, 10.0, 35000.0)
+    sample = from_hyperliquid({"coin": "SOL", "side": "long", "quantity": 120, "quoteSize": 8000, "price": 66.5}, now=T0)
+    assert (sample.side, sample.value_usd, sample.timestamp) == ("long", 8000.0, T0)
+
+
+def test_stream_merges_venues_newest_first():
+    """Reads interleave venues by time, late events are placed in order, records are reused until a change."""
+    stream = LiquidationStream(max_events_per_venue=3)
+    for offset in (0, 10, 20):
+        stream.publish(LiquidationEvent(T0 + offset, "binance", "BTC", "long", 1.0, 1.0, 1.0))
+    stream.publish(LiquidationEvent(T0 + 15, "hyperliquid", "ETH", "short", 1.0, 1.0, 1.0))
+    stream.publish(LiquidationEvent(T0 + 5, "hyperliquid", "ETH", "short", 1.0, 1.0, 1.0))  # Late
+
+    assert [e.timestamp - T0 for e in stream.events()] == [20, 15, 10, 5, 0]
+    assert [e.venue for e in stream.recent(2)] == ["binance", "hyperliquid"]
+    assert [e.timestamp - T0 for e in stream.events(since=T0 + 5)] == [20, 15, 10]
+
+    records = stream.records()
+    assert records[0]["exchange"] == "binance" and records[0]["symbol"] == "BTC"
+    assert stream.records() is records
+    assert stream.prune(T0 + 10) == 2
+    assert stream.records() is not records and len(stream.records()) == 3
+
+    # Full buffers drop their oldest event
+    stream.publish(LiquidationEvent(T0 + 30, "binance", "BTC", "long", 1.0, 1.0, 1.0))
+    stream.publish(LiquidationEvent(T0 + 40, "binance", "BTC", "long", 1.0, 1.0, 1.0))
+    assert [e.timestamp - T0 for e in stream.buffer("binance")] == [20, 30, 40]
+
+
+@pytest.mark.asyncio
+async def test_both_trackers_publish_to_one_stream(monkeypatch):
+    """Binance and Hyperliquid liquidations arrive normalized in the shared stream."""
+    monkeypatch.setattr(liquidation_stream, "_stream", None)
+    tracker = LiquidationTracker()
+    service = HyperliquidService(Settings())
+
+    await tracker.process_liquidation(force_order("BUY", int(T0 * 1000)))
+    await tracker.process_liquidation(force_order("SELL", int(T0 * 1000), qty="0.001"))  # Below threshold
+    await service._process_liquidations([{"coin": "BTC", "side": "A", "px": "95000", "sz": "1", "time": int((T0 + 1) * 1000)}])
+
+    stream = liquidation_stream.get_liquidation_stream()
+    assert tracker.stream is stream is service.liquidation_stream
+    assert [(e.venue, e.side) for e in stream.events()] == [("hyperliquid", "long"), ("binance", "short")]
+    assert tracker.get_recent_liquidations()["BTC"]["shorts"][0]["value_usd"] == 188000.0
+
+
+@pytest.mark.asyncio
+async def test_demo_data_never_reaches_dashboard_records(monkeypatch):
+    """The Hyperliquid service's sample data adds no liquidations; fallback events stay flagged."""
+    monkeypatch.setattr(liquidation_stream, "_stream", None)
+    service = HyperliquidService(Settings())
+    await service._create_sample_data()
+
+    stream = liquidation_stream.get_liquidation_stream()
+    assert stream.records() == [] and not service.liquidations
+    assert (await service.broadcast_data())["data"]["recent_liquidations"] == []
+
+    stream.publish(LiquidationEvent(T0, "binance", "BTC", "long", 1.0, 1.0, 1.0, simulated=True))
+    assert stream.records()[0]["simulated"] is True
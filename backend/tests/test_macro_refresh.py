@@ -0,0 +1,135 @@
+import aiohttp
+import numpy as np
+import pytest
+from datetime import datetime
+from sqlalchemy import select, func
+from app.core.config import settings
+from app.models.macro_point import MacroPoint
+from data_sources import alpha_vantage, rate_limiter, response_cache
+from data_sources.alpha_vantage import MACRO_INDICATORS, parse_series
+from worker.macro import (
+    next_release, refresh_macro_points, load_latest_macro_points, upsert_macro_series, load_macro_history,
+)
+
+NOW = datetime(2025, 4, 15, 12, 0, 0)
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """Alpha Vantage stand-in behind a fresh cache file and an unthrottled limiter."""
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(str(tmp_path / "cache.db")))
+    monkeypatch.setitem(rate_limiter._limiters, "www.alphavantage.co",
+                        rate_limiter.TokenBucketLimiter("www.alphavantage.co", rate=1000.0, capacity=100))
+    calls = []
+
+    async def request(function_name, params=None):
+        calls.append(function_name)
+        if params.get("interval") == "monthly":
+            return {"data": [{"date": "2025-03-01", "value": "2.5"}, {"date": "2025-02-01", "value": "2.0"}]}
+        return {"data": [{"date": "2025-04-14", "value": "2.5"}, {"date": "2025-04-11", "value": "."}]}
+
+    monkeypatch.setattr(alpha_vantage, "_get_alpha_vantage", request)
+    return calls
+
+
+def test_next_release_follows_cadence():
+    """Monthly series wait for the following month to end; daily ones skip weekends."""
+    assert next_release("monthly", datetime(2025, 3, 1)) == datetime(2025, 5, 1)
+    assert next_release("monthly", datetime(2024, 12, 1)) == datetime(2025, 2, 1)
+    assert next_release("daily", datetime(2025, 4, 11)) == datetime(2025, 4, 15)  # Friday -> Tuesday
+    assert next_release("daily", datetime(2025, 4, 14)) == datetime(2025, 4, 16)
+
+
+@pytest.mark.asyncio
+async def test_refresh_respects_quota_and_cadence(session, upstream, monkeypatch):
+    """Fetching stops at the daily quota, resumes later, and skips indicators not yet due."""
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_DAILY_QUOTA", 3)
+    updated = await refresh_macro_points(session, NOW)
+    await session.commit()
+    assert len(updated) == len(upstream) == 3
+
+    # Quota spent: nothing else goes upstream today
+    assert await refresh_macro_points(session, NOW) == []
+    assert len(upstream) == 3
+
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_DAILY_QUOTA", 25)
+    await refresh_macro_points(session, NOW)
+    await session.commit()
+    assert len(upstream) == len(MACRO_INDICATORS)
+
+    # Every indicator is current, so no new observation is plausible yet
+    assert await refresh_macro_points(session, NOW) == []
+    assert len(upstream) == len(MACRO_INDICATORS)
+
+    # One observation per daily indicator (the placeholder is dropped), two per monthly one
+    count = await session.scalar(select(func.count()).select_from(MacroPoint))
+    assert count == len(MACRO_INDICATORS) + 2
+    latest = await load_latest_macro_points(session)
+    assert latest["cpi"].timestamp == datetime(2025, 3, 1)
+    assert latest["cpi"].percent_change == pytest.approx(25.0)
+    assert latest["wti_oil"].value == 2.5
+
+
+@pytest.mark.asyncio
+async def test_each_retry_takes_quota_and_a_limiter_token(upstream, monkeypatch):
+    """A call retried after 429s spends one quota unit and one limiter token per attempt."""
+    attempts = []
+
+    async def rate_limited(function_name, params=None):
+        attempts.append(function_name)
+        if len(attempts) < 3:
+            raise aiohttp.ClientResponseError(None, (), status=429, headers={"Retry-After": "0"})
+        return {"data": [{"date": "2025-04-14", "value": "2.5"}]}
+
+    monkeypatch.setattr(alpha_vantage, "_get_alpha_vantage", rate_limited)
+    dates, values = await alpha_vantage.fetch_indicator_series("wti_oil")
+    assert values.tolist() == [2.5] and len(attempts) == 3
+    assert response_cache.get_response_cache().quota_used("alpha_vantage") == 3
+    assert sum(rate_limiter.get_limiter(alpha_vantage.BASE_URL).metrics()["acquired"].values()) == 3
+
+
+def test_parse_series_orders_and_cleans():
+    """Upstream newest-first entries become ascending arrays without placeholders or duplicates."""
+    dates, values = parse_series([
+        {"date": "2025-04-14", "value": "3"},
+        {"date": "2025-04-11", "value": "."},
+        {"date": "2025-04-10", "value": "1"},
+        {"date": "2025-04-14", "value": "4"},
+    ])
+    assert dates.tolist() == [datetime(2025, 4, 10).date(), datetime(2025, 4, 14).date()]
+    assert values.tolist() == [1.0, 4.0]
+
+
+@pytest.mark.asyncio
+async def test_series_upsert_dedups_and_applies_revisions(session):
+    """Re-sending a series adds nothing; a revised value overwrites the stored one."""
+    dates = np.arange("2025-01-01", "2025-01-11", dtype="datetime64[D]")
+    values = np.arange(10, dtype=float) + 1
+    await upsert_macro_series("wti_oil", dates, values, session)
+    revised = values.copy()
+    revised[-1] = 100.0
+    await upsert_macro_series("wti_oil", dates, revised, session, since=datetime(2025, 1, 8))
+    await session.commit()
+
+    count = await session.scalar(select(func.count()).select_from(MacroPoint))
+    assert count == 10
+    latest = await load_latest_macro_points(session)
+    assert latest["wti_oil"].value == 100.0
+    assert latest["wti_oil"].previous_value == 9.0
+
+
+@pytest.mark.asyncio
+async def test_history_is_ranged_and_downsampled(session):
+    """A ranged query is thinned to the requested point budget, keeping the range's last value."""
+    dates = np.arange("2024-01-01", "2025-01-01", dtype="datetime64[D]")
+    await upsert_macro_series("corn", dates, np.arange(len(dates), dtype=float), session)
+    await session.commit()
+
+    points, total = await load_macro_history(
+        session, "corn", start=datetime(2024, 7, 1), end=datetime(2024, 12, 31), max_points=20
+    )
+    assert total == 184
+    assert 2 <= len(points) <= 20
+    assert points[-1]["timestamp"] == datetime(2024, 12, 31)
+    assert [p["timestamp"] for p in points] == sorted(p["timestamp"] for p in points)
+    assert points[0]["timestamp"] >= datetime(2024, 7, 1)
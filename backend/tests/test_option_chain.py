@@ -0,0 +1,78 @@
+import asyncio
+import random
+import pytest
+from data_sources import response_cache
+from services import deribit_options
+from services.deribit_options import OptionChain, filter_options
+
+EXPIRIES = ["2025-05-30", "2025-06-27", "2025-09-26"]
+
+
+def make_options(n=300, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "instrument_name": f"BTC-{i}",
+            "strike": rng.choice([None, *range(20000, 150000, 5000)]),
+            "option_type": rng.choice(["call", "put"]),
+            "expiration_date": rng.choice(EXPIRIES),
+        }
+        for i in range(n)
+    ]
+
+
+def scan(options, option_type=None, min_strike=None, max_strike=None, expiry_date=None):
+    """The original list-comprehension filter, as the reference."""
+    result = options
+    if option_type:
+        result = [opt for opt in result if opt.get("option_type", "").lower() == option_type.lower()]
+    if min_strike is not None:
+        result = [opt for opt in result if (opt.get("strike") or 0) >= min_strike]
+    if max_strike is not None:
+        result = [opt for opt in result if (opt.get("strike") or 0) <= max_strike]
+    if expiry_date:
+        result = [opt for opt in result if opt.get("expiration_date") == expiry_date]
+    return result
+
+
+def test_indexed_filter_matches_scan():
+    """Every combination of filters returns the same options, in the same order, as a full scan."""
+    options = make_options()
+    chain = OptionChain(options)
+    cases = [
+        {},
+        {"option_type": "CALL"},
+        {"min_strike": 60000},
+        {"max_strike": 60000},
+        {"min_strike": 40000, "max_strike": 90000, "expiry_date": "2025-06-27"},
+        {"option_type": "put", "expiry_date": "2025-09-26", "min_strike": 0},
+        {"expiry_date": "2030-01-01"},
+        {"min_strike": 90000, "max_strike": 40000},
+    ]
+    for case in cases:
+        assert chain.filter(**case) == scan(options, **case), case
+        assert filter_options(options, **case) == scan(options, **case), case
+    assert chain.call_count + chain.put_count == chain.total_count == len(options)
+
+
+@pytest.mark.asyncio
+async def test_chain_is_fetched_once_and_reused(tmp_path, monkeypatch):
+    """Concurrent requests within the TTL share one upstream fetch and one built chain."""
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(deribit_options, "_chains", {})
+    monkeypatch.setattr(deribit_options, "_chain_locks", {})
+    calls = []
+
+    async def request(endpoint, params):
+        calls.append(params)
+        await asyncio.sleep(0.01)
+        return {"result": [
+            {"instrument_name": "BTC-27JUN25-90000-C", "strike": 90000, "option_type": "call",
+             "expiration_timestamp": 1751011200000},
+        ]}
+
+    monkeypatch.setattr(deribit_options, "_request", request)
+    chains = await asyncio.gather(*(deribit_options.get_options_chain("BTC") for _ in range(5)))
+    assert len(calls) == 1
+    assert all(chain is chains[0] for chain in chains)
+    assert chains[0].expiries == ["2025-06-27"]
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from datetime import datetime, timezone
+from services.options_analytics import (
+    OptionsAnalytics, black76_price, implied_volatility, max_pain, parse_instrument,
+)
+
+NOW = datetime(2025, 5, 1, 8, 0, tzinfo=timezone.utc).timestamp()
+FORWARD = 95000.0
+STRIKES = [80000, 90000, 95000, 100000, 110000]
+
+
+def make_summaries(vol=0.6, open_interest=10.0):
+    """Book summaries for puts and calls on one expiry, marked at a flat volatility."""
+    expiry_years = (datetime(2025, 6, 27, 8, tzinfo=timezone.utc).timestamp() - NOW) / (365 * 86400)
+    rows = []
+    for strike in STRIKES:
+        for kind, is_call in (("C", True), ("P", False)):
+            price = black76_price(FORWARD, strike, expiry_years, vol, is_call)
+            rows.append({
+                "instrument_name": f"BTC-27JUN25-{strike}-{kind}",
+                "mark_price": float(price) / FORWARD,
+                "underlying_price": FORWARD,
+                "open_interest": open_interest * (2 if kind == "P" else 1),
+                "volume": 1.0,
+            })
+    return rows
+
+
+def test_implied_volatility_recovers_input_vol():
+    """Bisection inverts Black-76 across moneyness; out-of-bounds prices give NaN."""
+    strikes = np.array([60000.0, 95000.0, 140000.0, 95000.0])
+    is_call = np.array([True, False, True, True])
+    vols = np.array([0.9, 0.55, 0.7, 0.55])
+    prices = black76_price(FORWARD, strikes, 0.25, vols, is_call)
+    prices[-1] = FORWARD * 2  # above the call's upper bound
+    iv = implied_volatility(prices, np.full(4, FORWARD), strikes, np.full(4, 0.25), is_call)
+    assert iv[:3] == pytest.approx(vols[:3], abs=1e-4)
+    assert np.isnan(iv[3])
+
+
+def test_max_pain_and_instrument_parsing():
+    """Max pain minimizes holder payout; names parse to 08:00 UTC expiries."""
+    strikes = np.array([90.0, 100.0, 110.0, 90.0, 100.0, 110.0])
+    is_call = np.array([True, True, True, False, False, False])
+    oi = np.array([1.0, 1.0, 10.0, 10.0, 1.0, 1.0])
+    assert max_pain(strikes, is_call, oi) == 100.0
+    expiry, strike, call = parse_instrument("ETH-5JUN25-2500d5-P")
+    assert (strike, call) == (2500.5, False)
+    assert datetime.fromtimestamp(expiry, tz=timezone.utc) == datetime(2025, 6, 5, 8, tzinfo=timezone.utc)
+    assert parse_instrument("BTC-PERPETUAL") is None
+
+
+def test_updates_recompute_only_changed_instruments():
+    """A partial update re-solves only the instruments that moved; aggregates follow."""
+    analytics = OptionsAnalytics("BTC")
+    assert analytics.update(make_summaries(), now=NOW) == len(STRIKES) * 2
+    instruments = analytics.instruments()
+    assert all(row["iv"] == pytest.approx(0.6, abs=1e-4) for row in instruments)
+    atm_call = next(row for row in instruments if row["instrument_name"] == "BTC-27JUN25-95000-C")
+    assert atm_call["delta"] == pytest.approx(0.5, abs=0.05)
+
+    summary, = analytics.expiry_summary()
+    assert summary["expiry"] == "2025-06-27"
+    assert summary["put_call_oi_ratio"] == pytest.approx(2.0)
+
+    # Nothing changed: nothing recomputed
+    assert analytics.update(make_summaries(), now=NOW + 10) == 0
+
+    changed = [row for row in make_summaries(vol=0.8, open_interest=30.0) if row["instrument_name"].endswith("-C")]
+    assert analytics.update(changed, now=NOW + 20, full=False) == len(STRIKES)
+    ivs = {row["instrument_name"]: row["iv"] for row in analytics.instruments()}
+    assert ivs["BTC-27JUN25-100000-C"] == pytest.approx(0.8, abs=1e-4)
+    assert ivs["BTC-27JUN25-100000-P"] == pytest.approx(0.6, abs=1e-4)
+    assert analytics.expiry_summary()[0]["put_call_oi_ratio"] == pytest.approx(20.0 / 30.0)
+
+    # A full listing without the puts drops them
+    analytics.update(changed, now=NOW + 30)
+    assert len(analytics) == len(STRIKES)
+    assert analytics.expiry_summary()[0]["put_open_interest"] == 0.0
+    surface = analytics.surface()
+    assert surface["expiries"] == ["2025-06-27"]
+    assert len(surface["iv"][0]) == len(STRIKES)
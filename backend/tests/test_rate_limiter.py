@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from data_sources.rate_limiter import TokenBucketLimiter, Priority
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_spaced_and_never_shared():
+    """Concurrent callers each get their own token at the refill rate."""
+    limiter = TokenBucketLimiter("test", rate=50.0, capacity=1)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+    # One token up front, four more at 20 ms each
+    assert loop.time() - started >= 0.075
+    metrics = limiter.metrics()
+    assert metrics["acquired"]["background"] == 5
+    assert metrics["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_critical_requests_overtake_queued_background_work():
+    """Once queued, critical requests are served before earlier background ones."""
+    limiter = TokenBucketLimiter("test", rate=20.0, capacity=1)
+    await limiter.acquire()  # Drain the bucket
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    tasks = [asyncio.create_task(request(f"bg{i}", Priority.BACKGROUND)) for i in range(3)]
+    await asyncio.sleep(0.01)
+    assert limiter.metrics()["queue_depth"] == 3
+    tasks.append(asyncio.create_task(request("critical", Priority.CRITICAL)))
+    await asyncio.gather(*tasks)
+
+    assert order[0] == "critical"
+    assert order[1:] == ["bg0", "bg1", "bg2"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    """A cancelled request gives up its place instead of blocking the queue."""
+    limiter = TokenBucketLimiter("test", rate=0.5, capacity=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.metrics()["queue_depth"] == 0
@@ -0,0 +1,67 @@
+import math
+import numpy as np
+import pytest
+from data_sources.realized_volatility import RealizedVolatility, MINUTES_PER_YEAR
+
+START = 1_714_000_000 - 1_714_000_000 % 3600  # Hour aligned epoch seconds
+
+
+def feed(estimator, closes, start=START):
+    """One price per minute, sampled a few times within each minute."""
+    for minute, close in enumerate(closes):
+        for second in (5, 30, 59):
+            estimator.update(close, start + minute * 60 + second)
+
+
+def expected(closes, minutes):
+    """Brute-force zero-mean realized volatility over the last completed minutes."""
+    returns = np.diff(np.log(closes[:-1]))[-minutes:]
+    return math.sqrt(np.sum(returns ** 2) / len(returns) * MINUTES_PER_YEAR)
+
+
+def test_windows_match_brute_force():
+    """Each window equals realized volatility recomputed from the minute closes."""
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(11).normal(0, 1e-3, 3 * 24 * 60)))
+    estimator = RealizedVolatility()
+    feed(estimator, closes)
+
+    assert estimator.volatility("1h") == pytest.approx(expected(closes, 60))
+    assert estimator.volatility("24h") == pytest.approx(expected(closes, 24 * 60))
+    assert estimator.volatility("24h") == pytest.approx(1e-3 * math.sqrt(MINUTES_PER_YEAR), rel=0.1)
+
+
+def test_long_windows_need_coverage():
+    """A 7d estimate needs most of the week; until then it is unset, not a 3-day figure."""
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(11).normal(0, 1e-3, 6 * 24 * 60)))
+    estimator = RealizedVolatility()
+    feed(estimator, closes[:3 * 24 * 60])
+    assert estimator.volatility("24h") is not None
+    assert estimator.volatility("7d") is None and estimator.volatility("30d") is None
+
+    feed(estimator, closes[3 * 24 * 60:], start=START + 3 * 24 * 3600)
+    assert estimator.volatility("7d") == pytest.approx(expected(closes, len(closes)))
+    assert estimator.volatility("30d") is None
+
+
+def test_warm_up_and_gaps():
+    """Estimates stay unset until enough returns arrive; old data ages out after a gap."""
+    estimator = RealizedVolatility()
+    feed(estimator, [100.0, 101.0, 100.0] * 5)
+    assert estimator.volatility("1h") is None
+
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(5).normal(0, 1e-3, 120)))
+    feed(estimator, closes, start=START + 2 * 3600)
+    assert estimator.volatility("1h") == pytest.approx(expected(closes, 60))
+
+
+def test_move_across_a_gap_is_not_a_return():
+    """The jump between the last close before a gap and the first after it is dropped."""
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(7).normal(0, 1e-3, 120)))
+    after = closes[60:] * 1.2  # Price moved 20% while the feed was down
+    estimator = RealizedVolatility()
+    feed(estimator, closes[:60])
+    feed(estimator, after, start=START + 70 * 60)  # Ten minutes without prices
+
+    # The 1h window holds the 58 returns after the gap, none of them the jump
+    assert estimator.volatility("1h") == pytest.approx(expected(after, 58))
+    assert estimator.volatility("1h") < 2e-3 * math.sqrt(MINUTES_PER_YEAR)
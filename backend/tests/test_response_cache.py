@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from data_sources.response_cache import ResponseCache, cache_key
+
+URL = "https://example.test/query"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Upstream:
+    """Counts calls and returns the next value, or None to simulate a failure."""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.values.pop(0)
+
+
+def test_cache_key_ignores_param_order_and_credentials():
+    """Keys are canonical and never contain API keys."""
+    a = cache_key(URL, {"function": "WTI", "interval": "daily", "apikey": "secret"})
+    b = cache_key(URL, {"interval": "daily", "function": "WTI"})
+    assert a == b
+    assert "secret" not in a
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_survive_a_restart(tmp_path):
+    """A new cache on the same file serves the stored response without calling upstream."""
+    path = str(tmp_path / "cache.db")
+    clock = Clock()
+    upstream = Upstream({"data": [1]})
+    cache = ResponseCache(path, clock=clock)
+    assert await cache.fetch("alpha_vantage:daily", URL, {"function": "WTI"}, upstream) == {"data": [1]}
+    cache.close()
+
+    restarted = ResponseCache(path, clock=clock)
+    clock.now += 60
+    assert await restarted.fetch("alpha_vantage:daily", URL, {"function": "WTI"}, upstream) == {"data": [1]}
+    assert upstream.calls == 1
+    assert restarted.metrics()["fresh"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_revalidating(tmp_path):
+    """Past the TTL the old body is returned at once and one background refresh runs."""
+    clock = Clock()
+    cache = ResponseCache(str(tmp_path / "cache.db"), clock=clock)
+    upstream = Upstream({"v": 1}, {"v": 2})
+    await cache.fetch("coingecko:global", URL, None, upstream)
+
+    clock.now += 600  # TTL 300s, stale window 3600s
+    results = await asyncio.gather(*(cache.fetch("coingecko:global", URL, None, upstream) for _ in range(3)))
+    assert results == [{"v": 1}] * 3
+    await asyncio.sleep(0.01)
+    assert upstream.calls == 2
+    assert await cache.fetch("coingecko:global", URL, None, upstream) == {"v": 2}
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_the_fallback_when_upstream_fails(tmp_path):
+    """Beyond the stale window callers wait for upstream, but a failure still returns the old body."""
+    clock = Clock()
+    cache = ResponseCache(str(tmp_path / "cache.db"), clock=clock)
+    upstream = Upstream({"v": 1}, None)
+    await cache.fetch("coingecko:global", URL, None, upstream)
+
+    clock.now += 5000
+    assert await cache.fetch("coingecko:global", URL, None, upstream) == {"v": 1}
+    assert upstream.calls == 2
+    assert cache.metrics()["fallback"] == 1
@@ -0,0 +1,118 @@
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.market_snapshot import MarketSnapshot
+from app.models.liquidation import Liquidation
+from app.models.ohlcv_rollup import OhlcvRollup
+from worker.retention import purge_table, purge_rollups, run_retention
+from worker.partitions import partition_name, partition_day, default_partition_name, is_partitioned
+
+
+async def create_test_liquidations(session, hours_range):
+    """Create one liquidation per hour going back ``hours_range`` hours."""
+    now = datetime.utcnow()
+    session.add_all([
+        Liquidation(
+            symbol="BTC",
+            side="sell",
+            price=30000.0,
+            quantity=1.0,
+            value_usd=30000.0,
+            timestamp=now - timedelta(hours=hours_ago),
+        )
+        for hours_ago in range(hours_range)
+    ])
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_purge_table_in_batches(engine, session):
+    """Expired rows are removed across several bounded batches."""
+    await create_test_liquidations(session, 48)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    cutoff = datetime.utcnow() - timedelta(hours=24) + timedelta(minutes=1)
+    report = await purge_table(session_factory, Liquidation, cutoff, batch_size=5)
+
+    assert report["table"] == "liquidations"
+    assert report["deleted"] == 24
+    # 24 rows in batches of 5 -> 4 full batches and a final partial one
+    assert report["batches"] == 5
+    assert report["elapsed_ms"] >= 0
+
+    result = await session.execute(select(func.min(Liquidation.timestamp)))
+    assert result.scalar() >= cutoff
+
+
+@pytest.mark.asyncio
+async def test_run_retention_reports_every_table(engine, session):
+    """A retention run reports each table even when nothing is expired."""
+    session.add(MarketSnapshot(
+        symbol="BTC",
+        timestamp=datetime.utcnow(),
+        price=30000.0,
+    ))
+    await session.commit()
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    reports = await run_retention(session_factory, batch_size=100)
+
+    assert [r["table"] for r in reports] == [
+        "market_snapshots", "liquidations", "trades_large",
+        "ohlcv_rollups:1m", "ohlcv_rollups:5m", "flow_rollups:1m", "flow_rollups:5m",
+    ]
+    assert all(r["deleted"] == 0 for r in reports)
+
+    result = await session.execute(select(func.count()).select_from(MarketSnapshot))
+    assert result.scalar() == 1
+
+
+@pytest.mark.asyncio
+async def test_purge_rollups_keeps_other_intervals(engine, session):
+    """Only expired buckets of the purged interval are removed, batch by batch."""
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    session.add_all([
+        OhlcvRollup(
+            symbol=symbol, interval=interval, bucket=now - timedelta(hours=hours_ago),
+            open=1.0, high=1.0, low=1.0, close=1.0, sample_count=1, first_ts=now, last_ts=now,
+        )
+        for symbol in ("BTC", "ETH")
+        for interval in ("1m", "1h")
+        for hours_ago in range(10)
+    ])
+    await session.commit()
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    cutoff = now - timedelta(hours=4, minutes=30)
+    report = await purge_rollups(session_factory, OhlcvRollup, "1m", cutoff, batch_size=4)
+
+    assert report["table"] == "ohlcv_rollups:1m"
+    assert report["deleted"] == 10  # Hours 5-9 for both symbols
+    # Two symbols per bucket -> batches end at the 2nd and 4th expired buckets, then the rest
+    assert report["batches"] == 3
+
+    result = await session.execute(
+        select(OhlcvRollup.interval, func.count()).group_by(OhlcvRollup.interval).order_by(OhlcvRollup.interval)
+    )
+    assert result.all() == [("1h", 20), ("1m", 10)]
+
+
+def test_partition_name_round_trip():
+    """Daily partition names encode the day they hold and can be parsed back."""
+    day = date(2025, 4, 22)
+    name = partition_name("liquidations", day)
+
+    assert name == "liquidations_p20250422"
+    assert partition_day("liquidations", name) == day
+    assert partition_day("trades_large", name) is None
+    assert default_partition_name("liquidations") == "liquidations_pdefault"
+    assert partition_day("liquidations", default_partition_name("liquidations")) is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_uses_plain_table_fallback(session):
+    """Off Postgres the hot tables are never treated as partitioned."""
+    conn = await session.connection()
+    assert await is_partitioned(conn, "market_snapshots") is False
@@ -0,0 +1,128 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.models.market_snapshot import MarketSnapshot
+from app.models.liquidation import Liquidation
+from app.models.ohlcv_rollup import OhlcvRollup
+from app.models.flow_rollup import FlowRollup
+from app.core.rollups import choose_interval
+from worker.rollups import update_ohlcv_rollups, update_flow_rollups
+
+START = datetime(2025, 4, 28, 10, 0, 0)
+
+
+def make_snapshots(prices, offset_seconds=0):
+    """One BTC snapshot every 20 seconds starting at START + offset."""
+    return [
+        MarketSnapshot(
+            symbol="BTC",
+            timestamp=START + timedelta(seconds=offset_seconds + i * 20),
+            price=price,
+            volume=1.0,
+        )
+        for i, price in enumerate(prices)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ohlcv_rollups_merge_deltas(session):
+    """Successive ingest deltas are merged into the same buckets at every level."""
+    await update_ohlcv_rollups(make_snapshots([100.0, 105.0, 95.0]), session)
+    await session.commit()
+    # Second cycle: one sample in the same minute, one in the next minute
+    await update_ohlcv_rollups(make_snapshots([110.0, 90.0], offset_seconds=50), session)
+    await session.commit()
+
+    result = await session.execute(
+        select(OhlcvRollup).where(OhlcvRollup.interval == "1m").order_by(OhlcvRollup.bucket)
+    )
+    minutes = result.scalars().all()
+    assert len(minutes) == 2
+    first = minutes[0]
+    assert (first.open, first.high, first.low, first.close) == (100.0, 110.0, 95.0, 110.0)
+    assert first.sample_count == 4
+    assert minutes[1].open == minutes[1].close == 90.0
+
+    result = await session.execute(select(OhlcvRollup).where(OhlcvRollup.interval == "1h"))
+    hour = result.scalar_one()
+    assert hour.bucket == START
+    assert (hour.open, hour.high, hour.low, hour.close) == (100.0, 110.0, 90.0, 90.0)
+    assert hour.sample_count == 5
+    assert hour.volume == 5.0
+
+
+@pytest.mark.asyncio
+async def test_flow_rollups_split_by_side(session):
+    """Liquidation volume is bucketed per symbol and side."""
+    liquidations = [
+        Liquidation(symbol="ETH", side="BUY", price=3000.0, quantity=1.0, value_usd=3000.0, timestamp=START),
+        Liquidation(symbol="ETH", side="buy", price=3000.0, quantity=2.0, value_usd=6000.0,
+                    timestamp=START + timedelta(minutes=3)),
+        Liquidation(symbol="ETH", side="sell", price=3000.0, quantity=1.0, value_usd=3000.0, timestamp=START),
+    ]
+    await update_flow_rollups("liquidation", liquidations, session)
+    await session.commit()
+
+    result = await session.execute(
+        select(FlowRollup).where(FlowRollup.interval == "5m").order_by(FlowRollup.side)
+    )
+    buys, sells = result.scalars().all()
+    assert (buys.side, buys.count, buys.value_usd) == ("buy", 2, 9000.0)
+    assert (sells.side, sells.count, sells.value_usd) == ("sell", 1, 3000.0)
+
+
+def test_choose_interval():
+    """The finest level that keeps the point count bounded is chosen."""
+    assert choose_interval(START, START + timedelta(hours=6)) == "1m"
+    assert choose_interval(START, START + timedelta(days=3)) == "5m"
+    assert choose_interval(START, START + timedelta(days=14)) == "1h"
+    assert choose_interval(START, START + timedelta(days=365)) == "1d"
+
+
+@pytest.mark.asyncio
+async def test_history_accepts_utc_offsets(session, server_client):
+    """``Z``-suffixed and offset query times are read as UTC, not rejected."""
+    await update_ohlcv_rollups(make_snapshots([100.0, 105.0]), session)
+    await session.commit()
+    async with server_client as client:
+        response = await client.get("/api/history/ohlcv", params={
+            "symbol": "BTC", "start": "2025-04-28T09:30:00Z", "end": "2025-04-28T12:30:00+02:00",
+        })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["interval"] == "1m"
+    assert [candle["timestamp"] for candle in body["candles"]] == [START.isoformat()]
+
+
+@pytest.mark.asyncio
+async def test_history_endpoints_are_served_by_the_app(session, server_client):
+    """The deployed app mounts the rollup history endpoints."""
+    await update_flow_rollups("liquidation", [
+        Liquidation(symbol="ETH", side="buy", price=3000.0, quantity=1.0, value_usd=3000.0, timestamp=START),
+    ], session)
+    await session.commit()
+    params = {"start": "2025-04-28T09:00:00", "end": "2025-04-28T11:00:00"}
+    async with server_client as client:
+        liquidations = await client.get("/api/history/liquidations", params=params)
+        trades = await client.get("/api/history/trades", params=params)
+    assert liquidations.status_code == trades.status_code == 200
+    assert [row["value_usd"] for row in liquidations.json()["buckets"]] == [3000.0]
+    assert trades.json()["buckets"] == []
+
+
+@pytest.mark.asyncio
+async def test_explicit_interval_is_capped(session, server_client):
+    """An explicit interval may not return more than MAX_HISTORY_POINTS buckets."""
+    await update_ohlcv_rollups(make_snapshots([100.0, 105.0]), session)
+    await session.commit()
+    async with server_client as client:
+        too_long = await client.get("/api/history/ohlcv", params={
+            "symbol": "BTC", "interval": "1m", "start": "2025-04-27T10:00:00", "end": "2025-04-28T11:00:00",
+        })
+        coarser = await client.get("/api/history/ohlcv", params={
+            "symbol": "BTC", "interval": "1h", "start": "2025-04-27T10:00:00", "end": "2025-04-28T11:00:00",
+        })
+        defaulted = await client.get("/api/history/ohlcv", params={"symbol": "BTC", "interval": "1m"})
+    assert too_long.status_code == 400
+    assert coarser.status_code == 200 and len(coarser.json()["candles"]) == 1
+    assert defaulted.status_code == 200
@@ -11,10 +11,7 @@ async def create_test_snapshots(session, days_range):
     # Create a snapshot for each day in the range
     for days_ago in range(days_range):
         timestamp = datetime.utcnow() - timedelta(days=days_ago)
-        snapshot_id = f"BTC_{timestamp.isoformat()}"
-        
         snapshot = MarketSnapshot(
-            id=snapshot_id,
             symbol="BTC",
             timestamp=timestamp,
             price=30000.0 + days_ago * 100,  # Different price each day
@@ -0,0 +1,88 @@
+import httpx
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+from data_sources import stablecoins
+from data_sources.stablecoins import fetch_chain_net_flows, fetch_daily_net_flows
+from app.models.stablecoin_flow import Base as StablecoinBase, StablecoinFlow
+from worker.ingest import upsert_stablecoin_flows
+
+START = datetime(2025, 3, 1)
+
+
+def chart(days, base=100.0):
+    """A llama.fi chart with circulating supply growing by ``day index`` each day."""
+    return [
+        {
+            "date": str(int((START + timedelta(days=d) - datetime(1970, 1, 1)).total_seconds())),
+            "totalCirculating": {"peggedUSD": base + d * (d + 1) / 2},
+        }
+        for d in range(days)
+    ]
+
+
+class Llama:
+    """Serves charts per chain and answers 304 when the ETag matches."""
+
+    def __init__(self, charts):
+        self.charts = charts
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        chain = request.url.path.rsplit("/", 1)[-1]
+        etag = f'"{chain}-{len(self.charts[chain])}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, json=self.charts[chain], headers={"etag": etag})
+
+
+@pytest.fixture
+def llama(monkeypatch):
+    upstream = Llama({"all": chart(40), "Ethereum": chart(5, 50.0), "Tron": chart(5, 20.0)})
+    client = httpx.AsyncClient(base_url=stablecoins.LLAMA_STABLECOINS_URL, transport=httpx.MockTransport(upstream))
+    monkeypatch.setattr(stablecoins, "_client", client)
+    monkeypatch.setattr(stablecoins, "_charts", {})
+    return upstream
+
+
+@pytest.mark.asyncio
+async def test_net_flows_are_day_over_day_and_revalidated_per_new_day(llama):
+    """Net is the change in supply; the chart is only re-requested, conditionally, once a new day is due."""
+    latest_day = START + timedelta(days=39)
+    flows = await fetch_daily_net_flows(now=latest_day + timedelta(hours=5))
+    assert len(flows) == 30
+    assert flows[0]["date"] == date(2025, 3, 11) and flows[0]["net"] == 10
+    assert flows[-1]["date"] == date(2025, 4, 9) and flows[-1]["net"] == 39
+
+    # Same day: served from memory
+    assert await fetch_daily_net_flows(now=latest_day + timedelta(hours=6)) == flows
+    assert len(llama.requests) == 1
+
+    # Next day due but unchanged upstream: one conditional request, then back off
+    next_day = latest_day + timedelta(days=1, minutes=1)
+    assert await fetch_daily_net_flows(now=next_day) == flows
+    assert await fetch_daily_net_flows(now=next_day + timedelta(minutes=1)) == flows
+    assert len(llama.requests) == 2
+    assert llama.requests[1].headers["if-none-match"] == '"all-40"'
+
+    # New point published
+    llama.charts["all"] = chart(41)
+    flows = await fetch_daily_net_flows(now=next_day + stablecoins.RECHECK_INTERVAL)
+    assert flows[-1]["date"] == date(2025, 4, 10) and flows[-1]["net"] == 40
+    assert len(llama.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_chain_breakdown_and_idempotent_upsert(llama, engine, session):
+    """Chains are fetched together; re-upserting the same flows changes nothing."""
+    flows = await fetch_chain_net_flows(["Ethereum", "Tron", "Missing"], now=START)
+    assert set(flows) == {"Ethereum", "Tron"}
+    assert [f["net"] for f in flows["Tron"]] == [1, 2, 3, 4]
+
+    async with engine.begin() as conn:
+        await conn.run_sync(StablecoinBase.metadata.create_all)
+    await upsert_stablecoin_flows(flows["Ethereum"], session)
+    await upsert_stablecoin_flows(flows["Ethereum"], session)
+    rows = (await session.execute(select(StablecoinFlow).order_by(StablecoinFlow.date))).scalars().all()
+    assert [(r.net, r.circulating) for r in rows] == [(1, 51), (2, 53), (3, 56), (4, 60)]
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.rollups import bucket_start
+from data_sources import coingecko
+from worker.ingest import bulk_insert_market_snapshots, market_snapshot_rows
+from worker.rollups import update_ohlcv_rollups
+
+
+def test_window_volatilities_match_direct_std():
+    """Every window equals the annualized std of its own trailing log returns."""
+    prices = list(100 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.02, 40))))
+    vols = coingecko._window_volatilities(prices, 86400, (7, 30))
+    returns = np.diff(np.log(prices))
+    assert vols[7] == pytest.approx(np.std(returns[-7:], ddof=1) * np.sqrt(365))
+    assert vols[30] == pytest.approx(np.std(returns[-30:], ddof=1) * np.sqrt(365))
+
+
+@pytest.mark.asyncio
+async def test_history_fetched_once_and_local_rollups_preferred(engine, session, monkeypatch):
+    """Both windows share one cached CoinGecko fetch; covering local rollups skip it."""
+    calls = []
+
+    async def fake_fetch(endpoint, params=None):
+        calls.append(endpoint)
+        return {"prices": [[i, 100.0 + (i % 3)] for i in range(31)]}
+
+    monkeypatch.setattr(coingecko, "fetch_coingecko_data", fake_fetch)
+    monkeypatch.setattr(coingecko, "SessionLocal", sessionmaker(engine, class_=AsyncSession))
+    coingecko._history_cache.clear()
+
+    first = await coingecko.get_volatilities("bitcoin", (7, 30))
+    second = await coingecko.get_volatilities("bitcoin", (7, 30))
+    assert calls == ["coins/bitcoin/market_chart"]
+    assert first == second and first[30] > 0
+
+    # Eight days of hourly ETH closes, ingested as the worker does from the feed's lower-case keys
+    now = bucket_start(datetime.utcnow(), 3600)
+    for hour in range(8 * 24):
+        rows = market_snapshot_rows({"eth": {"price": 3000.0 + (hour % 5)}}, {}, now - timedelta(hours=hour))
+        await update_ohlcv_rollups(await bulk_insert_market_snapshots(rows, session), session)
+    await session.commit()
+
+    vols = await coingecko.get_volatilities("ethereum", (7,))
+    assert calls == ["coins/bitcoin/market_chart"]
+    assert vols[7] > 0
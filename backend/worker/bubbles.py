@@ -0,0 +1,254 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, func
+
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.core.rollups import INTERVAL_SECONDS, bucket_start
+from app.models.ohlcv_rollup import OhlcvRollup
+from app.models.latest_market_state import LatestMarketState
+from app.models.bubble_stat import BubbleStat
+
+logger = logging.getLogger("worker.bubbles")
+
+DETECTION_METHOD = "zscore"
+STAT_FIELDS = ["count", "mean", "variance", "pending_bucket", "pending_close", "ts_recomputed"]
+
+
+def price_matrix(
+    symbols: Sequence[str],
+    timestamps: Sequence[datetime],
+    prices: Sequence[float],
+    start: datetime,
+    seconds: int,
+    columns: int,
+) -> np.ndarray:
+    """
+    Scatter (symbol, timestamp, price) rows into a symbols x buckets matrix.
+
+    Buckets without data are NaN, so every later statistic is NaN-aware and
+    symbols with gaps or shorter histories line up with the rest.
+    """
+    names = sorted(set(symbols))
+    index = {name: i for i, name in enumerate(names)}
+    matrix = np.full((len(names), columns), np.nan)
+    if not names:
+        return matrix
+
+    rows = np.fromiter(map(index.__getitem__, symbols), dtype=np.int64, count=len(symbols))
+    offsets = (np.array(timestamps, dtype="datetime64[s]") - np.datetime64(start, "s")).astype(np.int64)
+    cols = np.clip(offsets // seconds, 0, columns - 1)
+    matrix[rows, cols] = np.asarray(prices, dtype=float)
+    return matrix
+
+
+def window_stats(windows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sample count, mean and variance of every row of a NaN-padded matrix in one pass.
+
+    The variance is the population variance (ddof=0), the same estimator
+    fold_close maintains, so a recompute and the incremental path agree.
+    """
+    counts = np.count_nonzero(~np.isnan(windows), axis=1)
+    means = np.nansum(windows, axis=1) / np.maximum(counts, 1)
+    squared = np.nansum((windows - means[:, None]) ** 2, axis=1)
+    variances = squared / np.maximum(counts, 1)
+    return counts, means, variances
+
+
+def score_symbols(
+    names: Sequence[str],
+    current: np.ndarray,
+    means: np.ndarray,
+    variances: np.ndarray,
+    counts: np.ndarray,
+    lookback_days: int,
+    min_samples: int,
+) -> List[Dict[str, Any]]:
+    """
+    Z-score each symbol's current price against its baseline, all at once.
+
+    Symbols with too few samples or a flat baseline are dropped; the rest are
+    ranked by absolute z-score.
+    """
+    std = np.sqrt(variances)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z_scores = (current - means) / std
+        deviation = (current - means) / means * 100
+
+    valid = (counts >= max(min_samples, 2)) & (std > 0) & np.isfinite(z_scores) & np.isfinite(deviation)
+    order = [i for i in np.argsort(-np.abs(np.where(valid, z_scores, 0.0)), kind="stable") if valid[i]]
+
+    results = []
+    for rank, i in enumerate(order, start=1):
+        results.append({
+            "symbol": names[i],
+            "z_score": float(z_scores[i]),
+            "current_price": float(current[i]),
+            "baseline_price": float(means[i]),
+            "percent_deviation": float(deviation[i]),
+            "rank": rank,
+            "direction": "up" if z_scores[i] > 0 else "down",
+            "lookback_days": lookback_days,
+            "detection_method": DETECTION_METHOD,
+        })
+    return results
+
+
+def ewma_alpha(lookback_days: int, seconds: int) -> float:
+    """Smoothing factor whose centre of mass matches a ``lookback_days`` window of buckets."""
+    buckets = lookback_days * 86400 / seconds
+    return 2.0 / (buckets + 1)
+
+
+def fold_close(count: int, mean: float, variance: float, close: float, alpha: float) -> Tuple[int, float, float]:
+    """
+    Fold one bucket close into running statistics in O(1).
+
+    Until the window has filled this is Welford's equal-weight update of the
+    population variance, matching window_stats; after
+    that it becomes an exponentially weighted mean and variance with ``alpha``,
+    so old buckets fade out the way they drop out of the recompute window.
+    """
+    weight = max(alpha, 1.0 / (count + 1))
+    delta = close - mean
+    mean += weight * delta
+    variance = (1 - weight) * (variance + weight * delta * delta)
+    return count + 1, mean, variance
+
+
+async def _upsert_stats(rows: List[Dict[str, Any]], session) -> None:
+    if not rows:
+        return
+    insert = dialect_insert(session)
+    stmt = insert(BubbleStat).values([{**row, "ts_updated": datetime.utcnow()} for row in rows])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol"],
+        set_={column: stmt.excluded[column] for column in STAT_FIELDS + ["ts_updated"]},
+    )
+    await session.execute(stmt)
+
+
+async def recompute_bubble_stats(session, now: Optional[datetime] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Rebuild every symbol's baseline from the rollups and re-score it.
+
+    Reads the completed ``BUBBLE_ROLLUP_INTERVAL`` closes of the last
+    ``BUBBLE_LOOKBACK_DAYS`` into one NumPy matrix, resets the running
+    statistics to the exact window mean and variance (correcting any drift of
+    the incremental updates) and returns ranked rows for upsert_bubble_outliers,
+    or None when there is no history to recompute from yet.
+    """
+    lookback_days = settings.BUBBLE_LOOKBACK_DAYS
+    seconds = INTERVAL_SECONDS[settings.BUBBLE_ROLLUP_INTERVAL]
+    now = now or datetime.utcnow()
+    # The open bucket is left pending and folded in once it closes
+    current_bucket = bucket_start(now, seconds)
+    start = current_bucket - timedelta(days=lookback_days)
+
+    result = await session.execute(
+        select(OhlcvRollup.symbol, OhlcvRollup.bucket, OhlcvRollup.close).where(
+            OhlcvRollup.interval == settings.BUBBLE_ROLLUP_INTERVAL,
+            OhlcvRollup.bucket >= start,
+            OhlcvRollup.bucket < current_bucket,
+        )
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    symbols, buckets, closes = zip(*rows)
+    columns = int((current_bucket - start).total_seconds()) // seconds
+    windows = price_matrix(symbols, buckets, closes, start, seconds, columns)
+    names = sorted(set(symbols))
+    counts, means, variances = window_stats(windows)
+
+    result = await session.execute(
+        select(LatestMarketState.symbol, LatestMarketState.price).where(LatestMarketState.symbol.in_(names))
+    )
+    latest = dict(result.all())
+    current = np.array([latest.get(name, np.nan) for name in names], dtype=float)
+
+    await _upsert_stats([
+        {
+            "symbol": name,
+            "count": int(counts[i]),
+            "mean": float(means[i]),
+            "variance": float(variances[i]),
+            "pending_bucket": current_bucket if name in latest else None,
+            "pending_close": latest.get(name),
+            "ts_recomputed": now,
+        }
+        for i, name in enumerate(names)
+    ], session)
+
+    outliers = score_symbols(names, current, means, variances, counts, lookback_days, settings.BUBBLE_MIN_SAMPLES)
+    logger.info(f"Recomputed bubble baselines for {len(names)} symbols, {len(outliers)} scored")
+    return outliers
+
+
+async def update_bubble_stats(snapshots: List[Any], session) -> List[Dict[str, Any]]:
+    """
+    Advance the running statistics with new snapshots and re-score their symbols.
+
+    Each snapshot costs O(1): when it opens a new bucket the previous bucket's
+    close is folded in, otherwise it only replaces the pending close.
+    """
+    if not snapshots:
+        return []
+
+    lookback_days = settings.BUBBLE_LOOKBACK_DAYS
+    seconds = INTERVAL_SECONDS[settings.BUBBLE_ROLLUP_INTERVAL]
+    alpha = ewma_alpha(lookback_days, seconds)
+
+    symbols = {snapshot.symbol for snapshot in snapshots}
+    result = await session.execute(select(BubbleStat).where(BubbleStat.symbol.in_(symbols)))
+    stats = {
+        row.symbol: {field: getattr(row, field) for field in STAT_FIELDS}
+        for row in result.scalars()
+    }
+
+    latest_price: Dict[str, float] = {}
+    for snapshot in sorted(snapshots, key=lambda s: s.timestamp):
+        stat = stats.setdefault(snapshot.symbol, {
+            "count": 0, "mean": 0.0, "variance": 0.0,
+            "pending_bucket": None, "pending_close": None, "ts_recomputed": None,
+        })
+        bucket = bucket_start(snapshot.timestamp, seconds)
+        if stat["pending_bucket"] is not None and bucket < stat["pending_bucket"]:
+            # Late snapshot for a bucket already folded in
+            continue
+        if stat["pending_bucket"] is not None and bucket > stat["pending_bucket"]:
+            stat["count"], stat["mean"], stat["variance"] = fold_close(
+                stat["count"], stat["mean"], stat["variance"], stat["pending_close"], alpha
+            )
+        stat["pending_bucket"] = bucket
+        stat["pending_close"] = snapshot.price
+        latest_price[snapshot.symbol] = snapshot.price
+
+    await _upsert_stats([{"symbol": symbol, **stat} for symbol, stat in stats.items()], session)
+
+    names = sorted(latest_price)
+    current = np.array([latest_price[name] for name in names], dtype=float)
+    means = np.array([stats[name]["mean"] for name in names], dtype=float)
+    variances = np.array([stats[name]["variance"] for name in names], dtype=float)
+    counts = np.array([stats[name]["count"] for name in names], dtype=np.int64)
+    return score_symbols(names, current, means, variances, counts, lookback_days, settings.BUBBLE_MIN_SAMPLES)
+
+
+async def refresh_bubble_outliers(snapshots: List[Any], session, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Incrementally update bubble z-scores, falling back to a full recompute when
+    none has run within ``BUBBLE_RECOMPUTE_INTERVAL`` seconds.
+    """
+    now = now or datetime.utcnow()
+    result = await session.execute(select(func.max(BubbleStat.ts_recomputed)))
+    last_recompute = result.scalar()
+    if last_recompute is None or (now - last_recompute).total_seconds() >= settings.BUBBLE_RECOMPUTE_INTERVAL:
+        outliers = await recompute_bubble_stats(session, now)
+        if outliers is not None:
+            return outliers
+    return await update_bubble_stats(snapshots, session)
@@ -1,10 +1,10 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 import sys
 from typing import Dict, List, Any, Optional
-from sqlalchemy import select, delete, func
+from sqlalchemy import select, func
 from sqlalchemy.dialects.postgresql import insert
 
 # Add the project root to the Python path
@@ -15,9 +15,15 @@ from data_sources.liquidations import get_liquidations_data
 from data_sources.trades import get_recent_large_trades
 from data_sources.stablecoins import fetch_daily_net_flows
 from data_sources.binance_utils import get_funding_rates
-from app.core.database import SessionLocal, engine
+from app.core.database import SessionLocal, engine, dialect_insert
+from worker.retention import retention_loop
+from worker.rollups import update_ohlcv_rollups, update_flow_rollups
+from worker.bubbles import refresh_bubble_outliers
+from worker.macro import macro_refresh_loop
 from app.models.asset import Asset
+from app.models.symbol import Symbol
 from app.models.market_snapshot import MarketSnapshot
+from app.models.latest_market_state import LatestMarketState
 from app.models.liquidation import Liquidation
 from app.models.trade_large import TradeLarge
 from app.models.macro_point import MacroPoint
@@ -31,10 +37,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger("worker.ingest")
 
-# Data retention periods
-MARKET_SNAPSHOT_RETENTION_DAYS = 14
-LIQUIDATION_RETENTION_DAYS = 90
-TRADES_RETENTION_DAYS = 90
+# symbol -> symbols.id, filled lazily as new symbols are seen
+_symbol_ids: Dict[str, int] = {}
+
+
+async def get_symbol_ids(symbols: List[str], session) -> Dict[str, int]:
+    """Resolve symbols to their dimension ids, registering unknown ones."""
+    missing = {s for s in symbols if s not in _symbol_ids}
+    if missing:
+        result = await session.execute(select(Symbol.symbol, Symbol.id).where(Symbol.symbol.in_(missing)))
+        _symbol_ids.update(dict(result.all()))
+
+        new_symbols = missing - _symbol_ids.keys()
+        if new_symbols:
+            new_rows = [Symbol(symbol=s) for s in sorted(new_symbols)]
+            session.add_all(new_rows)
+            await session.flush()
+            _symbol_ids.update({row.symbol: row.id for row in new_rows})
+            logger.info(f"Registered {len(new_rows)} new symbols")
+
+    return {s: _symbol_ids[s] for s in symbols}
 
 
 async def upsert_assets(assets_data: List[Dict[str, Any]], session) -> None:
@@ -77,17 +99,16 @@ async def upsert_assets(assets_data: List[Dict[str, Any]], session) -> None:
         await session.execute(stmt)
 
 
-async def bulk_insert_market_snapshots(snapshots_data: List[Dict[str, Any]], session) -> None:
+async def bulk_insert_market_snapshots(snapshots_data: List[Dict[str, Any]], session) -> List[MarketSnapshot]:
     """Bulk insert market snapshots into the database."""
     logger.info(f"Bulk inserting {len(snapshots_data)} market snapshots")
     
+    symbol_ids = await get_symbol_ids([s["symbol"] for s in snapshots_data], session)
+    
     snapshot_objects = []
     for snapshot in snapshots_data:
-        # Generate a unique ID for each snapshot
-        snapshot_id = f"{snapshot['symbol']}_{snapshot['timestamp'].isoformat()}"
-        
         snapshot_objects.append(MarketSnapshot(
-            id=snapshot_id,
+            symbol_id=symbol_ids[snapshot["symbol"]],
             symbol=snapshot["symbol"],
             timestamp=snapshot["timestamp"],
             price=snapshot["price"],
@@ -105,12 +126,58 @@ async def bulk_insert_market_snapshots(snapshots_data: List[Dict[str, Any]], ses
         ))
     
     session.add_all(snapshot_objects)
+    return snapshot_objects
 
 
-async def bulk_insert_liquidations(liquidations_data: List[Dict[str, Any]], session) -> None:
+async def upsert_latest_market_state(snapshots: List[MarketSnapshot], session) -> None:
+    """Keep one row per symbol holding its most recent snapshot."""
+    if not snapshots:
+        return
+    
+    # Only the newest snapshot per symbol in this batch matters
+    latest: Dict[str, MarketSnapshot] = {}
+    for snapshot in snapshots:
+        current = latest.get(snapshot.symbol)
+        if current is None or snapshot.timestamp >= current.timestamp:
+            latest[snapshot.symbol] = snapshot
+    
+    insert = dialect_insert(session)
+    stmt = insert(LatestMarketState).values([
+        {
+            "symbol": s.symbol,
+            "symbol_id": s.symbol_id,
+            "timestamp": s.timestamp,
+            "price": s.price,
+            "volume_24h": s.volume_24h,
+            "percent_change_1h": s.percent_change_1h,
+            "percent_change_24h": s.percent_change_24h,
+            "percent_change_7d": s.percent_change_7d,
+            "funding_rate": s.funding_rate,
+            "ts_updated": datetime.utcnow(),
+        }
+        for s in latest.values()
+    ])
+    
+    # On conflict, only move forward in time
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol"],
+        set_={
+            column: stmt.excluded[column]
+            for column in ["symbol_id", "timestamp", "price", "volume_24h", "percent_change_1h",
+                           "percent_change_24h", "percent_change_7d", "funding_rate", "ts_updated"]
+        },
+        where=stmt.excluded.timestamp >= LatestMarketState.timestamp,
+    )
+    
+    await session.execute(stmt)
+
+
+async def bulk_insert_liquidations(liquidations_data: List[Dict[str, Any]], session) -> List[Liquidation]:
     """Bulk insert liquidation events into the database."""
     logger.info(f"Bulk inserting {len(liquidations_data)} liquidation events")
     
+    symbol_ids = await get_symbol_ids([liq["coin"] for liq in liquidations_data], session)
+    
     liquidation_objects = []
     for liq in liquidations_data:
         # Convert timestamp to datetime if it's a string
@@ -123,6 +190,7 @@ async def bulk_insert_liquidations(liquidations_data: List[Dict[str, Any]], sess
                 timestamp = datetime.utcnow()
         
         liquidation_objects.append(Liquidation(
+            symbol_id=symbol_ids[liq["coin"]],
             symbol=liq["coin"],
             side=liq["side"],
             price=liq["price"],
@@ -136,12 +204,15 @@ async def bulk_insert_liquidations(liquidations_data: List[Dict[str, Any]], sess
         ))
     
     session.add_all(liquidation_objects)
+    return liquidation_objects
 
 
-async def bulk_insert_trades(trades_data: List[Dict[str, Any]], session) -> None:
+async def bulk_insert_trades(trades_data: List[Dict[str, Any]], session) -> List[TradeLarge]:
     """Bulk insert large trades into the database."""
     logger.info(f"Bulk inserting {len(trades_data)} large trades")
     
+    symbol_ids = await get_symbol_ids([trade["symbol"] for trade in trades_data], session)
+    
     trade_objects = []
     for trade in trades_data:
         # Convert timestamp to datetime if it's a string
@@ -154,6 +225,7 @@ async def bulk_insert_trades(trades_data: List[Dict[str, Any]], session) -> None
                 timestamp = datetime.utcnow()
         
         trade_objects.append(TradeLarge(
+            symbol_id=symbol_ids[trade["symbol"]],
             symbol=trade["symbol"],
             side=trade["side"],
             price=trade["price"],
@@ -166,6 +238,7 @@ async def bulk_insert_trades(trades_data: List[Dict[str, Any]], session) -> None
         ))
     
     session.add_all(trade_objects)
+    return trade_objects
 
 
 async def bulk_insert_macro_points(macro_data: List[Dict[str, Any]], session) -> None:
@@ -199,110 +272,78 @@ async def bulk_insert_macro_points(macro_data: List[Dict[str, Any]], session) ->
 
 
 async def upsert_bubble_outliers(bubble_data: List[Dict[str, Any]], session) -> None:
-    """Upsert bubble outlier data into the database."""
+    """Upsert bubble outlier data into the database in a single statement."""
     logger.info(f"Upserting {len(bubble_data)} bubble outliers")
+    if not bubble_data:
+        return
     
-    for bubble in bubble_data:
-        # Create the upsert statement for PostgreSQL
-        stmt = insert(BubbleOutlier).values(
-            symbol=bubble["symbol"],
-            z_score=bubble["z_score"],
-            current_price=bubble["current_price"],
-            baseline_price=bubble.get("baseline_price"),
-            percent_deviation=bubble.get("percent_deviation"),
-            rank=bubble.get("rank"),
-            direction=bubble.get("direction"),
-            lookback_days=bubble.get("lookback_days", 30),
-            detection_method=bubble.get("detection_method", "zscore"),
-            ts_updated=datetime.utcnow()
-        )
-        
-        # On conflict, update all fields except the primary key
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["symbol"],
-            set_={
-                "z_score": bubble["z_score"],
-                "current_price": bubble["current_price"],
-                "baseline_price": bubble.get("baseline_price"),
-                "percent_deviation": bubble.get("percent_deviation"),
-                "rank": bubble.get("rank"),
-                "direction": bubble.get("direction"),
-                "lookback_days": bubble.get("lookback_days", 30),
-                "detection_method": bubble.get("detection_method", "zscore"),
-                "ts_updated": datetime.utcnow()
-            }
-        )
-        
-        await session.execute(stmt)
+    now = datetime.utcnow()
+    insert = dialect_insert(session)
+    stmt = insert(BubbleOutlier).values([
+        {
+            "symbol": bubble["symbol"],
+            "z_score": bubble["z_score"],
+            "current_price": bubble["current_price"],
+            "baseline_price": bubble.get("baseline_price"),
+            "percent_deviation": bubble.get("percent_deviation"),
+            "rank": bubble.get("rank"),
+            "direction": bubble.get("direction"),
+            "lookback_days": bubble.get("lookback_days", 30),
+            "detection_method": bubble.get("detection_method", "zscore"),
+            "ts_updated": now,
+        }
+        for bubble in bubble_data
+    ])
+    
+    # On conflict, update all fields except the primary key
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol"],
+        set_={
+            column: stmt.excluded[column]
+            for column in ["z_score", "current_price", "baseline_price", "percent_deviation", "rank",
+                           "direction", "lookback_days", "detection_method", "ts_updated"]
+        },
+    )
+    
+    await session.execute(stmt)
 
 
 async def upsert_stablecoin_flows(flow_data: List[Dict[str, Any]], session) -> None:
-    """Upsert stablecoin flow data into the database."""
+    """Upsert stablecoin flow data in a single statement, leaving unchanged days untouched."""
     logger.info(f"Upserting {len(flow_data)} stablecoin flow records")
+    if not flow_data:
+        return
     
-    for flow in flow_data:
-        # Create the upsert statement for PostgreSQL
-        stmt = insert(StablecoinFlow).values(
-            date=flow["date"],
-            net=flow["net"],
-            circulating=flow["circulating"]
-        )
-        
-        # On conflict, update all fields except the primary key
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["date"],
-            set_={
-                "net": flow["net"],
-                "circulating": flow["circulating"]
-            }
-        )
-        
-        await session.execute(stmt)
-
-
-async def purge_old_data(session) -> None:
-    """Delete data older than retention periods."""
-    logger.info("Purging old data based on retention periods")
-    
-    # Calculate cutoff dates
-    snapshot_cutoff = datetime.utcnow() - timedelta(days=MARKET_SNAPSHOT_RETENTION_DAYS)
-    liquidation_cutoff = datetime.utcnow() - timedelta(days=LIQUIDATION_RETENTION_DAYS)
-    trades_cutoff = datetime.utcnow() - timedelta(days=TRADES_RETENTION_DAYS)
-    
-    # Delete old market snapshots
-    snapshot_delete = delete(MarketSnapshot).where(MarketSnapshot.timestamp < snapshot_cutoff)
-    snapshot_result = await session.execute(snapshot_delete)
-    logger.info(f"Deleted {snapshot_result.rowcount} old market snapshots")
+    insert = dialect_insert(session)
+    stmt = insert(StablecoinFlow).values([
+        {"date": flow["date"], "net": flow["net"], "circulating": flow["circulating"]}
+        for flow in flow_data
+    ])
     
-    # Delete old liquidations
-    liquidation_delete = delete(Liquidation).where(Liquidation.timestamp < liquidation_cutoff)
-    liquidation_result = await session.execute(liquidation_delete)
-    logger.info(f"Deleted {liquidation_result.rowcount} old liquidation events")
+    # Only the latest day normally changes, so skip identical rows
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["date"],
+        set_={column: stmt.excluded[column] for column in ["net", "circulating"]},
+        where=(StablecoinFlow.net != stmt.excluded.net)
+        | (StablecoinFlow.circulating != stmt.excluded.circulating),
+    )
     
-    # Delete old trades
-    trades_delete = delete(TradeLarge).where(TradeLarge.timestamp < trades_cutoff)
-    trades_result = await session.execute(trades_delete)
-    logger.info(f"Deleted {trades_result.rowcount} old large trades")
+    await session.execute(stmt)
 
 
-async def process_market_data(market_data: Dict[str, Dict[str, Any]], session) -> None:
-    """Process and store market data."""
-    logger.info("Processing market data")
-    
-    # Fetch funding rates
-    try:
-        funding_rates = await get_funding_rates()
-        logger.info(f"Fetched funding rates for {len(funding_rates)} pairs")
-    except Exception as e:
-        logger.error(f"Error fetching funding rates: {e}")
-        funding_rates = {}
-    
-    # Prepare market snapshots
+def market_snapshot_rows(
+    market_data: Dict[str, Dict[str, Any]], funding_rates: Dict[str, float], timestamp: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Snapshot rows for one cycle of market data. Symbols are stored upper
+    case, as liquidations, trades and every reader of the rollups expect.
+    """
     snapshots_data = []
     for symbol, data in market_data.items():
-        snapshot = {
+        symbol = symbol.upper()
+        snapshots_data.append({
             "symbol": symbol,
-            "timestamp": datetime.utcnow(),
+            "timestamp": timestamp,
             "price": data["price"],
             "open": data.get("open"),
             "high": data.get("high"),
@@ -313,16 +354,34 @@ async def process_market_data(market_data: Dict[str, Dict[str, Any]], session) -
             "percent_change_1h": data.get("percent_change_1h"),
             "percent_change_24h": data.get("percent_change_24h"),
             "percent_change_7d": data.get("percent_change_7d"),
-            "funding_rate": funding_rates.get(symbol)  # Add funding rate to snapshot
-        }
-        snapshots_data.append(snapshot)
+            "funding_rate": funding_rates.get(f"{symbol}USDT"),  # Binance keys are perp symbols
+        })
+    return snapshots_data
+
+
+async def process_market_data(market_data: Dict[str, Dict[str, Any]], session) -> List[MarketSnapshot]:
+    """Process and store market data."""
+    logger.info("Processing market data")
+    
+    # Fetch funding rates
+    try:
+        funding_rates = await get_funding_rates()
+        logger.info(f"Fetched funding rates for {len(funding_rates)} pairs")
+    except Exception as e:
+        logger.error(f"Error fetching funding rates: {e}")
+        funding_rates = {}
+    
+    snapshots_data = market_snapshot_rows(market_data, funding_rates, datetime.utcnow())
     
-    # Bulk insert market snapshots
-    await bulk_insert_market_snapshots(snapshots_data, session)
+    # Bulk insert market snapshots and fold them into the OHLCV rollups
+    snapshots = await bulk_insert_market_snapshots(snapshots_data, session)
+    await upsert_latest_market_state(snapshots, session)
+    await update_ohlcv_rollups(snapshots, session)
     
     # Commit the transaction
     await session.commit()
     logger.info("Market data processing complete")
+    return snapshots
 
 
 async def ingest_loop():
@@ -334,29 +393,34 @@ async def ingest_loop():
             async with SessionLocal() as session:
                 # Fetch market data
                 market_data = await fetch_market_data()
-                await process_market_data(market_data, session)
+                snapshots = await process_market_data(market_data, session)
+                
+                # Advance the running bubble statistics and re-score
+                bubbles = await refresh_bubble_outliers(snapshots, session)
+                await upsert_bubble_outliers(bubbles, session)
                 
                 # Fetch and store liquidations
                 liquidations = await get_liquidations_data()
-                await bulk_insert_liquidations(liquidations, session)
+                liquidation_rows = await bulk_insert_liquidations(liquidations, session)
+                await update_flow_rollups("liquidation", liquidation_rows, session)
                 
                 # Fetch and store large trades
                 trades = await get_recent_large_trades()
-                await bulk_insert_trades(trades, session)
+                trade_rows = await bulk_insert_trades(trades, session)
+                await update_flow_rollups("trade", trade_rows, session)
                 
                 # Fetch and store stablecoin flows
                 stablecoin_flows = await fetch_daily_net_flows()
                 await upsert_stablecoin_flows(stablecoin_flows, session)
                 
-                # Purge old data
-                await purge_old_data(session)
-                
                 # Commit all changes
                 await session.commit()
                 
                 logger.info("Successfully processed and stored data")
                 
         except Exception as e:
+            # Ids registered in a rolled-back transaction are no longer valid
+            _symbol_ids.clear()
             logger.error(f"Error in ingestion loop: {str(e)}")
             # Log the full traceback for debugging
             logger.exception("Full traceback:")
@@ -365,6 +429,16 @@ async def ingest_loop():
         await asyncio.sleep(60)  # 1 minute delay
 
 
+async def main():
+    """Run ingestion, retention and the macro refresher side by side."""
+    # Retention runs outside the ingest transaction on its own schedule
+    await asyncio.gather(
+        ingest_loop(),
+        retention_loop(SessionLocal),
+        macro_refresh_loop(SessionLocal),
+    )
+
+
 if __name__ == "__main__":
     logger.info("Ingest worker starting up")
-    asyncio.run(ingest_loop()) 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, or_, select, func
+
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.models.macro_point import MacroPoint
+from data_sources.alpha_vantage import MACRO_INDICATORS, fetch_indicator_series
+from data_sources.response_cache import get_response_cache
+
+logger = logging.getLogger("worker.macro")
+
+SOURCE = "alpha_vantage"
+UPSERT_FIELDS = ["value", "previous_value", "percent_change", "source"]
+UPSERT_BATCH_SIZE = 500  # rows per statement, well under SQLite's bound-parameter limit
+REVISION_WINDOW = timedelta(days=90)  # trailing observations re-sent so upstream revisions land
+
+
+def _next_month(day: datetime) -> datetime:
+    return day.replace(year=day.year + day.month // 12, month=day.month % 12 + 1, day=1)
+
+
+def _next_business_day(day: datetime) -> datetime:
+    day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def next_release(cadence: str, latest: datetime) -> datetime:
+    """
+    Earliest time an observation newer than ``latest`` can be published.
+
+    Monthly series are dated the first of the month they cover, so the next
+    one exists once that following month has ended. Daily series only print
+    on business days, and a day's value is out after the day closes.
+    """
+    if cadence == "monthly":
+        return _next_month(_next_month(latest))
+    return _next_business_day(latest) + timedelta(days=1)
+
+
+def due_indicators(latest: Dict[str, datetime], now: datetime) -> List[str]:
+    """Indicators that may have a new observation, the longest overdue first."""
+    due: List[Tuple[datetime, str]] = []
+    for indicator, (_, cadence) in MACRO_INDICATORS.items():
+        if indicator not in latest:
+            due.append((datetime.min, indicator))
+            continue
+        release = next_release(cadence, latest[indicator])
+        if release <= now:
+            due.append((release, indicator))
+    return [indicator for _, indicator in sorted(due)]
+
+
+async def latest_observations(session) -> Dict[str, datetime]:
+    """Date of the newest stored observation of every indicator."""
+    result = await session.execute(
+        select(MacroPoint.indicator, func.max(MacroPoint.timestamp)).group_by(MacroPoint.indicator)
+    )
+    return dict(result.all())
+
+
+async def load_latest_macro_points(session) -> Dict[str, MacroPoint]:
+    """The newest stored observation of every indicator."""
+    latest = (
+        select(MacroPoint.indicator, func.max(MacroPoint.timestamp).label("timestamp"))
+        .group_by(MacroPoint.indicator)
+        .subquery()
+    )
+    result = await session.execute(
+        select(MacroPoint).join(
+            latest,
+            and_(MacroPoint.indicator == latest.c.indicator, MacroPoint.timestamp == latest.c.timestamp),
+        )
+    )
+    return {point.indicator: point for point in result.scalars()}
+
+
+def series_rows(indicator: str, dates: np.ndarray, values: np.ndarray) -> List[Dict[str, Any]]:
+    """macro_points rows for a whole series, with previous values and changes computed in one pass."""
+    previous = np.concatenate(([np.nan], values[:-1]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change = (values - previous) / previous * 100
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "indicator": indicator,
+            "timestamp": timestamp,
+            "value": value,
+            "previous_value": prev if np.isfinite(prev) else None,
+            "percent_change": pct if np.isfinite(pct) else None,
+            "source": SOURCE,
+            "ts_created": now,
+        }
+        for timestamp, value, prev, pct in zip(
+            dates.astype("datetime64[us]").tolist(), values.tolist(), previous.tolist(), change.tolist()
+        )
+    ]
+
+
+async def upsert_macro_series(
+    indicator: str, dates: np.ndarray, values: np.ndarray, session, since: Optional[datetime] = None
+) -> int:
+    """
+    Bulk upsert a series into macro_points, deduplicated on (indicator, timestamp).
+
+    Only observations from ``since`` on are sent, so a daily refresh writes a
+    short tail instead of decades of history; existing rows are rewritten only
+    when upstream revised them. Returns the number of rows sent.
+    """
+    rows = series_rows(indicator, dates, values)
+    if since is not None:
+        rows = [row for row in rows if row["timestamp"] >= since]
+    if not rows:
+        return 0
+
+    insert = dialect_insert(session)
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(MacroPoint).values(rows[i:i + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["indicator", "timestamp"],
+            set_={column: stmt.excluded[column] for column in UPSERT_FIELDS},
+            where=or_(
+                MacroPoint.value != stmt.excluded.value,
+                MacroPoint.previous_value.is_distinct_from(stmt.excluded.previous_value),
+            ),
+        )
+        await session.execute(stmt)
+    return len(rows)
+
+
+async def refresh_macro_points(session, now: Optional[datetime] = None) -> List[str]:
+    """
+    Fetch the indicators a new observation is plausible for and upsert their series.
+
+    Indicators are tried in order of how overdue they are until the shared
+    daily quota runs out; anything left is picked up on a later pass.
+    Returns the indicators that gained an observation.
+    """
+    now = now or datetime.utcnow()
+    latest = await latest_observations(session)
+    due = due_indicators(latest, now)
+    if not due:
+        return []
+
+    cache = get_response_cache()
+    logger.info(f"Macro indicators due: {due} "
+                f"({settings.ALPHA_VANTAGE_DAILY_QUOTA - cache.quota_used(SOURCE)} Alpha Vantage calls left today)")
+
+    updated = []
+    for indicator in due:
+        if cache.quota_used(SOURCE) >= settings.ALPHA_VANTAGE_DAILY_QUOTA:
+            # Later passes pick the rest up once the quota resets at midnight UTC
+            logger.warning(f"Alpha Vantage quota spent; deferring {due[due.index(indicator):]}")
+            break
+        series = await fetch_indicator_series(indicator)
+        if series is None:
+            continue
+        dates, values = series
+        previous = latest.get(indicator)
+        await upsert_macro_series(
+            indicator, dates, values, session,
+            since=previous - REVISION_WINDOW if previous is not None else None,
+        )
+        if previous is None or dates[-1].astype("datetime64[us]").item() > previous:
+            updated.append(indicator)
+    return updated
+
+
+def downsample(timestamps: np.ndarray, values: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the last observation of each of ``max_points`` equal-width time buckets."""
+    if len(timestamps) <= max_points:
+        return timestamps, values
+    seconds = timestamps.astype("datetime64[s]").astype(np.int64)
+    span = seconds[-1] - seconds[0] + 1
+    buckets = (seconds - seconds[0]) * max_points // span
+    keep = np.append(buckets[1:] != buckets[:-1], True)
+    return timestamps[keep], values[keep]
+
+
+async def load_macro_history(
+    session,
+    indicator: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = 500,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Stored observations of ``indicator`` in [start, end], oldest first, thinned
+    to at most ``max_points``. Returns the points and the number matched.
+    """
+    query = select(MacroPoint.timestamp, MacroPoint.value).where(MacroPoint.indicator == indicator)
+    if start is not None:
+        query = query.where(MacroPoint.timestamp >= start)
+    if end is not None:
+        query = query.where(MacroPoint.timestamp <= end)
+    result = await session.execute(query.order_by(MacroPoint.timestamp))
+    rows = result.all()
+    if not rows:
+        return [], 0
+
+    timestamps, values = zip(*rows)
+    timestamps, values = downsample(
+        np.array(timestamps, dtype="datetime64[us]"), np.array(values, dtype=float), max_points
+    )
+    points = [
+        {"timestamp": timestamp, "value": value}
+        for timestamp, value in zip(timestamps.tolist(), values.tolist())
+    ]
+    return points, len(rows)
+
+
+async def macro_refresh_loop(
+    session_factory, on_refresh: Optional[Callable[[], Awaitable[None]]] = None
+) -> None:
+    """
+    Check for due macro indicators every ``MACRO_REFRESH_INTERVAL`` seconds.
+
+    ``on_refresh`` runs once up front and again whenever new observations
+    were stored, so an in-memory copy can be rebuilt from macro_points.
+    """
+    logger.info(f"Starting macro refresh loop (interval={settings.MACRO_REFRESH_INTERVAL}s, "
+                f"daily_quota={settings.ALPHA_VANTAGE_DAILY_QUOTA})")
+    first_pass = True
+
+    while True:
+        try:
+            if first_pass and on_refresh:
+                # Serve what earlier runs stored before spending any quota
+                await on_refresh()
+            first_pass = False
+            async with session_factory() as session:
+                updated = await refresh_macro_points(session)
+                await session.commit()
+            if updated:
+                logger.info(f"Stored new macro observations: {updated}")
+                if on_refresh:
+                    await on_refresh()
+        except Exception as e:
+            logger.error(f"Error in macro refresh loop: {str(e)}")
+            logger.exception("Full traceback:")
+
+        await asyncio.sleep(settings.MACRO_REFRESH_INTERVAL)
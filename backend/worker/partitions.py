@@ -0,0 +1,129 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import List
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger("worker.partitions")
+
+# Tables range-partitioned by day on Postgres, each with a DEFAULT partition
+# (see migrations c4e1a9d27b3f and e7c3a5f19d42)
+PARTITIONED_TABLES = ["market_snapshots", "liquidations", "trades_large"]
+
+
+def partition_name(table: str, day: date) -> str:
+    """Name of the daily partition of ``table`` holding rows for ``day``."""
+    return f"{table}_p{day:%Y%m%d}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of the DEFAULT partition catching rows of days without a partition."""
+    return f"{table}_pdefault"
+
+
+def partition_day(table: str, name: str):
+    """Inverse of partition_name; returns None for names that don't match."""
+    prefix = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+async def is_partitioned(conn, table: str) -> bool:
+    """Check whether ``table`` is a partitioned parent. Always False off Postgres."""
+    if conn.dialect.name != "postgresql":
+        return False
+    result = await conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :table"
+    ), {"table": table})
+    return result.scalar() is not None
+
+
+async def list_partitions(conn, table: str) -> List[str]:
+    """Names of the partitions currently attached to ``table``."""
+    result = await conn.execute(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :table"
+    ), {"table": table})
+    return [row[0] for row in result]
+
+
+async def _attach_from_default(conn, table: str, name: str, day: date) -> None:
+    """
+    Create the partition ``name`` for ``day`` while ``table`` has a DEFAULT partition.
+
+    Postgres refuses to create a partition whose range already has rows in the
+    default partition, so the day's rows are moved into a standalone table
+    first, which is then attached as the partition.
+    """
+    start, end = day.isoformat(), (day + timedelta(days=1)).isoformat()
+    bounds = f"FROM ('{start}') TO ('{end}')"
+    await conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS)'))
+    await conn.execute(text(
+        f'WITH moved AS (DELETE FROM "{default_partition_name(table)}" '
+        f"WHERE \"timestamp\" >= '{start}' AND \"timestamp\" < '{end}' RETURNING *) "
+        f'INSERT INTO "{name}" SELECT * FROM moved'
+    ))
+    await conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES {bounds}'))
+
+
+async def ensure_partitions(conn, table: str, days_ahead: int = None) -> int:
+    """Create daily partitions for today through ``days_ahead`` days from now."""
+    days_ahead = settings.PARTITION_PREMAKE_DAYS if days_ahead is None else days_ahead
+    existing = set(await list_partitions(conn, table))
+    has_default = default_partition_name(table) in existing
+    today = datetime.utcnow().date()
+
+    created = 0
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        name = partition_name(table, day)
+        if name in existing:
+            continue
+        if has_default:
+            await _attach_from_default(conn, table, name, day)
+        else:
+            await conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+            ))
+        created += 1
+
+    if created:
+        logger.info(f"Created {created} partitions ahead for {table}")
+    return created
+
+
+async def drop_expired_partitions(conn, table: str, cutoff: datetime) -> int:
+    """Drop every partition of ``table`` whose whole day lies before ``cutoff``."""
+    dropped = 0
+    for name in await list_partitions(conn, table):
+        day = partition_day(table, name)
+        if day is None:
+            continue
+        partition_end = datetime.combine(day + timedelta(days=1), datetime.min.time())
+        if partition_end <= cutoff:
+            await conn.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            dropped += 1
+
+    if dropped:
+        logger.info(f"Dropped {dropped} expired partitions of {table}")
+    return dropped
+
+
+async def maintain_partitions(session_factory) -> None:
+    """Pre-create upcoming partitions for every partitioned hot table."""
+    async with session_factory() as session:
+        conn = await session.connection()
+        for table in PARTITIONED_TABLES:
+            if await is_partitioned(conn, table):
+                await ensure_partitions(conn, table)
+        await session.commit()
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Tuple
+from sqlalchemy import select, delete
+
+from app.core.config import settings
+from app.models.market_snapshot import MarketSnapshot
+from app.models.liquidation import Liquidation
+from app.models.trade_large import TradeLarge
+from app.models.ohlcv_rollup import OhlcvRollup
+from app.models.flow_rollup import FlowRollup
+from worker.partitions import is_partitioned, drop_expired_partitions, maintain_partitions
+
+logger = logging.getLogger("worker.retention")
+
+
+def retention_policies() -> List[Tuple[Any, int]]:
+    """Return (model, retention_days) pairs for every table the engine purges."""
+    return [
+        (MarketSnapshot, settings.MARKET_SNAPSHOT_RETENTION_DAYS),
+        (Liquidation, settings.LIQUIDATION_RETENTION_DAYS),
+        (TradeLarge, settings.TRADES_RETENTION_DAYS),
+    ]
+
+
+def rollup_retention_policies() -> List[Tuple[Any, str, int]]:
+    """Return (model, interval, retention_days) for the rollup levels the engine purges."""
+    return [
+        (model, interval, days)
+        for model in (OhlcvRollup, FlowRollup)
+        for interval, days in (
+            ("1m", settings.ROLLUP_1M_RETENTION_DAYS),
+            ("5m", settings.ROLLUP_5M_RETENTION_DAYS),
+        )
+    ]
+
+
+async def purge_table(session_factory, model, cutoff: datetime, batch_size: int) -> Dict[str, Any]:
+    """
+    Delete rows of ``model`` older than ``cutoff`` in bounded batches.
+
+    Each batch selects at most ``batch_size`` ids through the timestamp index and
+    deletes them in its own short transaction, so locks are released between
+    batches and no single statement touches the whole expired range.
+
+    On Postgres tables partitioned by day, fully expired days are dropped as
+    whole partitions first, leaving only the boundary day to batch-delete.
+    """
+    started = time.perf_counter()
+    deleted = 0
+    batches = 0
+    partitions_dropped = 0
+
+    async with session_factory() as session:
+        conn = await session.connection()
+        if await is_partitioned(conn, model.__tablename__):
+            partitions_dropped = await drop_expired_partitions(conn, model.__tablename__, cutoff)
+        await session.commit()
+
+    while True:
+        expired_ids = (
+            select(model.id)
+            .where(model.timestamp < cutoff)
+            .order_by(model.timestamp)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        async with session_factory() as session:
+            result = await session.execute(delete(model).where(model.id.in_(expired_ids)))
+            await session.commit()
+
+        batches += 1
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            break
+
+        # Yield to other tasks between batches
+        await asyncio.sleep(0)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Deleted {deleted} rows from {model.__tablename__} older than {cutoff.isoformat()} "
+                f"in {batches} batches, dropped {partitions_dropped} partitions ({elapsed_ms:.1f} ms)")
+    return {
+        "table": model.__tablename__,
+        "deleted": deleted,
+        "batches": batches,
+        "partitions_dropped": partitions_dropped,
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+async def purge_rollups(session_factory, model, interval: str, cutoff: datetime, batch_size: int) -> Dict[str, Any]:
+    """
+    Delete ``interval`` buckets of a rollup table older than ``cutoff`` in bounded batches.
+
+    Rollup tables have composite keys, so each batch is bounded by bucket: it
+    deletes up to the bucket of the ``batch_size``-th oldest expired row, found
+    through the (interval, bucket) index. Rows sharing that bucket go in the
+    same batch, so a batch may slightly exceed ``batch_size``.
+    """
+    started = time.perf_counter()
+    deleted = 0
+    batches = 0
+    expired = (model.interval == interval) & (model.bucket < cutoff)
+
+    while True:
+        async with session_factory() as session:
+            result = await session.execute(
+                select(model.bucket).where(expired).order_by(model.bucket).offset(batch_size - 1).limit(1)
+            )
+            last_bucket = result.scalar_one_or_none()
+            condition = expired if last_bucket is None else expired & (model.bucket <= last_bucket)
+            result = await session.execute(delete(model).where(condition))
+            await session.commit()
+
+        batches += 1
+        deleted += result.rowcount
+        if last_bucket is None:
+            break
+
+        # Yield to other tasks between batches
+        await asyncio.sleep(0)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Deleted {deleted} {interval} rows from {model.__tablename__} older than {cutoff.isoformat()} "
+                f"in {batches} batches ({elapsed_ms:.1f} ms)")
+    return {
+        "table": f"{model.__tablename__}:{interval}",
+        "deleted": deleted,
+        "batches": batches,
+        "partitions_dropped": 0,
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+async def run_retention(session_factory, batch_size: int = None) -> List[Dict[str, Any]]:
+    """Purge every table past its retention period and return per-table reports."""
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    now = datetime.utcnow()
+
+    try:
+        await maintain_partitions(session_factory)
+    except Exception as e:
+        logger.error(f"Error maintaining partitions: {e}", exc_info=True)
+
+    reports = []
+    for model, retention_days in retention_policies():
+        cutoff = now - timedelta(days=retention_days)
+        try:
+            reports.append(await purge_table(session_factory, model, cutoff, batch_size))
+        except Exception as e:
+            logger.error(f"Error purging {model.__tablename__}: {e}", exc_info=True)
+
+    for model, interval, retention_days in rollup_retention_policies():
+        cutoff = now - timedelta(days=retention_days)
+        try:
+            reports.append(await purge_rollups(session_factory, model, interval, cutoff, batch_size))
+        except Exception as e:
+            logger.error(f"Error purging {interval} rows of {model.__tablename__}: {e}", exc_info=True)
+
+    total_deleted = sum(r["deleted"] for r in reports)
+    total_ms = sum(r["elapsed_ms"] for r in reports)
+    logger.info(f"Retention run complete: {total_deleted} rows removed in {total_ms:.1f} ms")
+    return reports
+
+
+async def retention_loop(session_factory) -> None:
+    """Run the retention engine on its own schedule, independent of ingestion."""
+    logger.info(f"Starting retention loop (interval={settings.RETENTION_INTERVAL}s, "
+                f"batch_size={settings.RETENTION_BATCH_SIZE})")
+
+    while True:
+        try:
+            await run_retention(session_factory)
+        except Exception as e:
+            logger.error(f"Error in retention loop: {str(e)}")
+            logger.exception("Full traceback:")
+
+        await asyncio.sleep(settings.RETENTION_INTERVAL)
@@ -0,0 +1,161 @@
+import logging
+from typing import Dict, List, Any, Iterable, Tuple
+from sqlalchemy import select
+
+from app.core.rollups import ROLLUP_INTERVALS, bucket_start
+from app.models.ohlcv_rollup import OhlcvRollup
+from app.models.flow_rollup import FlowRollup
+
+logger = logging.getLogger("worker.rollups")
+
+OHLCV_FIELDS = ["open", "high", "low", "close", "volume", "sample_count", "first_ts", "last_ts"]
+FLOW_FIELDS = ["count", "quantity", "value_usd"]
+
+
+def _combine_ohlcv(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge two OHLCV partials covering the same bucket, in any order."""
+    first, last = (a, b) if a["first_ts"] <= b["first_ts"] else (b, a)
+    closing = b if b["last_ts"] >= a["last_ts"] else a
+    if a["volume"] is None and b["volume"] is None:
+        volume = None
+    else:
+        volume = (a["volume"] or 0.0) + (b["volume"] or 0.0)
+    return {
+        "open": first["open"],
+        "high": max(a["high"], b["high"]),
+        "low": min(a["low"], b["low"]),
+        "close": closing["close"],
+        "volume": volume,
+        "sample_count": a["sample_count"] + b["sample_count"],
+        "first_ts": first["first_ts"],
+        "last_ts": closing["last_ts"],
+    }
+
+
+def _combine_flow(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: a[field] + b[field] for field in FLOW_FIELDS}
+
+
+def _regroup(partials: Dict[Tuple, Dict[str, Any]], seconds: int, combine) -> Dict[Tuple, Dict[str, Any]]:
+    """Roll partials keyed by (..., bucket) up into coarser ``seconds``-wide buckets."""
+    coarser: Dict[Tuple, Dict[str, Any]] = {}
+    for key, partial in partials.items():
+        coarse_key = key[:-1] + (bucket_start(key[-1], seconds),)
+        existing = coarser.get(coarse_key)
+        coarser[coarse_key] = combine(existing, partial) if existing else partial
+    return coarser
+
+
+def ohlcv_partials(snapshots: Iterable[Any]) -> Dict[str, Dict[Tuple, Dict[str, Any]]]:
+    """
+    Aggregate freshly ingested snapshots into per-interval OHLCV partials.
+
+    The delta is bucketed once at the finest level; every coarser level is
+    derived from the level below it (1m -> 5m -> 1h -> 1d).
+    """
+    finest_name, finest_seconds = ROLLUP_INTERVALS[0]
+    finest: Dict[Tuple, Dict[str, Any]] = {}
+    for snap in snapshots:
+        key = (snap.symbol, bucket_start(snap.timestamp, finest_seconds))
+        partial = {
+            "open": snap.price,
+            "high": snap.price,
+            "low": snap.price,
+            "close": snap.price,
+            "volume": snap.volume,
+            "sample_count": 1,
+            "first_ts": snap.timestamp,
+            "last_ts": snap.timestamp,
+        }
+        existing = finest.get(key)
+        finest[key] = _combine_ohlcv(existing, partial) if existing else partial
+
+    levels = {finest_name: finest}
+    previous = finest
+    for name, seconds in ROLLUP_INTERVALS[1:]:
+        previous = _regroup(previous, seconds, _combine_ohlcv)
+        levels[name] = previous
+    return levels
+
+
+def flow_partials(events: Iterable[Any]) -> Dict[str, Dict[Tuple, Dict[str, Any]]]:
+    """Aggregate freshly ingested liquidations or trades into per-side volume partials."""
+    finest_name, finest_seconds = ROLLUP_INTERVALS[0]
+    finest: Dict[Tuple, Dict[str, Any]] = {}
+    for event in events:
+        key = (event.symbol, str(event.side).lower(), bucket_start(event.timestamp, finest_seconds))
+        partial = {"count": 1, "quantity": event.quantity or 0.0, "value_usd": event.value_usd or 0.0}
+        existing = finest.get(key)
+        finest[key] = _combine_flow(existing, partial) if existing else partial
+
+    levels = {finest_name: finest}
+    previous = finest
+    for name, seconds in ROLLUP_INTERVALS[1:]:
+        previous = _regroup(previous, seconds, _combine_flow)
+        levels[name] = previous
+    return levels
+
+
+async def update_ohlcv_rollups(snapshots: List[Any], session) -> int:
+    """Fold newly inserted snapshots into the OHLCV rollups. Returns rows touched."""
+    if not snapshots:
+        return 0
+
+    touched = 0
+    for interval, partials in ohlcv_partials(snapshots).items():
+        symbols = {key[0] for key in partials}
+        buckets = {key[1] for key in partials}
+        result = await session.execute(
+            select(OhlcvRollup).where(
+                OhlcvRollup.interval == interval,
+                OhlcvRollup.symbol.in_(symbols),
+                OhlcvRollup.bucket.in_(buckets),
+            )
+        )
+        existing = {(row.symbol, row.bucket): row for row in result.scalars()}
+
+        for (symbol, bucket), partial in partials.items():
+            row = existing.get((symbol, bucket))
+            if row is None:
+                session.add(OhlcvRollup(symbol=symbol, interval=interval, bucket=bucket, **partial))
+            else:
+                current = {field: getattr(row, field) for field in OHLCV_FIELDS}
+                for field, value in _combine_ohlcv(current, partial).items():
+                    setattr(row, field, value)
+            touched += 1
+
+    logger.info(f"Updated {touched} OHLCV rollup buckets from {len(snapshots)} snapshots")
+    return touched
+
+
+async def update_flow_rollups(kind: str, events: List[Any], session) -> int:
+    """Fold newly inserted liquidations or trades into the flow rollups. Returns rows touched."""
+    if not events:
+        return 0
+
+    touched = 0
+    for interval, partials in flow_partials(events).items():
+        symbols = {key[0] for key in partials}
+        buckets = {key[2] for key in partials}
+        result = await session.execute(
+            select(FlowRollup).where(
+                FlowRollup.kind == kind,
+                FlowRollup.interval == interval,
+                FlowRollup.symbol.in_(symbols),
+                FlowRollup.bucket.in_(buckets),
+            )
+        )
+        existing = {(row.symbol, row.side, row.bucket): row for row in result.scalars()}
+
+        for (symbol, side, bucket), partial in partials.items():
+            row = existing.get((symbol, side, bucket))
+            if row is None:
+                session.add(FlowRollup(kind=kind, symbol=symbol, side=side, interval=interval,
+                                       bucket=bucket, **partial))
+            else:
+                for field in FLOW_FIELDS:
+                    setattr(row, field, getattr(row, field) + partial[field])
+            touched += 1
+
+    logger.info(f"Updated {touched} {kind} rollup buckets from {len(events)} events")
+    return touched